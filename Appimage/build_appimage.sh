@@ -49,7 +49,8 @@ python3 -m PyInstaller \
     --windowed \
     --noconfirm \
     --add-data "${SRC_DIR}/build_data_folder.py:." \
-    "${SRC_DIR}/gui.py"
+    --hidden-import gui \
+    "${SRC_DIR}/mo2manager.py"
 
 # Create AppDir structure
 echo "Creating AppDir structure..."
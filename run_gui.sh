@@ -4,7 +4,7 @@ set -e
 # ---------------- CONFIG ----------------
 PROJECT_DIR="$(cd "$(dirname "$0")" && pwd)"
 VENV_DIR="$PROJECT_DIR/.venv"
-GUI_FILE="$PROJECT_DIR/src/gui.py"
+GUI_FILE="$PROJECT_DIR/src/mo2manager.py"
 PYTHON_BIN="python3"
 # ----------------------------------------
 
@@ -52,7 +52,7 @@ done
 
 # 7. Run GUI
 if [ ! -f "$GUI_FILE" ]; then
-    echo "ERROR: gui.py not found at $GUI_FILE"
+    echo "ERROR: mo2manager.py not found at $GUI_FILE"
     exit 1
 fi
 
@@ -0,0 +1,278 @@
+"""
+Read the file tables of the BSA and BA2 archives of a build, to find what
+loose files and archives override in other archives.
+
+The game reads a file from the archives only when no loose file has it, and of
+two archives with the same file the one loaded last wins. Archives are loaded
+with their plugins, in plugin load order (the game's own archives, listed in its
+ini, come first). A build only links loose files, so a loose texture that hides
+a mod's archived one, or two archives fighting over a mesh, never shows up in
+the build index. These are recorded in a second index next to it
+(<name>.archives.tsv, same row layout, conflicts only) that the Conflict
+Explorer reads with the build index.
+
+Archives are memory mapped and only their header and file tables are parsed
+(no file data is read), in a thread pool, so hundreds of archives take seconds.
+
+No Qt in here: build_data_folder runs this at the end of each build.
+"""
+
+import os
+import mmap
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from build_data_folder import BuildCancelled, make_logger, make_provider_label, write_archive_index
+
+
+ARCHIVE_EXTENSIONS = (".bsa", ".ba2")
+ARCHIVE_WORKERS = 8
+
+# BSA: archive flags, and the bit of a file size that toggles compression
+BSA_DIRECTORY_NAMES = 0x1
+BSA_FILE_NAMES = 0x2
+BSA_SIZE_MASK = 0x3FFFFFFF
+
+
+def _read_bsa(m):
+    """(name, size) of every file of a BSA (versions 103-105) in the mapping m."""
+    (version, offset, flags, folder_count, file_count,
+     total_folder_name_length, total_file_name_length) = struct.unpack_from('<7I', m, 4)
+    if version not in (103, 104, 105):
+        raise ValueError(f"unknown BSA version {version}")
+    if not (flags & BSA_DIRECTORY_NAMES and flags & BSA_FILE_NAMES):
+        raise ValueError("the archive has no file names")
+
+    # Folder records give each folder's file count; the file records follow them
+    folder_record_size = 24 if version == 105 else 16
+    counts = [struct.unpack_from('<I', m, offset + 8 + i * folder_record_size)[0] for i in range(folder_count)]
+    pos = offset + folder_count * folder_record_size
+    folders = []
+    for count in counts:
+        name_length = m[pos]
+        folder = m[pos + 1:pos + name_length].rstrip(b'\0').decode('cp1252', 'replace')
+        pos += 1 + name_length
+        sizes = [size & BSA_SIZE_MASK for _, size, _ in struct.iter_unpack('<QII', m[pos:pos + 16 * count])]
+        folders.append((folder, sizes))
+        pos += 16 * count
+
+    # Then every file name, in the same order
+    names = m[pos:pos + total_file_name_length].split(b'\0')
+    if len(names) < file_count:
+        raise ValueError("truncated file name table")
+    files = []
+    n = 0
+    for folder, sizes in folders:
+        prefix = folder.replace('\\', os.sep).lower() + os.sep
+        for size in sizes:
+            files.append((prefix + names[n].decode('cp1252', 'replace').lower(), size))
+            n += 1
+    return files
+
+
+def _read_ba2(m):
+    """(name, size) of every file of a BA2 (general or texture) in the mapping m."""
+    version, kind, file_count, names_offset = struct.unpack_from('<I4sIQ', m, 4)
+    # Starfield's versions 2 and 3 have longer headers
+    records_offset = {2: 32, 3: 36}.get(version, 24)
+    sizes = []
+    if kind == b'GNRL':
+        for _, _, _, _, _, packed_size, size, _ in struct.iter_unpack(
+                '<I4sIIQIII', m[records_offset:records_offset + 36 * file_count]):
+            sizes.append(size or packed_size)
+    elif kind == b'DX10':
+        # A texture record is followed by its mip chunks; the size is what they unpack to
+        pos = records_offset
+        for _ in range(file_count):
+            chunk_count = m[pos + 13]
+            pos += 24
+            sizes.append(sum(struct.unpack_from('<I', m, pos + i * 24 + 12)[0] for i in range(chunk_count)))
+            pos += 24 * chunk_count
+    else:
+        raise ValueError(f"unknown BA2 type {kind!r}")
+
+    files = []
+    pos = names_offset
+    for size in sizes:
+        name_length = struct.unpack_from('<H', m, pos)[0]
+        name = m[pos + 2:pos + 2 + name_length].decode('cp1252', 'replace')
+        files.append((name.replace('\\', os.sep).lower(), size))
+        pos += 2 + name_length
+    return files
+
+
+def read_archive(path):
+    """
+    (lowercase Data path, size) of every file in the BSA or BA2 at path, read from
+    its header and file tables only. Raises OSError or ValueError if it can't be read.
+    """
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            try:
+                if m[:4] == b'BSA\0':
+                    return _read_bsa(m)
+                if m[:4] == b'BTDX':
+                    return _read_ba2(m)
+            except (struct.error, IndexError) as e:
+                raise ValueError(f"damaged archive ({e})")
+    raise ValueError("not a BSA or BA2 archive")
+
+
+def read_load_order(plugins_path):
+    """
+    The active plugins of a plugins.txt, in load order (lowercase). Lines starting with
+    "*" are the active ones where the game marks them (Skyrim SE, Fallout 4), every
+    listed plugin otherwise. Returns (active, listed).
+    """
+    try:
+        with open(plugins_path, 'r', encoding='utf-8-sig', errors='replace') as f:
+            lines = [line.strip() for line in f]
+    except OSError:
+        return [], []
+    lines = [line for line in lines if line and not line.startswith('#')]
+    listed = [line.lstrip('*').lower() for line in lines]
+    if any(line.startswith('*') for line in lines):
+        return [line[1:].lower() for line in lines if line.startswith('*')], listed
+    return listed, listed
+
+
+def get_archive_load_order(archives, active, listed, base_mod):
+    """
+    Sort the archives of a build (list of (Data path, mod name)) in the order the game
+    loads them. An archive is loaded with the first plugin it is named after ("Mod.bsa"
+    or "Mod - Textures.bsa" for Mod.esp): the game's own archives (from base_mod, loaded
+    by its ini) first, then the others in plugin order.
+    Returns (loaded, skipped): loaded a list of (Data path, mod name) lowest priority
+    first, skipped a list of (Data path, reason).
+    """
+    def plugin_of(archive, plugins):
+        stem = os.path.splitext(archive.lower())[0]
+        for i, plugin in enumerate(plugins):
+            plugin_stem = os.path.splitext(plugin)[0]
+            if stem == plugin_stem or stem.startswith(plugin_stem + " - "):
+                return i
+        return None
+
+    ranked = []
+    skipped = []
+    for dest_path, mod_name in archives:
+        position = plugin_of(dest_path, active)
+        if position is not None:
+            ranked.append(((1, position, dest_path.lower()), dest_path, mod_name))
+        elif plugin_of(dest_path, listed) is not None:
+            skipped.append((dest_path, "its plugin is not active"))
+        elif mod_name == base_mod:
+            ranked.append(((0, 0, dest_path.lower()), dest_path, mod_name))
+        else:
+            skipped.append((dest_path, "no plugin loads it"))
+    ranked.sort()
+    return [(dest_path, mod_name) for _, dest_path, mod_name in ranked], skipped
+
+
+def index_archives(output_dir, entries, plugins_path, workers=ARCHIVE_WORKERS, cancel=None, events=None):
+    """
+    Read the file tables of the archives of a build and record every Data path that a
+    loose file or a later archive overrides in an archive (see write_archive_index).
+    entries: the build's index rows (dest_path, mod_name, original_path, size, inode,
+             device, mtime_ns, overridden), as given to write_build_index
+    plugins_path: the profile's plugins.txt (the load order of the archives)
+    Returns a dict with "archives" (read), "files" (in them), "loose_overrides",
+    "archive_overrides", "pairs" ((winner, loser) -> files), "skipped", "failed" and "seconds".
+    """
+    import datafolder
+
+    log = make_logger(events)
+    started = time.monotonic()
+
+    # Only archives at the top of the Data folder are loaded
+    archives = [(dest_path, mod_name) for dest_path, mod_name, *_ in entries
+                if os.sep not in dest_path and dest_path.lower().endswith(ARCHIVE_EXTENSIONS)]
+    active, listed = read_load_order(plugins_path)
+    loaded, skipped = get_archive_load_order(archives, active, listed, datafolder.DATAFOLDER_MOD_NAME)
+
+    def read(item):
+        try:
+            return read_archive(os.path.join(output_dir, item[0])), None
+        except (OSError, ValueError) as e:
+            return None, f"{item[0]}: {e}"
+
+    # Providers of each path: the archive number, or a list of them (lowest first) once
+    # a later archive has it too; sizes keeps the size in the archive that wins
+    providers = {}
+    sizes = {}
+    failed = []
+    files = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for number, (table, error) in enumerate(pool.map(read, loaded)):
+            if cancel is not None and cancel.is_set():
+                raise BuildCancelled("Build cancelled")
+            if error is not None:
+                failed.append(error)
+                continue
+            files += len(table)
+            for name, size in table:
+                previous = providers.get(name)
+                if previous is None:
+                    providers[name] = number
+                    continue
+                if previous == number:
+                    continue
+                if isinstance(previous, int):
+                    providers[name] = previous = [previous]
+                if previous[-1] != number:
+                    previous.append(number)
+                    sizes[name] = size
+
+    labels = [make_provider_label(mod_name, dest_path) for dest_path, mod_name in loaded]
+    rows = []
+    pairs = {}
+    loose_overrides = 0
+    loose = set()
+    for dest_path, mod_name, original_path, size, inode, device, mtime_ns, overridden in entries:
+        key = dest_path.lower()
+        archived = providers.get(key)
+        if archived is None:
+            continue
+        loose.add(key)
+        # Loose files win over every archive
+        losers = [archived] if isinstance(archived, int) else archived
+        loose_overrides += 1
+        for number in losers:
+            pairs[(mod_name, labels[number])] = pairs.get((mod_name, labels[number]), 0) + 1
+        lower = "|".join([labels[number] for number in losers] + ([overridden] if overridden else []))
+        rows.append((dest_path, mod_name, original_path, size, inode, device, mtime_ns, lower))
+
+    archive_overrides = 0
+    for key, archived in providers.items():
+        if isinstance(archived, int) or key in loose:
+            continue
+        archive_overrides += 1
+        winner = labels[archived[-1]]
+        for number in archived[:-1]:
+            pairs[(winner, labels[number])] = pairs.get((winner, labels[number]), 0) + 1
+        rows.append((key, winner, "", sizes[key], 0, 0, 0, "|".join(labels[number] for number in archived[:-1])))
+
+    write_archive_index(output_dir, rows)
+    result = {
+        "archives": len(loaded) - len(failed),
+        "files": files,
+        "loose_overrides": loose_overrides,
+        "archive_overrides": archive_overrides,
+        "pairs": pairs,
+        "skipped": skipped,
+        "failed": failed,
+        "seconds": time.monotonic() - started,
+    }
+    log(f"  Read {result['archives']} archives ({files:,} files) in {result['seconds']:.1f}s")
+    log(f"  Archived files overridden by loose files: {loose_overrides:,}")
+    log(f"  Archived files overridden by later archives: {archive_overrides:,}")
+    for (winner, loser), count in sorted(pairs.items(), key=lambda item: -item[1])[:10]:
+        log(f"    {winner} overrides {loser}: {count:,} files")
+    for dest_path, reason in skipped[:10]:
+        log(f"  Not loaded, {reason}: {dest_path}")
+    if len(skipped) > 10:
+        log(f"  ... and {len(skipped) - 10} more archives not loaded")
+    for error in failed[:10]:
+        log(f"  WARNING: Could not read {error}")
+    return result
@@ -17,10 +17,209 @@ import shutil
 
 import os
 import sys
-import argparse
+import json
+import stat
+import hashlib
+import threading
+import time
 from datetime import datetime
 
 
+# Build state (snapshot of the last build) lives in a hidden folder next to the
+# Data folder so it is on the same filesystem and survives Data being deleted.
+STATE_DIR_NAME = ".mo2manager"
+INDEX_VERSION = 2
+INDEX_HEADER = f"# mo2manager build index v{INDEX_VERSION}"
+OVERRIDDEN_HEADER = "# mo2manager overridden files v1"
+ARCHIVE_INDEX_HEADER = "# mo2manager archive index v1"
+
+# While linking, finished destination directories are appended to a journal so an
+# interrupted build can resume. Directories are synced and journaled every
+# CHECKPOINT_INTERVAL links.
+JOURNAL_HEADER = "# mo2manager build journal v1"
+CHECKPOINT_INTERVAL = 2000
+
+# Build logs kept in ~/.config/mo2manager/logs (oldest are pruned)
+MAX_BUILD_LOGS = 20
+
+
+class BuildCancelled(Exception):
+    """Raised by build_data_folder() when its cancel token is set."""
+
+
+class ProgressEvent:
+    """
+    Progress of one phase, sent to the events sink of build_data_folder() (and of the
+    DataFolder moves in datafolder.py).
+    phase: e.g. "Scanning folders", "Building filemap", "Linking", "Copying"
+    done/total: items done, counted in unit ("mods" or "files")
+    bytes_done: size of the files handled so far
+    total_bytes: size of all files, when known up front (rate and ETA are then byte based)
+    elapsed: seconds since the phase started
+    """
+
+    def __init__(self, phase, done, total, bytes_done=0, elapsed=0.0, unit="files", total_bytes=0):
+        self.phase = phase
+        self.done = done
+        self.total = total
+        self.bytes_done = bytes_done
+        self.elapsed = elapsed
+        self.unit = unit
+        self.total_bytes = total_bytes
+
+    @property
+    def rate(self):
+        """Items per second in this phase."""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def byte_rate(self):
+        """Bytes per second in this phase."""
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Estimated seconds left in this phase, or None while the rate is unknown."""
+        if self.total_bytes:
+            rate = self.byte_rate
+            return (self.total_bytes - self.bytes_done) / rate if rate > 0 else None
+        rate = self.rate
+        if rate <= 0:
+            return None
+        return (self.total - self.done) / rate
+
+    def describe(self):
+        """One line summary, e.g. 'Linking: 1,000/5,000 files - 2,500 files/s - 1.20 GB - ETA 0:02'"""
+        if self.total_bytes:
+            text = (f"{self.phase}: {format_size(self.bytes_done)}/{format_size(self.total_bytes)} "
+                    f"({self.done:,}/{self.total:,} {self.unit}) - {format_size(int(self.byte_rate))}/s")
+        else:
+            text = f"{self.phase}: {self.done:,}/{self.total:,} {self.unit} - {self.rate:,.0f} {self.unit}/s"
+            if self.bytes_done:
+                text += f" - {format_size(self.bytes_done)}"
+        eta = self.eta
+        if eta is not None and self.done < self.total:
+            minutes, seconds = divmod(int(eta), 60)
+            text += f" - ETA {minutes}:{seconds:02d}"
+        return text
+
+
+class LogEvent:
+    """A line of build output (what the CLI prints)."""
+
+    def __init__(self, text=""):
+        self.text = text
+
+
+class FailureEvent:
+    """A file that could not be linked into the Data folder."""
+
+    def __init__(self, source, dest, error, size):
+        self.source = source
+        self.dest = dest
+        self.error = error
+        self.size = size
+
+
+class FinishedEvent:
+    """Sent last by build_data_folder() with the BuildResult of the build."""
+
+    def __init__(self, result):
+        self.result = result
+
+
+class DoneEvent:
+    """Sent last by a build child process (see build_process_main) with the overall outcome."""
+
+    def __init__(self, success, message):
+        self.success = success
+        self.message = message
+
+
+class BuildResult:
+    """
+    Outcome of build_data_folder(): counts, sizes, failures and timings.
+    failures: list of (source, dest, error, size)
+    timings: seconds per phase ("scan", "filemap", "link", "snapshot", "archives", "total")
+    archive_overrides: archived files a loose file or a later archive overrides
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.enabled_mods = 0
+        self.total = 0
+        self.created = 0
+        self.resumed = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.failed = 0
+        self.overrides = 0
+        self.folder_conflicts = 0
+        self.overwrite_files = 0
+        self.overwrite_overrides = 0
+        self.size_linked = 0
+        self.size_overridden = 0
+        self.size_failed = 0
+        self.archive_overrides = 0
+        self.failures = []
+        self.timings = {}
+
+    def summary(self):
+        """Short multi-line summary for dialogs."""
+        text = (f"Linked {self.created + self.resumed + self.unchanged:,} files ({format_size(self.size_linked)}) "
+                f"from {self.enabled_mods} mods in {self.timings.get('total', 0):.1f}s.")
+        if self.unchanged:
+            text += (f"\nIncremental: {self.unchanged:,} unchanged, {self.created:,} linked, "
+                     f"{self.removed:,} removed.")
+        if self.archive_overrides:
+            text += f"\n{self.archive_overrides:,} archived files are overridden, see Explore Conflicts."
+        if self.failed:
+            text += f"\n{self.failed:,} files could not be linked, see the log."
+        return text
+
+
+def _emit(events, event):
+    """Send an event to the events sink, if there is one."""
+    if events is not None:
+        events(event)
+
+
+def make_logger(events):
+    """Return a print-like function: LogEvents for an events sink, plain print without one."""
+    if events is None:
+        return print
+    return lambda text="": events(LogEvent(text))
+
+
+def _report_progress(events, phase, done, total, started, bytes_done=0, unit="files"):
+    """Send a ProgressEvent to the events sink, if there is one."""
+    if events is not None:
+        events(ProgressEvent(phase, done, total, bytes_done, time.monotonic() - started, unit))
+
+
+def _check_cancel(cancel):
+    """Stop the build if the cancel token (anything with is_set(), e.g. threading.Event) is set."""
+    if cancel is not None and cancel.is_set():
+        raise BuildCancelled("Build cancelled")
+
+
+def open_build_log(kind="build"):
+    """
+    Create a new timestamped log file in ~/.config/mo2manager/logs and prune old ones.
+    Returns (path, file) or (None, None) if the log can't be written.
+    """
+    log_dir = os.path.join(os.path.expanduser("~"), ".config", "mo2manager", "logs")
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        old_logs = sorted(f for f in os.listdir(log_dir) if f.startswith(f"{kind}-") and f.endswith(".log"))
+        for name in old_logs[:max(0, len(old_logs) - MAX_BUILD_LOGS + 1)]:
+            os.remove(os.path.join(log_dir, name))
+        path = os.path.join(log_dir, f"{kind}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.log")
+        return path, open(path, 'w', encoding='utf-8', errors='replace')
+    except OSError:
+        return None, None
+
+
 def parse_modlist(modlist_path):
     """
     Parse modlist.txt from bottom to top.
@@ -53,6 +252,23 @@ def parse_modlist(modlist_path):
     return enabled_mods
 
 
+def read_modlist_entries(modlist_path):
+    """
+    Read every mod in modlist.txt, top (highest priority) first.
+    Returns a list of (mod_name, enabled); unmanaged entries (*) are left out.
+    """
+    entries = []
+    try:
+        with open(modlist_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line[:1] in ('+', '-') and line[1:].strip():
+                    entries.append((line[1:].strip(), line[0] == '+'))
+    except OSError:
+        pass
+    return entries
+
+
 def count_uppercase(s):
     """Count the number of uppercase letters in a string."""
     return sum(1 for c in s if c.isupper())
@@ -135,17 +351,21 @@ def scan_folder_for_variants(folder_path, folder_variants):
                 folder_variants[lowercase_part].add(part)
 
 
-def collect_all_folders(modlist_path, mods_folder, overwrite_folder=None):
+def collect_all_folders(modlist_path, mods_folder, overwrite_folder=None, cancel=None, events=None):
     """
     Scan all enabled mods and collect all folder name variants.
     Returns a dict: lowercase_folder -> set of original folder names seen
     """
     enabled_mods = parse_modlist(modlist_path)
     folder_variants = {}  # lowercase -> set of original names
+    started = time.monotonic()
 
-    for mod_name in enabled_mods:
+    for i, mod_name in enumerate(enabled_mods):
+        _check_cancel(cancel)
+        _report_progress(events, "Scanning folders", i, len(enabled_mods), started, unit="mods")
         mod_path = os.path.join(mods_folder, mod_name)
         scan_folder_for_variants(mod_path, folder_variants)
+    _report_progress(events, "Scanning folders", len(enabled_mods), len(enabled_mods), started, unit="mods")
 
     # Also scan overwrite folder if provided
     if overwrite_folder and os.path.exists(overwrite_folder):
@@ -197,112 +417,1150 @@ def normalize_path_with_map(original_path, folder_map):
         return original_path
 
 
-def sync_shadercache(source_data_folder, overwrite_folder):
+def _resolve_folder_case(base, rel_dir, cache):
+    """
+    Map rel_dir onto folders that already exist under base, ignoring case,
+    so harvested files land in e.g. overwrite/SKSE rather than a new overwrite/skse.
+    """
+    if not rel_dir:
+        return ''
+    if rel_dir in cache:
+        return cache[rel_dir]
+
+    parent, name = os.path.split(rel_dir)
+    resolved_parent = _resolve_folder_case(base, parent, cache)
+    resolved_name = name
+    try:
+        with os.scandir(os.path.join(base, resolved_parent)) as it:
+            for entry in it:
+                if entry.name.lower() == name.lower() and entry.is_dir():
+                    resolved_name = entry.name
+                    break
+    except OSError:
+        pass
+
+    resolved = os.path.join(resolved_parent, resolved_name) if resolved_parent else resolved_name
+    cache[rel_dir] = resolved
+    return resolved
+
+
+def harvest_data_folder(output_dir, overwrite_folder, keep_source=False, events=None):
+    """
+    Move files written into the Data folder by the game or by tools into the
+    overwrite folder before the Data folder is rebuilt, so they are not lost.
+    (ShaderCache, FNIS/Nemesis/Pandora output, SKSE logs and config, BodySlide output, ...)
+
+    A file is one of our hardlinks if the build snapshot lists it with the same inode.
+    Anything else with a single link (st_nlink == 1) was created in the Data folder
+    and is harvested. Symlinks (e.g. plugins.txt) are left alone.
+    Without a snapshot (Data built by an older version) only ShaderCache is harvested.
+
+    Files are moved with a single rename when Data and overwrite share a filesystem.
+    With keep_source=True they are hardlinked (or copied) instead, so the old Data
+    folder stays complete in case the build is cancelled and rolled back.
+    Returns the number of files harvested.
+    """
+    log = make_logger(events)
+    if not overwrite_folder or not os.path.isdir(output_dir):
+        return 0
+
+    _, entries = load_build_index(output_dir)
+    if entries is None:
+        log("  No build snapshot found, only ShaderCache will be harvested")
+
+    os.makedirs(overwrite_folder, exist_ok=True)
+    same_device = os.stat(output_dir).st_dev == os.stat(overwrite_folder).st_dev
+    if not same_device:
+        log("  Data and overwrite are on different filesystems, files will be copied")
+
+    harvested = 0
+    failed = 0
+    folder_case_cache = {}
+
+    for root, dirs, filenames in os.walk(output_dir):
+        rel_root = os.path.relpath(root, output_dir)
+        if rel_root == '.':
+            rel_root = ''
+
+        if entries is None and not rel_root:
+            # Legacy mode: older builds only copied (not linked) ShaderCache
+            dirs[:] = [d for d in dirs if d.lower() == "shadercache"]
+            continue
+
+        for filename in filenames:
+            rel_path = os.path.join(rel_root, filename) if rel_root else filename
+            src = os.path.join(root, filename)
+            try:
+                st = os.lstat(src)
+            except OSError:
+                continue
+
+            if stat.S_ISLNK(st.st_mode):
+                continue
+            if entries is not None:
+                entry = entries.get(rel_path)
+                if entry is not None and (st.st_ino, st.st_dev) == (entry[3], entry[4]):
+                    continue  # Our hardlink (possibly edited in place, which already reached the mod)
+                if st.st_nlink > 1:
+                    continue  # Still linked elsewhere, not created in the Data folder
+
+            dest_dir = os.path.join(overwrite_folder, _resolve_folder_case(overwrite_folder, rel_root, folder_case_cache))
+            dest = os.path.join(dest_dir, filename)
+            try:
+                os.makedirs(dest_dir, exist_ok=True)
+                if keep_source and same_device:
+                    tmp_dest = dest + ".mo2tmp"
+                    if os.path.lexists(tmp_dest):
+                        os.remove(tmp_dest)
+                    os.link(src, tmp_dest)
+                    os.replace(tmp_dest, dest)
+                elif keep_source:
+                    shutil.copy2(src, dest)
+                elif same_device:
+                    os.replace(src, dest)
+                else:
+                    shutil.move(src, dest)
+                harvested += 1
+                if harvested <= 10:
+                    log(f"    {rel_path}")
+            except OSError as e:
+                failed += 1
+                log(f"  WARNING: Could not harvest {rel_path}: {e}")
+
+    if harvested > 10:
+        log(f"    ... and {harvested - 10} more")
+    log(f"  Harvested {harvested} files into: {overwrite_folder}")
+    if failed:
+        log(f"  Failed: {failed}")
+
+    return harvested
+
+
+def get_state_dir(output_dir):
+    """Return the build state folder for a Data folder (a hidden sibling of it)."""
+    parent = os.path.dirname(os.path.abspath(output_dir.rstrip(os.sep)))
+    return os.path.join(parent, STATE_DIR_NAME)
+
+
+def get_index_paths(output_dir):
+    """
+    Return (meta_path, index_path) for the snapshot of the last build of output_dir.
+    - meta_path: small JSON file with the build settings and totals
+    - index_path: tab separated list of every hardlinked file
     """
-    Sync ShaderCache from the game's Data folder to the overwrite folder.
-    This preserves shader cache changes made by the game between builds.
+    name = os.path.basename(os.path.abspath(output_dir.rstrip(os.sep)))
+    state_dir = get_state_dir(output_dir)
+    return (os.path.join(state_dir, f"{name}.build.json"),
+            os.path.join(state_dir, f"{name}.index.tsv"))
 
-    - Only syncs if ShaderCache exists in the Data folder
-    - If ShaderCache exists only in overwrite (not Data), it is preserved
-    - Copies ShaderCache from source Data folder to overwrite folder
 
-    Returns True if ShaderCache was synced, False otherwise.
+def get_overridden_index_path(output_dir):
+    """Return the path of the list of overridden files of the last build of output_dir."""
+    _, index_path = get_index_paths(output_dir)
+    return index_path[:-len(".index.tsv")] + ".overridden.tsv"
+
+
+def write_overridden_index(output_dir, rows):
     """
-    if not overwrite_folder:
-        return False
+    Save the files of the last build that lost to a higher priority mod.
+    rows: list of (dest_path, mod_name, original_path, size)
+    """
+    path = get_overridden_index_path(output_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(OVERRIDDEN_HEADER + "\n")
+        for dest_path, mod_name, original_path, size in rows:
+            f.write(f"{dest_path}\t{mod_name}\t{original_path}\t{size}\n")
+    os.replace(tmp_path, path)
 
-    source_shadercache = os.path.join(source_data_folder, "ShaderCache")
-    dest_shadercache = os.path.join(overwrite_folder, "ShaderCache")
 
-    # Check if source ShaderCache exists in Data folder
-    if not os.path.exists(source_shadercache) or not os.path.isdir(source_shadercache):
-        # No ShaderCache in Data folder - preserve any existing one in overwrite
-        if os.path.exists(dest_shadercache):
-            print(f"  No ShaderCache in Data folder, preserving existing overwrite ShaderCache")
+def load_overridden_index(output_dir):
+    """
+    Load the overridden files of the last build of output_dir as a list of
+    (dest_path, mod_name, original_path, size), or None if it was not recorded.
+    """
+    rows = []
+    try:
+        with open(get_overridden_index_path(output_dir), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) == 4:
+                    rows.append((parts[0], parts[1], parts[2], int(parts[3])))
+    except (OSError, ValueError):
+        return None
+    return rows
+
+
+def get_pack_manifest_path(output_dir):
+    """Return the path of the list of archives the loose files of output_dir were packed into."""
+    _, index_path = get_index_paths(output_dir)
+    return index_path[:-len(".index.tsv")] + ".packs.json"
+
+
+def write_pack_manifest(output_dir, manifest):
+    """Save the packs of output_dir (see pack.pack_data_folder), or remove the list if there are none."""
+    path = get_pack_manifest_path(output_dir)
+    if not manifest or not manifest.get("packs"):
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def load_pack_manifest(output_dir):
+    """
+    Load the packs of output_dir as a dict with "format" and "packs", a list of dicts
+    with "plugin", "archive", "fingerprint", "size" and "files" (the Data paths packed
+    into the archive, no longer linked loose), or None if nothing was packed.
+    """
+    try:
+        with open(get_pack_manifest_path(output_dir), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def get_archive_index_path(output_dir):
+    """Return the path of the archive conflicts of the last build of output_dir (see archives.py)."""
+    _, index_path = get_index_paths(output_dir)
+    return index_path[:-len(".index.tsv")] + ".archives.tsv"
+
+
+def make_provider_label(mod_name, archive):
+    """How a file in an archive is shown among mods: "Mod <Mod.bsa>" (Windows names can't have "<")."""
+    return f"{mod_name} <{archive}>"
+
+
+def get_provider_mod(label):
+    """The mod of a provider label: the mod name itself, or the mod of an archive (see make_provider_label)."""
+    return label.split(" <", 1)[0]
+
+
+def write_archive_index(output_dir, rows):
+    """
+    Save the Data paths of the last build that are overridden in an archive, in the
+    row layout of the build index: (dest_path, winner, original_path, size, inode,
+    device, mtime_ns, overridden), with archives given by their provider label.
+    A loose winner keeps its build index row, with the archives added to the mods it overrides.
+    """
+    path = get_archive_index_path(output_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(ARCHIVE_INDEX_HEADER + "\n")
+        for dest_path, winner, original_path, size, inode, device, mtime_ns, overridden in rows:
+            f.write(f"{dest_path}\t{winner}\t{original_path}\t{size}\t{inode}\t{device}\t{mtime_ns}"
+                    f"\t{overridden}\n")
+    os.replace(tmp_path, path)
+
+
+def write_build_index(output_dir, meta, entries, overridden=None):
+    """
+    Save the snapshot of a build.
+    entries: list of (dest_path, mod_name, original_path, size, inode, device, mtime_ns, overridden)
+    The source of each entry is the inode that was linked into the Data folder;
+    overridden lists the lower priority mods that also had the file, joined by "|"
+    (a character Windows, and so MO2, does not allow in mod names).
+    overridden: the build's overridden files (see write_overridden_index), if given.
+    """
+    meta_path, index_path = get_index_paths(output_dir)
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+    # Write to temp files and rename so a crash never leaves a half-written snapshot
+    tmp_index = index_path + ".tmp"
+    with open(tmp_index, 'w', encoding='utf-8') as f:
+        f.write(INDEX_HEADER + "\n")
+        for dest_path, mod_name, original_path, size, inode, device, mtime_ns, overridden_mods in entries:
+            f.write(f"{dest_path}\t{mod_name}\t{original_path}\t{size}\t{inode}\t{device}\t{mtime_ns}"
+                    f"\t{overridden_mods}\n")
+    os.replace(tmp_index, index_path)
+    if overridden is not None:
+        write_overridden_index(output_dir, overridden)
+
+    meta = dict(meta, index_version=INDEX_VERSION, file_count=len(entries))
+    tmp_meta = meta_path + ".tmp"
+    with open(tmp_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=4)
+    os.replace(tmp_meta, meta_path)
+
+
+def load_build_meta(output_dir):
+    """Load the metadata of the last build of output_dir, or None if there is none."""
+    meta_path, _ = get_index_paths(output_dir)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_build_index(output_dir):
+    """
+    Load the snapshot of the last build of output_dir.
+    Returns (meta, entries) or (None, None) if no snapshot exists.
+    entries: dict of dest_path -> [mod_name, original_path, size, inode, device, mtime_ns, overridden]
+    overridden is "" for snapshots written before it was recorded (index v1).
+    """
+    meta = load_build_meta(output_dir)
+    if meta is None:
+        return None, None
+    _, index_path = get_index_paths(output_dir)
+    entries = {}
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) < 7:
+                    continue
+                entries[parts[0]] = [parts[1], parts[2], int(parts[3]), int(parts[4]),
+                                     int(parts[5]), int(parts[6]), parts[7] if len(parts) > 7 else ""]
+    except (OSError, ValueError):
+        return None, None
+    return meta, entries
+
+
+def get_entry_source(meta, mod_name, original_path):
+    """Rebuild the full source path of an index entry from the build settings."""
+    if mod_name == "[OVERWRITE]":
+        return os.path.join(meta.get("overwrite_folder") or "", original_path)
+    return os.path.join(meta.get("mods_folder", ""), mod_name, original_path)
+
+
+def get_mod_conflict_stats(output_dir):
+    """
+    Per-mod totals from the snapshot of the last build of output_dir.
+    Returns a dict of mod_name -> {"linked": files in the Data folder from the mod,
+    "linked_size": their bytes, "wins": linked files that override another mod,
+    "losses": files of the mod overridden by a higher priority one},
+    or None if there is no snapshot.
+    """
+    _, entries = load_build_index(output_dir)
+    if entries is None:
+        return None
+    stats = {}
+
+    def mod_stats(mod_name):
+        if mod_name not in stats:
+            stats[mod_name] = {"linked": 0, "linked_size": 0, "wins": 0, "losses": 0}
+        return stats[mod_name]
+
+    for mod_name, original_path, size, inode, device, mtime_ns, overridden in entries.values():
+        winner = mod_stats(mod_name)
+        winner["linked"] += 1
+        winner["linked_size"] += size
+        if overridden:
+            winner["wins"] += 1
+            for loser in overridden.split("|"):
+                mod_stats(loser)["losses"] += 1
+    return stats
+
+
+class BuildIndexReader:
+    """
+    Random access to the rows of a build index without loading it into memory:
+    load() records the byte offset of every row (8 bytes per row) and rows are
+    read and parsed on demand, so a 500k file snapshot can back a table view.
+    A row is (dest_path, mod_name, overridden) with overridden a list of mod
+    names, highest priority first.
+    The rows of the archive index (see write_archive_index) follow those of the
+    build index and replace the build index rows of the same Data paths.
+    """
+
+    # Rows kept parsed for repaints and scrolling back
+    CACHE_ROWS = 4096
+    # Set in the offsets of archive index rows
+    ARCHIVE_ROW = 1 << 63
+
+    def __init__(self, output_dir, offsets=None, replaced=None):
+        _, self.path = get_index_paths(output_dir)
+        self.archive_path = get_archive_index_path(output_dir)
+        self.output_dir = output_dir
+        self.offsets = offsets
+        self.replaced = replaced or set()
+        self._file = None
+        self._archive_file = None
+        self._cache = {}
+
+    def load(self, cancel=None):
+        """Find the offset of every row. Raises OSError if there is no index."""
+        from array import array
+
+        # Data paths the archive index has a row for (only conflicts, so a small set)
+        replaced = set()
+        archive_offsets = array('Q')
+        position = 0
+        try:
+            with open(self.archive_path, 'rb') as f:
+                for line in f:
+                    if not line.startswith(b'#'):
+                        replaced.add(line.split(b'\t', 1)[0])
+                        archive_offsets.append(position | self.ARCHIVE_ROW)
+                    position += len(line)
+        except OSError:
+            pass
+
+        offsets = array('Q')
+        position = 0
+        with open(self.path, 'rb') as f:
+            for i, line in enumerate(f):
+                if i % 65536 == 0:
+                    _check_cancel(cancel)
+                if not line.startswith(b'#') and not (replaced and line.split(b'\t', 1)[0] in replaced):
+                    offsets.append(position)
+                position += len(line)
+        offsets.extend(archive_offsets)
+        self.offsets = offsets
+        self.replaced = replaced
+
+    def copy(self):
+        """A reader sharing the row offsets with its own file handle (for another thread)."""
+        return BuildIndexReader(self.output_dir, self.offsets, self.replaced)
+
+    def __len__(self):
+        return len(self.offsets) if self.offsets is not None else 0
+
+    @staticmethod
+    def parse(line):
+        parts = line.decode('utf-8', 'replace').rstrip('\n').split('\t')
+        overridden = parts[7].split('|')[::-1] if len(parts) > 7 and parts[7] else []
+        return parts[0], parts[1] if len(parts) > 1 else "", overridden
+
+    def _readline(self, offset):
+        """The row at an offset of self.offsets, from the build or the archive index."""
+        if offset & self.ARCHIVE_ROW:
+            if self._archive_file is None:
+                self._archive_file = open(self.archive_path, 'rb')
+            self._archive_file.seek(offset & ~self.ARCHIVE_ROW)
+            return self._archive_file.readline()
+        if self._file is None:
+            self._file = open(self.path, 'rb')
+        self._file.seek(offset)
+        return self._file.readline()
+
+    def row(self, i):
+        if i in self._cache:
+            return self._cache[i]
+        row = self.parse(self._readline(self.offsets[i]))
+        if len(self._cache) >= self.CACHE_ROWS:
+            self._cache.clear()
+        self._cache[i] = row
+        return row
+
+    def search(self, text="", mod=None, only_conflicts=False, rows=None, cancel=None,
+               on_batch=None, batch_size=2048):
+        """
+        Row numbers whose Data path contains text (case-insensitive), limited to rows
+        mod wins or loses and to rows with a conflict if asked. rows narrows an earlier
+        search (typing one more character only checks the previous matches) when that
+        is a small part of the index; otherwise the whole index is read once, in order.
+        on_batch(list of row numbers) is called as matches are found.
+        Returns all matching row numbers.
+        """
+        text = text.lower()
+        # bytes.lower() only folds ASCII, so only ASCII text can pre-filter raw lines
+        text_bytes = text.encode('ascii') if text.isascii() else b''
+        found = []
+        batch = []
+
+        def check(i, dest_path, mod_name, overridden):
+            if only_conflicts and not overridden:
+                return
+            # Files in archives are listed as "Mod <Archive.bsa>"
+            if mod and get_provider_mod(mod_name) != mod and mod not in map(get_provider_mod, overridden):
+                return
+            if text and text not in dest_path.lower():
+                return
+            found.append(i)
+            batch.append(i)
+            if on_batch is not None and len(batch) >= batch_size:
+                on_batch(list(batch))
+                batch.clear()
+
+        if rows is not None and len(rows) * 8 < len(self):
+            reader = self.copy()
+            try:
+                for n, i in enumerate(rows):
+                    if n % 4096 == 0:
+                        _check_cancel(cancel)
+                    check(i, *self.parse(reader._readline(self.offsets[i])))
+            finally:
+                reader.close()
         else:
-            print(f"  No ShaderCache found in either location")
-        return False
+            i = 0
+            for path in (self.path, self.archive_path):
+                if path == self.archive_path and not self.replaced:
+                    break
+                with open(path, 'rb') as f:
+                    for line in f:
+                        if line.startswith(b'#'):
+                            continue
+                        if path == self.path and self.replaced and line.split(b'\t', 1)[0] in self.replaced:
+                            continue
+                        if i % 4096 == 0:
+                            _check_cancel(cancel)
+                        # Most rows don't contain the text anywhere; skip them unparsed
+                        if not text_bytes or text_bytes in line.lower():
+                            check(i, *self.parse(line))
+                        i += 1
+        if on_batch is not None and batch:
+            on_batch(list(batch))
+        return found
+
+    def close(self):
+        for handle in (self._file, self._archive_file):
+            if handle is not None:
+                handle.close()
+        self._file = None
+        self._archive_file = None
+
+
+def scan_mod_size(mod_path, cancel=None):
+    """Return (file count, total bytes) of every file in a mod folder, as a build would scan it."""
+    files = 0
+    size = 0
+    stack = [mod_path]
+    while stack:
+        _check_cancel(cancel)
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            files += 1
+                            size += entry.stat().st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return files, size
+
 
-    print(f"  Source: {source_shadercache}")
-    print(f"  Destination: {dest_shadercache}")
+def get_folder_signature(mod_path, cancel=None):
+    """
+    (newest mtime_ns, folder count) over a mod folder and all its subfolders, without
+    a stat per file. Adding, removing or replacing a file anywhere changes it; editing
+    a file in place does not. Raises OSError if mod_path can't be read.
+    """
+    newest = os.stat(mod_path).st_mtime_ns
+    folders = 1
+    stack = [mod_path]
+    while stack:
+        _check_cancel(cancel)
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            newest = max(newest, entry.stat(follow_symlinks=False).st_mtime_ns)
+                            folders += 1
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return newest, folders
 
-    # Delete existing ShaderCache in overwrite if it exists (will be replaced with Data's version)
-    if os.path.exists(dest_shadercache):
-        if os.path.islink(dest_shadercache):
-            print("  Removing existing symlink in overwrite...")
-            os.remove(dest_shadercache)
+
+def find_reclaimable_files(output_dir, cancel=None):
+    """
+    Files in lower priority mods that no profile of the MO2 instance uses, from the
+    snapshot of the last build of output_dir (nothing is scanned).
+    A file qualifies when, in every profile that enables its mod, a higher priority
+    mod (or overwrite) of that profile also has it; mods no profile enables are left out,
+    and so is the DataFolder mod (the game's own files, moved back on restore).
+    Returns (report, profiles) or None if the last build did not record its overridden files.
+    report: dict of mod_name -> list of (original_path, size, keepers), keepers being
+    the source files that win over it in the profiles (they must still exist to reclaim it).
+    """
+    import datafolder
+
+    meta, entries = load_build_index(output_dir)
+    rows = load_overridden_index(output_dir) if entries is not None else None
+    if rows is None:
+        return None
+
+    # Priority of each enabled mod in every profile of the instance (higher wins)
+    profiles_dir = os.path.dirname(os.path.dirname(meta.get("modlist", "")))
+    profiles = []
+    try:
+        names = sorted(os.listdir(profiles_dir), key=str.lower)
+    except OSError:
+        names = []
+    for name in names:
+        modlist_path = os.path.join(profiles_dir, name, "modlist.txt")
+        if os.path.isfile(modlist_path):
+            enabled = [mod_name for mod_name, is_enabled in read_modlist_entries(modlist_path) if is_enabled]
+            profiles.append((name, {mod_name: -i for i, mod_name in enumerate(enabled)}))
+
+    # Every mod that had each Data path in the build, with its own path to the file
+    providers = {}
+    for dest_path, mod_name, original_path, size in rows:
+        providers.setdefault(dest_path, {})[mod_name] = original_path
+    for dest_path in providers:
+        if dest_path in entries:
+            providers[dest_path][entries[dest_path][0]] = entries[dest_path][1]
+
+    report = {}
+    for n, (dest_path, mod_name, original_path, size) in enumerate(rows):
+        if n % 65536 == 0:
+            _check_cancel(cancel)
+        if mod_name == datafolder.DATAFOLDER_MOD_NAME:
+            continue
+        keepers = set()
+        for profile, priority in profiles:
+            if mod_name not in priority:
+                continue
+            best = None
+            for other, other_path in providers[dest_path].items():
+                rank = float('inf') if other == "[OVERWRITE]" else priority.get(other)
+                if other != mod_name and rank is not None and rank > priority[mod_name]:
+                    if best is None or rank > best[0]:
+                        best = (rank, other, other_path)
+            if best is None:
+                keepers = None
+                break
+            keepers.add(get_entry_source(meta, best[1], best[2]))
+        if keepers:
+            report.setdefault(mod_name, []).append((original_path, size, sorted(keepers)))
+    return report, [name for name, _ in profiles]
+
+
+def reclaim_overridden_files(output_dir, mods=None, archive_dir=None, delete=False, events=None, cancel=None):
+    """
+    List the overridden files no profile uses (see find_reclaimable_files), grouped by mod.
+    With archive_dir they are moved there (as <archive_dir>/<mod>/<path>, ready to be
+    moved back), with delete=True they are deleted; otherwise only the report is logged.
+    mods limits the action to those mods. A file is skipped if it changed since the
+    build or a file that wins over it is gone; files already gone are only counted.
+    Returns the report, or None if there is nothing to report from.
+    """
+    log = make_logger(events)
+    log("=" * 70)
+    log("RECLAIM OVERRIDDEN FILES")
+    log("=" * 70)
+    log(f"Data folder: {output_dir}")
+
+    found = find_reclaimable_files(output_dir, cancel)
+    if found is None:
+        if load_build_meta(output_dir) is None:
+            log("No build snapshot found. Build the Data folder first.")
         else:
-            print("  Removing existing ShaderCache in overwrite...")
-            shutil.rmtree(dest_shadercache)
+            log("The last build did not record its overridden files. Build the Data folder again first.")
+        log("=" * 70)
+        return None
+    report, profiles = found
+    meta = load_build_meta(output_dir) or {}
+    log(f"Snapshot:    {meta.get('generated', 'unknown')}")
+    log(f"Profiles:    {', '.join(profiles) if profiles else 'none found'}")
+    log()
+
+    totals = sorted(((sum(size for _, size, _ in files), mod_name, len(files))
+                     for mod_name, files in report.items()), reverse=True)
+    log("Overridden in every profile:")
+    for size, mod_name, count in totals:
+        log(f"  {format_size(size):>10}  {count:>7} files  {mod_name}")
+    total_size = sum(size for size, _, _ in totals)
+    log(f"  {format_size(total_size):>10}  {sum(count for _, _, count in totals):>7} files  TOTAL")
+    log()
+
+    if archive_dir is None and not delete:
+        log("=" * 70)
+        return report
+
+    archive_device = None
+    if archive_dir:
+        log(f"Moving to: {archive_dir}")
+        os.makedirs(archive_dir, exist_ok=True)
+        archive_device = os.stat(archive_dir).st_dev
+    else:
+        log("Deleting...")
+    keeper_exists = {}
+    gone = set()
+    reclaimed = 0
+    freed = 0
+    skipped = 0
+    already_gone = 0
+    failed = []
+    for mod_name in sorted(report, key=str.lower):
+        if mods is not None and mod_name not in mods:
+            continue
+        mod_folder = get_entry_source(meta, mod_name, "")
+        for n, (original_path, size, keepers) in enumerate(report[mod_name]):
+            if n % 1000 == 0:
+                _check_cancel(cancel)
+            source = os.path.join(mod_folder, original_path)
+            for keeper in keepers:
+                if keeper not in keeper_exists:
+                    keeper_exists[keeper] = os.path.isfile(keeper)
+            try:
+                st = os.lstat(source)
+            except OSError:
+                gone.add((mod_name, original_path))
+                already_gone += 1
+                continue
+            if st.st_size != size or not all(keeper_exists[keeper] for keeper in keepers):
+                skipped += 1
+                continue
+            try:
+                if archive_dir:
+                    dest = os.path.join(archive_dir, mod_name, original_path)
+                    os.makedirs(os.path.dirname(dest), exist_ok=True)
+                    shutil.move(source, dest)
+                else:
+                    os.remove(source)
+            except OSError as e:
+                failed.append((os.path.join(mod_name, original_path), str(e)))
+                continue
+            reclaimed += 1
+            gone.add((mod_name, original_path))
+            # Nothing is freed by a move within the drive, or while the file is still
+            # linked elsewhere (e.g. a parked profile tree)
+            if st.st_nlink == 1 and st.st_dev != archive_device:
+                freed += size
+            # Drop the folders this emptied, up to the mod folder
+            folder = os.path.dirname(source)
+            while len(folder) > len(mod_folder.rstrip(os.sep)):
+                try:
+                    os.rmdir(folder)
+                except OSError:
+                    break
+                folder = os.path.dirname(folder)
+
+    # Keep the list in step with the mod folders until the next build rewrites it
+    if gone:
+        rows = load_overridden_index(output_dir) or []
+        write_overridden_index(output_dir, [row for row in rows if (row[1], row[2]) not in gone])
+
+    log(f"  {'Moved' if archive_dir else 'Deleted'}: {reclaimed} files")
+    log(f"  Space freed: {format_size(freed)} ({freed:,} bytes)")
+    if archive_dir and freed == 0 and reclaimed:
+        log("  The archive folder is on the same drive: delete it to free the space.")
+    if already_gone:
+        log(f"  Already gone from the mod folders: {already_gone}")
+    if skipped:
+        log(f"  Skipped (changed since the build): {skipped}")
+    if failed:
+        log(f"  Failed: {len(failed)}")
+        for rel_path, error in failed[:10]:
+            log(f"    {rel_path}: {error}")
+    log()
+    log("Mod folders changed, the next build will pick this up.")
+    log("=" * 70)
+    return report
+
+
+def get_journal_path(output_dir):
+    """Return the path of the link journal of an in-progress build of output_dir."""
+    name = os.path.basename(os.path.abspath(output_dir.rstrip(os.sep)))
+    return os.path.join(get_state_dir(output_dir), f"{name}.journal")
+
+
+def get_link_order(filemap):
+    """
+    Return the filemap values in the order they are linked: grouped by destination
+    directory and sorted, so every directory is finished before the next one starts
+    and the order is the same on every run with the same mod list.
+    """
+    return sorted(filemap.values(), key=lambda v: (os.path.dirname(v[2]), v[2]))
+
 
-    # Copy ShaderCache from source to overwrite
-    print("  Copying ShaderCache to overwrite folder...")
-    shutil.copytree(source_shadercache, dest_shadercache)
+def get_link_fingerprint(link_order):
+    """Hash of every destination and its source, used to match a journal to a mod list."""
+    digest = hashlib.sha1()
+    for mod_name, original_path, normalized_path, full_source in link_order:
+        digest.update(f"{normalized_path}\t{full_source}\n".encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
 
-    # Count files copied
-    file_count = sum(len(files) for _, _, files in os.walk(dest_shadercache))
-    print(f"  Copied {file_count} files")
 
+def get_source_fingerprint(modlist_path, mods_folder, overwrite_folder=None, enabled_mods=None):
+    """
+    Cheap fingerprint of what a build reads, used to skip unneeded rebuilds: the
+    contents of modlist.txt and plugins.txt plus the mtimes of the mods folder, each
+    enabled mod folder and the overwrite folder. Installing, removing, enabling or
+    reordering mods changes it; editing a file deep inside a mod does not.
+    """
+    digest = hashlib.sha1()
+    for path in (modlist_path, os.path.join(os.path.dirname(modlist_path), 'plugins.txt')):
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+        digest.update(b"\0")
+    if enabled_mods is None:
+        enabled_mods = parse_modlist(modlist_path)
+    folders = [mods_folder] + [os.path.join(mods_folder, mod) for mod in enabled_mods]
+    if overwrite_folder:
+        folders.append(overwrite_folder)
+    for folder in folders:
+        try:
+            digest.update(f"{folder}\t{os.stat(folder).st_mtime_ns}\n".encode('utf-8', 'surrogateescape'))
+        except OSError:
+            digest.update(f"{folder}\t-\n".encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+
+def read_build_journal(output_dir):
+    """
+    Read the link journal of an interrupted build.
+    Returns (header, completed_dirs) or (None, None) if there is no journal.
+    header: dict with fingerprint and started
+    completed_dirs: set of destination directories ('' for the Data root) that were
+    fully linked (no link in them failed) and synced to disk. A torn last line from a crash is ignored.
+    """
+    try:
+        with open(get_journal_path(output_dir), 'r', encoding='utf-8', errors='surrogateescape') as f:
+            lines = f.read().split('\n')
+    except OSError:
+        return None, None
+
+    # The last element is either '' (complete last line) or a torn write
+    lines = lines[:-1]
+    if not lines or not lines[0].startswith(JOURNAL_HEADER):
+        return None, None
+    parts = lines[0].split('\t')
+    if len(parts) < 3:
+        return None, None
+    header = {"fingerprint": parts[1], "started": parts[2]}
+    completed_dirs = {'' if line == '.' else line for line in lines[1:]}
+    return header, completed_dirs
+
+
+def find_interrupted_build(output_dir):
+    """
+    Check whether a build of output_dir was interrupted (power loss, sleep, killed)
+    before it finished. Returns a dict with started and completed_dirs, or None.
+    """
+    if not output_dir or not os.path.isdir(output_dir):
+        return None
+    header, completed_dirs = read_build_journal(output_dir)
+    if header is None:
+        return None
+    return {"started": header["started"], "completed_dirs": len(completed_dirs)}
+
+
+def discard_build_journal(output_dir):
+    """Remove the link journal, e.g. when the build finished or is started over."""
+    try:
+        os.remove(get_journal_path(output_dir))
+    except FileNotFoundError:
+        pass
+
+
+def _fsync_dir(path):
+    """Flush a directory's entries (the hardlinks in it) to disk."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def get_previous_path(output_dir):
+    """Return where the previous Data folder is kept while a new one is built."""
+    name = os.path.basename(os.path.abspath(output_dir.rstrip(os.sep)))
+    return os.path.join(get_state_dir(output_dir), f"{name}.previous")
+
+
+def set_aside_data_folder(output_dir, events=None):
+    """
+    Move the existing Data folder out of the way (a rename into the state folder)
+    so a cancelled or failed build can roll back to it.
+    A partial Data folder left by an interrupted build is deleted instead, keeping
+    whatever previous Data folder was set aside before it.
+    Returns True if the Data folder can be rolled back.
+    """
+    log = make_logger(events)
+    previous = get_previous_path(output_dir)
+    if not os.path.exists(output_dir):
+        return os.path.isdir(previous)
+
+    if os.path.exists(get_journal_path(output_dir)):
+        log("  Deleting partial Data folder left by an interrupted build")
+        shutil.rmtree(output_dir)
+        discard_build_journal(output_dir)
+        return os.path.isdir(previous)
+
+    if os.path.isdir(previous):
+        shutil.rmtree(previous)
+    os.makedirs(os.path.dirname(previous), exist_ok=True)
+    try:
+        os.rename(output_dir, previous)
+        log(f"  Previous Data folder kept until the build finishes: {previous}")
+        return True
+    except OSError as e:
+        log(f"  Could not keep the previous Data folder ({e}), deleting it")
+        shutil.rmtree(output_dir)
+        return False
+
+
+def rollback_data_folder(output_dir):
+    """
+    Put the previous Data folder back after a cancelled or failed build.
+    The partial build is deleted. Returns False if there is nothing to roll back to.
+    """
+    previous = get_previous_path(output_dir)
+    if not os.path.isdir(previous):
+        return False
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.rename(previous, output_dir)
+    discard_build_journal(output_dir)
+    return True
+
+
+def get_trash_dir(output_dir):
+    """Folder (in the state folder, so on the same filesystem) for folders waiting to be deleted."""
+    return os.path.join(get_state_dir(output_dir), "trash")
+
+
+def trash_folder(path, output_dir):
+    """
+    Rename path into the trash of output_dir's state folder, which is instant, so it
+    can be deleted later (see empty_trash). Returns the new path, or None if the
+    rename is not possible (e.g. different filesystem).
+    """
+    trash_dir = get_trash_dir(output_dir)
+    target = os.path.join(trash_dir, f"{os.path.basename(path.rstrip(os.sep))}-{time.time_ns()}")
+    try:
+        os.makedirs(trash_dir, exist_ok=True)
+        os.rename(path, target)
+        return target
+    except OSError:
+        return None
+
+
+def empty_trash(output_dir, background=False):
+    """
+    Delete everything in the trash of output_dir's state folder.
+    With background=True this runs in a daemon thread (leftovers from an interrupted
+    delete are picked up next time) and the thread is returned.
+    """
+    trash_dir = get_trash_dir(output_dir)
+    if not os.path.isdir(trash_dir):
+        return None
+
+    def delete_all():
+        for name in os.listdir(trash_dir):
+            shutil.rmtree(os.path.join(trash_dir, name), ignore_errors=True)
+
+    if not background:
+        delete_all()
+        return None
+    thread = threading.Thread(target=delete_all, name="empty-trash", daemon=True)
+    thread.start()
+    return thread
+
+
+def discard_previous_data_folder(output_dir):
+    """Delete the previous Data folder once the new build has finished."""
+    previous = get_previous_path(output_dir)
+    if os.path.isdir(previous):
+        shutil.rmtree(previous)
+
+
+def get_profile_tree_path(output_dir, profile):
+    """Return where the prebuilt Data folder of an MO2 profile is kept (Data.<profile> next to Data)."""
+    output_dir = os.path.abspath(output_dir.rstrip(os.sep))
+    return f"{output_dir}.{profile}"
+
+
+def get_profile_of_build(output_dir):
+    """Return the MO2 profile the Data folder at output_dir was last built for, or None."""
+    meta = load_build_meta(output_dir)
+    if meta is None or not meta.get("modlist") or not os.path.isdir(output_dir):
+        return None
+    return os.path.basename(os.path.dirname(meta["modlist"]))
+
+
+def list_profile_trees(output_dir):
+    """Return the profiles that have a prebuilt Data folder (the live one included)."""
+    profiles = set()
+    live = get_profile_of_build(output_dir)
+    if live:
+        profiles.add(live)
+    parent = os.path.dirname(os.path.abspath(output_dir.rstrip(os.sep)))
+    prefix = os.path.basename(os.path.abspath(output_dir.rstrip(os.sep))) + "."
+    if os.path.isdir(parent):
+        for name in os.listdir(parent):
+            path = os.path.join(parent, name)
+            if name.startswith(prefix) and os.path.isdir(path) and load_build_meta(path) is not None:
+                profiles.add(name[len(prefix):])
+    return sorted(profiles)
+
+
+def _snapshot_paths(output_dir):
+    """Every file the snapshot of a build of output_dir is kept in."""
+    return get_index_paths(output_dir) + (get_overridden_index_path(output_dir), get_pack_manifest_path(output_dir),
+                                          get_archive_index_path(output_dir))
+
+
+def _move_tree(src, dest):
+    """Rename a built Data folder and its snapshot files."""
+    os.rename(src, dest)
+    for src_file, dest_file in zip(_snapshot_paths(src), _snapshot_paths(dest)):
+        if os.path.exists(src_file):
+            os.replace(src_file, dest_file)
+    meta = load_build_meta(dest)
+    if meta is not None:
+        meta["output_dir"] = os.path.abspath(dest)
+        meta_path, _ = get_index_paths(dest)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=4)
+
+
+def switch_profile_tree(output_dir, profile, events=None):
+    """
+    Make the Data folder the prebuilt tree of an MO2 profile with two renames:
+    the live Data folder is parked as Data.<its profile> and Data.<profile> takes its place.
+    Without a prebuilt tree for profile the live Data folder is only parked (and
+    output_dir no longer exists), ready for a new build.
+    A Data folder with no build snapshot (or an interrupted build) is never moved.
+    Returns True if output_dir now holds a tree built for profile.
+    """
+    log = make_logger(events)
+    current = get_profile_of_build(output_dir)
+    if current == profile:
+        return True
+
+    tree = get_profile_tree_path(output_dir, profile)
+    has_tree = os.path.isdir(tree) and load_build_meta(tree) is not None
+    if os.path.exists(output_dir):
+        if current is None or os.path.exists(get_journal_path(output_dir)):
+            log("  The Data folder was not built for a profile (or its build is unfinished), not switching")
+            return False
+        parked = get_profile_tree_path(output_dir, current)
+        if os.path.exists(parked):
+            shutil.rmtree(parked)
+        _move_tree(output_dir, parked)
+        log(f"  Kept the Data folder of profile '{current}' as: {parked}")
+
+    if not has_tree:
+        return False
+    try:
+        _move_tree(tree, output_dir)
+    except OSError:
+        # Put the previous profile back rather than leaving no Data folder
+        if current is not None:
+            _move_tree(get_profile_tree_path(output_dir, current), output_dir)
+        raise
+    log(f"  Switched the Data folder to profile '{profile}'")
     return True
 
 
-def build_data_folder(modlist_path, mods_folder, output_dir, overwrite_folder=None, filemap_output=None):
+def discard_build_snapshot(output_dir):
+    """Delete the snapshot of the last build of output_dir, once the folder is no longer a build."""
+    for path in _snapshot_paths(output_dir):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def remove_profile_tree(output_dir, profile):
+    """Delete the prebuilt Data folder of a profile (and its snapshot), see empty_trash."""
+    tree = get_profile_tree_path(output_dir, profile)
+    if os.path.isdir(tree) and not trash_folder(tree, output_dir):
+        shutil.rmtree(tree)
+    discard_build_snapshot(tree)
+
+
+def build_data_folder(modlist_path, mods_folder, output_dir, overwrite_folder=None, filemap_output=None,
+                      resume=False, incremental=False, cancel=None, events=None):
     """
     Build the data folder with hardlinked files.
+    resume: continue an interrupted build from its journal (see find_interrupted_build)
+    incremental: update an existing Data folder in place. Files already hardlinked to
+                 the right source are kept, files the last build linked that are no
+                 longer in the filemap are removed, everything else is (re)linked.
+    cancel: optional token with is_set() (e.g. threading.Event), checked while scanning
+            and linking; raises BuildCancelled when set
+    events: optional callable receiving LogEvent (each output line), ProgressEvent (per mod
+            while scanning, every 256 files while linking), FailureEvent and a final
+            FinishedEvent. Without it the output is printed.
+    Returns a BuildResult.
     """
-    print("=" * 70)
-    print("DATA FOLDER BUILDER")
-    print("=" * 70)
-    print(f"Modlist:     {modlist_path}")
-    print(f"Mods folder: {mods_folder}")
-    print(f"Overwrite:   {overwrite_folder if overwrite_folder else 'Not specified'}")
-    print(f"Output:      {output_dir}")
-    print("=" * 70)
-    print()
+    log = make_logger(events)
+    result = BuildResult(output_dir)
+    build_started = time.monotonic()
+
+    log("=" * 70)
+    log("DATA FOLDER BUILDER")
+    log("=" * 70)
+    log(f"Modlist:     {modlist_path}")
+    log(f"Mods folder: {mods_folder}")
+    log(f"Overwrite:   {overwrite_folder if overwrite_folder else 'Not specified'}")
+    log(f"Output:      {output_dir}")
+    log("=" * 70)
+    log()
 
     # Step 1: Parse modlist (bottom to top order)
-    print("Step 1: Reading modlist.txt (bottom to top)...")
+    log("Step 1: Reading modlist.txt (bottom to top)...")
     enabled_mods = parse_modlist(modlist_path)
-    print(f"  Found {len(enabled_mods)} enabled mods")
-    print(f"  First mod (lowest priority): {enabled_mods[0] if enabled_mods else 'None'}")
-    print(f"  Last mod (highest priority): {enabled_mods[-1] if enabled_mods else 'None'}")
-    print()
+    log(f"  Found {len(enabled_mods)} enabled mods")
+    log(f"  First mod (lowest priority): {enabled_mods[0] if enabled_mods else 'None'}")
+    log(f"  Last mod (highest priority): {enabled_mods[-1] if enabled_mods else 'None'}")
+    source_fingerprint = get_source_fingerprint(modlist_path, mods_folder, overwrite_folder, enabled_mods)
+    log()
 
     # Step 2: Collect all folder name variants and build the folder name map
-    print("Step 2: Analyzing folder names across all mods...")
-    folder_variants = collect_all_folders(modlist_path, mods_folder, overwrite_folder)
+    phase_started = time.monotonic()
+    log("Step 2: Analyzing folder names across all mods...")
+    folder_variants = collect_all_folders(modlist_path, mods_folder, overwrite_folder,
+                                          cancel=cancel, events=events)
     folder_map = build_folder_name_map(folder_variants)
 
     # Count conflicts
     conflicts = [(k, v) for k, v in folder_variants.items() if len(v) > 1]
-    print(f"  Total unique folders: {len(folder_map)}")
-    print(f"  Folder name conflicts resolved: {len(conflicts)}")
+    log(f"  Total unique folders: {len(folder_map)}")
+    log(f"  Folder name conflicts resolved: {len(conflicts)}")
     if conflicts:
-        print("  Conflicts (showing first 10):")
+        log("  Conflicts (showing first 10):")
         for lowercase_name, variants in conflicts[:10]:
             winner = folder_map[lowercase_name]
-            print(f"    {lowercase_name}: {variants} -> '{winner}'")
+            log(f"    {lowercase_name}: {variants} -> '{winner}'")
         if len(conflicts) > 10:
-            print(f"    ... and {len(conflicts) - 10} more")
-    print()
+            log(f"    ... and {len(conflicts) - 10} more")
+    log()
 
     # Step 3: Build filemap
     # Key: match_key (fully lowercase for case-insensitive matching)
     # Value: (mod_name, original_path_in_mod, normalized_dest_path, full_source_path)
-    print("Step 3: Building filemap...")
-    print("  (Conflicting folders use most-uppercase variant, filenames preserve original case)")
+    result.timings["scan"] = time.monotonic() - phase_started
+    phase_started = time.monotonic()
+    log("Step 3: Building filemap...")
+    log("  (Conflicting folders use most-uppercase variant, filenames preserve original case)")
     filemap = {}
     overrides = 0
     size_overridden = 0  # Total size of files that were overridden (not used)
+    mod_file_counts = {}  # Files in each mod (saved in the snapshot, e.g. for the restore dialog)
+    overridden_mods = {}  # match_key -> lower priority mods that lost the file, lowest first
+    overridden_files = []  # (match_key, mod_name, original_path, size) of every file that lost
+    started = time.monotonic()
 
     for i, mod_name in enumerate(enabled_mods):
+        _check_cancel(cancel)
+        _report_progress(events, "Building filemap", i, len(enabled_mods), started, unit="mods")
         mod_path = os.path.join(mods_folder, mod_name)
 
         if not os.path.exists(mod_path):
-            print(f"  WARNING: Mod folder not found: {mod_name}")
+            log(f"  WARNING: Mod folder not found: {mod_name}")
             continue
 
         files = scan_mod_files(mod_path)
+        mod_file_counts[mod_name] = len(files)
         mod_overrides = 0
 
         for original_path, match_key in files:
@@ -322,36 +1580,32 @@ def build_data_folder(modlist_path, mods_folder, output_dir, overwrite_folder=No
                 size_overridden += old_size
                 mod_overrides += 1
                 overrides += 1
+                overridden_mods.setdefault(match_key, []).append(old_mod)
+                overridden_files.append((match_key, old_mod, old_path, old_size))
 
             # Add/replace in filemap (higher priority mod always wins)
             filemap[match_key] = (mod_name, original_path, normalized_path, full_source)
 
         # Progress
         if (i + 1) % 50 == 0:
-            print(f"  Processed {i + 1}/{len(enabled_mods)} mods...")
+            log(f"  Processed {i + 1}/{len(enabled_mods)} mods...")
 
-    print(f"  Total files in filemap: {len(filemap)}")
-    print(f"  Total overrides (files replaced by higher priority): {overrides}")
-    print(f"  Size of overridden files (unused): {format_size(size_overridden)}")
-    print()
+    _report_progress(events, "Building filemap", len(enabled_mods), len(enabled_mods), started, unit="mods")
+    log(f"  Total files in filemap: {len(filemap)}")
+    log(f"  Total overrides (files replaced by higher priority): {overrides}")
+    log(f"  Size of overridden files (unused): {format_size(size_overridden)}")
+    log()
 
     # Step 4: Process overwrite folder (highest priority)
-    # Note: ShaderCache files are excluded here - they will be copied separately
     overwrite_count = 0
     overwrite_overrides = 0
-    shadercache_skipped = 0
     size_overridden_by_overwrite = 0  # Size of files overridden by overwrite folder
     if overwrite_folder and os.path.exists(overwrite_folder):
-        print("Step 4: Processing overwrite folder (highest priority)...")
+        log("Step 4: Processing overwrite folder (highest priority)...")
+        _check_cancel(cancel)
         overwrite_files = scan_mod_files(overwrite_folder)
 
         for original_path, match_key in overwrite_files:
-            # Skip files inside ShaderCache folder - they will be copied separately
-            path_parts = original_path.split(os.sep)
-            if path_parts and path_parts[0].lower() == "shadercache":
-                shadercache_skipped += 1
-                continue
-
             full_source = os.path.join(overwrite_folder, original_path)
             normalized_path = normalize_path_with_map(original_path, folder_map)
 
@@ -365,27 +1619,27 @@ def build_data_folder(modlist_path, mods_folder, output_dir, overwrite_folder=No
                 size_overridden_by_overwrite += old_size
                 size_overridden += old_size  # Add to total overridden
                 overwrite_overrides += 1
+                overridden_mods.setdefault(match_key, []).append(old_mod)
+                overridden_files.append((match_key, old_mod, old_path, old_size))
 
             filemap[match_key] = ("[OVERWRITE]", original_path, normalized_path, full_source)
             overwrite_count += 1
 
-        print(f"  Files from overwrite: {overwrite_count}")
-        print(f"  Files overridden by overwrite: {overwrite_overrides}")
-        print(f"  Size of files overridden by overwrite: {format_size(size_overridden_by_overwrite)}")
-        if shadercache_skipped > 0:
-            print(f"  ShaderCache files skipped (will be copied separately): {shadercache_skipped}")
-        print()
+        log(f"  Files from overwrite: {overwrite_count}")
+        log(f"  Files overridden by overwrite: {overwrite_overrides}")
+        log(f"  Size of files overridden by overwrite: {format_size(size_overridden_by_overwrite)}")
+        log()
     else:
         size_overridden_by_overwrite = 0
         if overwrite_folder:
-            print("Step 4: Overwrite folder not found, skipping...")
+            log("Step 4: Overwrite folder not found, skipping...")
         else:
-            print("Step 4: No overwrite folder specified, skipping...")
-        print()
+            log("Step 4: No overwrite folder specified, skipping...")
+        log()
 
     # Step 5: Save filemap to file (optional)
     if filemap_output:
-        print(f"Step 4: Saving filemap to {filemap_output}...")
+        log(f"Step 4: Saving filemap to {filemap_output}...")
         with open(filemap_output, 'w', encoding='utf-8') as f:
             f.write("=" * 100 + "\n")
             f.write("FILEMAP - Files to be hardlinked into data folder\n")
@@ -411,187 +1665,368 @@ def build_data_folder(modlist_path, mods_folder, output_dir, overwrite_folder=No
             f.write("\n" + "=" * 100 + "\n")
             f.write("END OF FILEMAP\n")
             f.write("=" * 100 + "\n")
-        print(f"  Filemap saved.")
-        print()
+        log(f"  Filemap saved.")
+        log()
 
     # Step 6: Create output directory
-    print(f"Step 6: Preparing output directory...")
+    _check_cancel(cancel)
+    result.timings["filemap"] = time.monotonic() - phase_started
+    phase_started = time.monotonic()
+    log(f"Step 6: Preparing output directory...")
+    link_order = get_link_order(filemap)
+    fingerprint = get_link_fingerprint(link_order)
+    # Destination -> the mods it overrides, for the snapshot (per-mod conflict stats)
+    overridden_by_dest = {filemap[key][2]: "|".join(mods) for key, mods in overridden_mods.items()}
+    # Every file that lost, under the Data path it lost (for reclaiming their space)
+    overridden_rows = [(filemap[key][2], old_mod, old_path, old_size)
+                       for key, old_mod, old_path, old_size in overridden_files]
+    completed_dirs = set()
+    journal_header = None
+    if resume:
+        journal_header, journaled_dirs = read_build_journal(output_dir)
+        if journal_header is not None and journal_header["fingerprint"] == fingerprint:
+            completed_dirs = journaled_dirs
+            log(f"  Resuming build interrupted after {journal_header['started']}")
+            log(f"  {len(completed_dirs)} folders were already linked and will be skipped")
+        elif incremental:
+            # An incremental build checks every link anyway, so the partial folder is reused
+            journal_header = None
+            log("  Interrupted build does not match the current mod list, updating it incrementally")
+        else:
+            # The mod list changed since the interrupted build, its partial links can't be trusted
+            journal_header = None
+            log("  Interrupted build does not match the current mod list, starting over")
+            if os.path.exists(output_dir):
+                shutil.rmtree(output_dir)
     if os.path.exists(output_dir):
-        print(f"  Output directory exists: {output_dir}")
-        print(f"  Existing files will be overwritten if they conflict.")
+        log(f"  Output directory exists: {output_dir}")
+        log(f"  Existing files will be overwritten if they conflict.")
     else:
         os.makedirs(output_dir)
-        print(f"  Created: {output_dir}")
-    print()
+        log(f"  Created: {output_dir}")
+
+    # Start a new journal, or keep appending to the one being resumed
+    journal_path = get_journal_path(output_dir)
+    os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+    if journal_header is None:
+        with open(journal_path, 'w', encoding='utf-8') as f:
+            f.write(f"{JOURNAL_HEADER}\t{fingerprint}\t{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.flush()
+            os.fsync(f.fileno())
+    journal = open(journal_path, 'a', encoding='utf-8', errors='surrogateescape')
+
+    # Incremental: remove what the last build linked that is no longer wanted
+    removed = 0
+    if incremental:
+        _, last_entries = load_build_index(output_dir)
+        if last_entries:
+            wanted = set(normalized_path for _, _, normalized_path, _ in link_order)
+            emptied_dirs = set()
+            for dest_path in last_entries:
+                if dest_path in wanted:
+                    continue
+                try:
+                    os.remove(os.path.join(output_dir, dest_path))
+                    removed += 1
+                    emptied_dirs.add(os.path.dirname(dest_path))
+                except FileNotFoundError:
+                    pass
+            # Drop folders left empty, deepest first
+            for rel_dir in sorted(emptied_dirs, key=lambda d: d.count(os.sep), reverse=True):
+                while rel_dir:
+                    try:
+                        os.rmdir(os.path.join(output_dir, rel_dir))
+                    except OSError:
+                        break
+                    rel_dir = os.path.dirname(rel_dir)
+            log(f"  Incremental build: removed {removed} files no longer in the mod list")
+    log()
 
     # Step 7: Create hardlinks
-    print("Step 7: Creating hardlinks...")
+    log("Step 7: Creating hardlinks...")
     created = 0
+    resumed = 0
+    unchanged = 0
     failed = 0
     failed_files = []
-    total = len(filemap)
+    total = len(link_order)
 
     # Track file sizes
     size_linked = 0  # Total size of successfully linked files
     size_failed = 0  # Total size of failed files
 
-    for i, (match_key, (mod_name, original_path, normalized_path, full_source)) in enumerate(filemap.items()):
-        # Destination: output_dir + normalized_path (lowercase folders, original filename)
-        dest_file = os.path.join(output_dir, normalized_path)
-
-        # Create directory structure
-        dest_dir = os.path.dirname(dest_file)
-        if dest_dir and not os.path.exists(dest_dir):
-            os.makedirs(dest_dir)
+    # Snapshot of every linked file, used by verify/repair
+    index_entries = []
+
+    started = time.monotonic()
+
+    # Finished directories waiting for the next checkpoint; directories with a failed
+    # link are never recorded, so a resumed build retries them
+    pending_dirs = []
+    failed_dirs = set()
+    current_dir = None
+    since_checkpoint = 0
+
+    def checkpoint():
+        # Sync the links in each finished directory before recording it as done
+        for rel_dir in pending_dirs:
+            _fsync_dir(os.path.join(output_dir, rel_dir))
+            journal.write(f"{rel_dir or '.'}\n")
+        journal.flush()
+        os.fsync(journal.fileno())
+        pending_dirs.clear()
+
+    try:
+        for i, (mod_name, original_path, normalized_path, full_source) in enumerate(link_order):
+            if i % 256 == 0:
+                _check_cancel(cancel)
+                _report_progress(events, "Linking", i, total, started, size_linked)
+
+            # Destination: output_dir + normalized_path (lowercase folders, original filename)
+            dest_file = os.path.join(output_dir, normalized_path)
+            rel_dir = os.path.dirname(normalized_path)
+            dest_dir = os.path.dirname(dest_file)
+
+            if rel_dir != current_dir:
+                if current_dir is not None and current_dir not in completed_dirs and current_dir not in failed_dirs:
+                    pending_dirs.append(current_dir)
+                current_dir = rel_dir
+                if since_checkpoint >= CHECKPOINT_INTERVAL:
+                    checkpoint()
+                    since_checkpoint = 0
+
+            # Stat the source before attempting link (size for stats, inode for the snapshot)
+            try:
+                source_stat = os.stat(full_source)
+                file_size = source_stat.st_size
+            except OSError:
+                source_stat = None
+                file_size = 0
+
+            # Folder finished by the interrupted build, only its snapshot entries are needed
+            if rel_dir in completed_dirs and source_stat is not None:
+                resumed += 1
+                size_linked += file_size
+                index_entries.append((normalized_path, mod_name, original_path, file_size,
+                                      source_stat.st_ino, source_stat.st_dev, source_stat.st_mtime_ns,
+                                      overridden_by_dest.get(normalized_path, "")))
+                continue
 
-        # Get file size before attempting link
+            # Incremental build: the right file is already linked here
+            if incremental and source_stat is not None:
+                try:
+                    dest_stat = os.lstat(dest_file)
+                except OSError:
+                    dest_stat = None
+                if (dest_stat is not None and
+                        (dest_stat.st_ino, dest_stat.st_dev) == (source_stat.st_ino, source_stat.st_dev)):
+                    unchanged += 1
+                    size_linked += file_size
+                    index_entries.append((normalized_path, mod_name, original_path, file_size,
+                                          source_stat.st_ino, source_stat.st_dev, source_stat.st_mtime_ns,
+                                          overridden_by_dest.get(normalized_path, "")))
+                    continue
+
+            # Create directory structure
+            if dest_dir and not os.path.exists(dest_dir):
+                os.makedirs(dest_dir)
+
+            # Create hardlink
+            try:
+                # Remove existing file if present
+                if os.path.lexists(dest_file):
+                    os.remove(dest_file)
+
+                # Verify source exists
+                if source_stat is None:
+                    raise FileNotFoundError(f"Source file not found: {full_source}")
+
+                os.link(full_source, dest_file)
+                created += 1
+                since_checkpoint += 1
+                size_linked += file_size
+                index_entries.append((normalized_path, mod_name, original_path, file_size,
+                                      source_stat.st_ino, source_stat.st_dev, source_stat.st_mtime_ns,
+                                      overridden_by_dest.get(normalized_path, "")))
+
+            except Exception as e:
+                failed += 1
+                size_failed += file_size
+                failed_files.append((full_source, dest_file, str(e), file_size))
+                failed_dirs.add(rel_dir)
+                _emit(events, FailureEvent(full_source, dest_file, str(e), file_size))
+
+            # Progress
+            if (i + 1) % 5000 == 0 or (i + 1) == total:
+                pct = (i + 1) * 100 // total
+                log(f"  Progress: {i + 1}/{total} ({pct}%) - Created: {created}, Failed: {failed}")
+    except (BuildCancelled, KeyboardInterrupt):
+        # Record the finished folders so the partial build can still be resumed
+        checkpoint()
+        raise
+    finally:
+        journal.close()
+
+    _report_progress(events, "Linking", total, total, started, size_linked)
+    log()
+
+    # Step 8: Save build snapshot (used by verify/repair)
+    result.timings["link"] = time.monotonic() - phase_started
+    phase_started = time.monotonic()
+    log("Step 8: Saving build snapshot...")
+    try:
+        write_build_index(output_dir, {
+            "generated": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "modlist": os.path.abspath(modlist_path),
+            "mods_folder": os.path.abspath(mods_folder),
+            "overwrite_folder": os.path.abspath(overwrite_folder) if overwrite_folder else None,
+            "output_dir": os.path.abspath(output_dir),
+            "enabled_mods": len(enabled_mods),
+            "created": created + resumed + unchanged,
+            "failed": failed,
+            "overrides": overrides,
+            "size_linked": size_linked,
+            "mod_file_counts": mod_file_counts,
+            "source_fingerprint": source_fingerprint,
+        }, index_entries, overridden=overridden_rows)
+        log(f"  Snapshot saved to: {get_state_dir(output_dir)}")
+    except OSError as e:
+        log(f"  WARNING: Could not save build snapshot: {e}")
+
+    # The build is complete, nothing left to resume
+    discard_build_journal(output_dir)
+    result.timings["snapshot"] = time.monotonic() - phase_started
+
+    # Step 9: What loose files and archives override in other archives
+    phase_started = time.monotonic()
+    log("Step 9: Reading archive file tables...")
+    try:
+        import archives
+
+        archive_stats = archives.index_archives(
+            output_dir, index_entries, os.path.join(os.path.dirname(modlist_path), 'plugins.txt'),
+            cancel=cancel, events=events)
+        result.archive_overrides = archive_stats["loose_overrides"] + archive_stats["archive_overrides"]
+    except (BuildCancelled, OSError) as e:
+        if isinstance(e, BuildCancelled):
+            log("  Skipped (cancelled), the build itself is complete")
+        else:
+            log(f"  WARNING: Could not index the archives: {e}")
+        # Don't leave the previous build's archive conflicts next to this build's index
         try:
-            file_size = os.path.getsize(full_source) if os.path.exists(full_source) else 0
+            write_archive_index(output_dir, [])
         except OSError:
-            file_size = 0
-
-        # Create hardlink
-        try:
-            # Remove existing file if present
-            if os.path.exists(dest_file):
-                os.remove(dest_file)
-
-            # Verify source exists
-            if not os.path.exists(full_source):
-                raise FileNotFoundError(f"Source file not found: {full_source}")
-
-            os.link(full_source, dest_file)
-            created += 1
-            size_linked += file_size
-
-        except Exception as e:
-            failed += 1
-            size_failed += file_size
-            failed_files.append((full_source, dest_file, str(e), file_size))
-
-        # Progress
-        if (i + 1) % 5000 == 0 or (i + 1) == total:
-            pct = (i + 1) * 100 // total
-            print(f"  Progress: {i + 1}/{total} ({pct}%) - Created: {created}, Failed: {failed}")
-
-    print()
-    print("=" * 70)
-    print("SUMMARY")
-    print("=" * 70)
-    print(f"Total files in filemap: {total}")
-    print(f"Hardlinks created:      {created}")
-    print(f"Failed:                 {failed}")
-    print(f"Files overridden:       {overrides}")
-    print(f"Data folder:            {output_dir}")
-    print()
-    print(f"Size of files linked to Data:     {format_size(size_linked)} ({size_linked:,} bytes)")
-    print(f"Size of overridden files (unused): {format_size(size_overridden)} ({size_overridden:,} bytes)")
+            pass
+    result.timings["archives"] = time.monotonic() - phase_started
+    result.timings["total"] = time.monotonic() - build_started
+
+    log()
+    log("=" * 70)
+    log("SUMMARY")
+    log("=" * 70)
+    log(f"Total files in filemap: {total}")
+    log(f"Hardlinks created:      {created}")
+    if resumed:
+        log(f"Resumed (already linked): {resumed}")
+    if incremental:
+        log(f"Unchanged (incremental):  {unchanged}")
+        log(f"Removed (incremental):    {removed}")
+    log(f"Failed:                 {failed}")
+    log(f"Files overridden:       {overrides}")
+    log(f"Data folder:            {output_dir}")
+    log(f"Build time:             {result.timings['total']:.1f}s "
+        f"(scan {result.timings['scan']:.1f}s, filemap {result.timings['filemap']:.1f}s, "
+        f"link {result.timings['link']:.1f}s)")
+    log()
+    log(f"Size of files linked to Data:     {format_size(size_linked)} ({size_linked:,} bytes)")
+    log(f"Size of overridden files (unused): {format_size(size_overridden)} ({size_overridden:,} bytes)")
     if size_failed > 0:
-        print(f"Size of failed files:              {format_size(size_failed)} ({size_failed:,} bytes)")
+        log(f"Size of failed files:              {format_size(size_failed)} ({size_failed:,} bytes)")
 
     # Handle failures
     if failed_files:
-        print()
-        print("FAILURES (first 10):")
+        log()
+        log("FAILURES (first 10):")
         for source, dest, error, fsize in failed_files[:10]:
-            print(f"  Source: {source}")
-            print(f"  Dest:   {dest}")
-            print(f"  Size:   {format_size(fsize)}")
-            print(f"  Error:  {error}")
-            print()
+            log(f"  Source: {source}")
+            log(f"  Dest:   {dest}")
+            log(f"  Size:   {format_size(fsize)}")
+            log(f"  Error:  {error}")
+            log()
 
         if len(failed_files) > 10:
-            print(f"  ... and {len(failed_files) - 10} more failures")
+            log(f"  ... and {len(failed_files) - 10} more failures")
 
     # Print build log to stdout (captured by GUI)
-    print()
-    print("=" * 80)
-    print("DATA FOLDER BUILD LOG")
-    print("=" * 80)
-    print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Modlist: {modlist_path}")
-    print(f"Mods folder: {mods_folder}")
-    print(f"Overwrite folder: {overwrite_folder if overwrite_folder else 'Not specified'}")
-    print(f"Output folder: {output_dir}")
-    print()
-    print("-" * 80)
-    print("FILE STATISTICS")
-    print("-" * 80)
-    print(f"Total enabled mods: {len(enabled_mods)}")
-    print(f"Total files in filemap: {total}")
-    print(f"Hardlinks created: {created}")
-    print(f"Failed: {failed}")
-    print(f"Files overridden (not used): {overrides}")
-    print(f"Folder name conflicts resolved: {len(conflicts)}")
-    print(f"Overwrite files: {overwrite_count}")
-    print(f"Overwrite overrides: {overwrite_overrides}")
-    print(f"ShaderCache files skipped: {shadercache_skipped}")
-    print()
-    print("-" * 80)
-    print("SIZE STATISTICS")
-    print("-" * 80)
-    print(f"Total size of files linked to Data folder:  {format_size(size_linked)} ({size_linked:,} bytes)")
-    print(f"Total size of overridden files (unused):    {format_size(size_overridden)} ({size_overridden:,} bytes)")
-    print(f"Total size of failed files:                 {format_size(size_failed)} ({size_failed:,} bytes)")
-    print()
-    print("NOTE: 'Overridden files' are files in lower-priority mods that were replaced")
-    print("      by higher-priority mods. These files are not used in the game and could")
-    print("      potentially be deleted to save disk space.")
-    print()
+    log()
+    log("=" * 80)
+    log("DATA FOLDER BUILD LOG")
+    log("=" * 80)
+    log(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    log(f"Modlist: {modlist_path}")
+    log(f"Mods folder: {mods_folder}")
+    log(f"Overwrite folder: {overwrite_folder if overwrite_folder else 'Not specified'}")
+    log(f"Output folder: {output_dir}")
+    log()
+    log("-" * 80)
+    log("FILE STATISTICS")
+    log("-" * 80)
+    log(f"Total enabled mods: {len(enabled_mods)}")
+    log(f"Total files in filemap: {total}")
+    log(f"Hardlinks created: {created}")
+    log(f"Failed: {failed}")
+    log(f"Files overridden (not used): {overrides}")
+    log(f"Folder name conflicts resolved: {len(conflicts)}")
+    log(f"Overwrite files: {overwrite_count}")
+    log(f"Overwrite overrides: {overwrite_overrides}")
+    log()
+    log("-" * 80)
+    log("SIZE STATISTICS")
+    log("-" * 80)
+    log(f"Total size of files linked to Data folder:  {format_size(size_linked)} ({size_linked:,} bytes)")
+    log(f"Total size of overridden files (unused):    {format_size(size_overridden)} ({size_overridden:,} bytes)")
+    log(f"Total size of failed files:                 {format_size(size_failed)} ({size_failed:,} bytes)")
+    log()
+    log("NOTE: 'Overridden files' are files in lower-priority mods that were replaced")
+    log("      by higher-priority mods. These files are not used in the game and could")
+    log("      potentially be deleted to save disk space.")
+    log("      Use Reclaim Space (or build_data_folder.py --reclaim) to list the ones")
+    log("      no profile uses and move them away or delete them.")
+    log()
 
     if failed_files:
-        print("-" * 80)
-        print("FAILED FILES")
-        print("-" * 80)
+        log("-" * 80)
+        log("FAILED FILES")
+        log("-" * 80)
         for source, dest, error, fsize in failed_files:
-            print(f"Source: {source}")
-            print(f"Dest:   {dest}")
-            print(f"Size:   {format_size(fsize)} ({fsize:,} bytes)")
-            print(f"Error:  {error}")
-            print("-" * 40)
-
-    print()
-    print("=" * 80)
-    print("END OF LOG")
-    print("=" * 80)
-
-
-def copy_shadercache_to_data(overwrite_folder, output_dir):
-    """
-    Copy ShaderCache from overwrite folder to the new Data folder.
-    This creates a separate copy so the game can modify it freely.
-    """
-    if not overwrite_folder:
-        return False
-
-    source_shadercache = os.path.join(overwrite_folder, "ShaderCache")
-    dest_shadercache = os.path.join(output_dir, "ShaderCache")
-
-    if not os.path.exists(source_shadercache) or not os.path.isdir(source_shadercache):
-        print("  No ShaderCache found in overwrite folder")
-        return False
-
-    print(f"  Source: {source_shadercache}")
-    print(f"  Destination: {dest_shadercache}")
-
-    # Remove existing ShaderCache in Data folder if it exists
-    if os.path.exists(dest_shadercache):
-        if os.path.islink(dest_shadercache):
-            print("  Removing existing symlink...")
-            os.remove(dest_shadercache)
-        else:
-            print("  Removing existing ShaderCache folder...")
-            shutil.rmtree(dest_shadercache)
-
-    # Copy ShaderCache to Data folder
-    print("  Copying ShaderCache to Data folder...")
-    shutil.copytree(source_shadercache, dest_shadercache)
-
-    # Count files copied
-    file_count = sum(len(files) for _, _, files in os.walk(dest_shadercache))
-    print(f"  Copied {file_count} files")
-
-    return True
+            log(f"Source: {source}")
+            log(f"Dest:   {dest}")
+            log(f"Size:   {format_size(fsize)} ({fsize:,} bytes)")
+            log(f"Error:  {error}")
+            log("-" * 40)
+
+    log()
+    log("=" * 80)
+    log("END OF LOG")
+    log("=" * 80)
+
+    result.enabled_mods = len(enabled_mods)
+    result.total = total
+    result.created = created
+    result.resumed = resumed
+    result.unchanged = unchanged
+    result.removed = removed
+    result.failed = failed
+    result.overrides = overrides
+    result.folder_conflicts = len(conflicts)
+    result.overwrite_files = overwrite_count
+    result.overwrite_overrides = overwrite_overrides
+    result.size_linked = size_linked
+    result.size_overridden = size_overridden
+    result.size_failed = size_failed
+    result.failures = failed_files
+    _emit(events, FinishedEvent(result))
+    return result
 
 
 def check_file_source(modlist_path, mods_folder, file_to_check):
@@ -655,18 +2090,438 @@ def check_file_source(modlist_path, mods_folder, file_to_check):
         print("=" * 70)
 
 
+def _lstat_many(paths):
+    """lstat a batch of paths, returning None for paths that don't exist."""
+    results = []
+    for path in paths:
+        try:
+            results.append(os.lstat(path))
+        except OSError:
+            results.append(None)
+    return results
+
+
+def count_verify_problems(results):
+    """
+    Number of problems a verify (see verify_data_folder) leaves in the Data folder:
+    missing and broken files (after a repair, those it could not fix) and missing
+    pack archives. Edited mod sources and foreign files are not problems.
+    """
+    if "repair_failed" in results:
+        problems = len(results["repair_failed"])
+    else:
+        problems = len(results["missing"]) + len(results["broken"])
+    return problems + len(results.get("missing_packs", []))
+
+
+def verify_data_folder(output_dir, repair=False, workers=16, events=None):
+    """
+    Compare the Data folder against the snapshot of the last build.
+
+    Every snapshot entry is stat'ed in parallel and classified as:
+    - missing:  the file is gone from the Data folder
+    - broken:   the file was replaced by a different file (hardlink broken)
+    - modified: still our hardlink, but the mod source was edited through it
+    Files in the Data folder that are not in the snapshot are reported as foreign.
+    Files packed into archives (see pack.py) are not checked, only that the archives are there.
+
+    With repair=True, missing and broken entries are re-linked from their source
+    and modified entries are accepted into the snapshot. Foreign files are left alone.
+
+    Returns a dict of category -> list of relative paths (plus "missing_packs" and, with
+    repair, "repair_failed"), or None if there is no snapshot. See count_verify_problems.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    log = make_logger(events)
+    log("=" * 70)
+    log("DATA FOLDER VERIFY")
+    log("=" * 70)
+    log(f"Data folder: {output_dir}")
+
+    meta, entries = load_build_index(output_dir)
+    if entries is None:
+        log("No build snapshot found. Build the Data folder first.")
+        log("=" * 70)
+        return None
+
+    log(f"Snapshot:    {meta.get('generated', 'unknown')} ({len(entries)} files)")
+
+    # Files packed into archives are not linked loose; the archives and their plugins are ours
+    packs = (load_pack_manifest(output_dir) or {}).get("packs", [])
+    packed = set()
+    pack_files = set()
+    for pack in packs:
+        packed.update(pack["files"])
+        pack_files.update((pack["plugin"], pack["archive"]))
+    if packs:
+        log(f"Packed:      {len(packed)} files in {len(packs)} archives")
+    log()
+
+    # Stat every snapshot entry in parallel (batched to keep thread overhead low)
+    dest_paths = [p for p in entries if p not in packed]
+    log(f"Checking {len(dest_paths)} files...")
+    batches = [
+        [os.path.join(output_dir, p) for p in dest_paths[i:i + 1024]]
+        for i in range(0, len(dest_paths), 1024)
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        stats = [st for batch in pool.map(_lstat_many, batches) for st in batch]
+
+    results = {"missing": [], "broken": [], "modified": [], "foreign": []}
+    for dest_path, st in zip(dest_paths, stats):
+        mod_name, original_path, size, inode, device, mtime_ns = entries[dest_path][:6]
+        if st is None:
+            results["missing"].append(dest_path)
+        elif (st.st_ino, st.st_dev) != (inode, device):
+            results["broken"].append(dest_path)
+        elif st.st_size != size or st.st_mtime_ns != mtime_ns:
+            results["modified"].append(dest_path)
+
+    # Anything in the Data folder we did not put there (symlinks such as plugins.txt are ours)
+    log("Looking for foreign files...")
+    for root, dirs, filenames in os.walk(output_dir):
+        rel_root = os.path.relpath(root, output_dir)
+        for filename in filenames:
+            rel_path = filename if rel_root == '.' else os.path.join(rel_root, filename)
+            if (rel_path not in entries and rel_path not in pack_files
+                    and not os.path.islink(os.path.join(root, filename))):
+                results["foreign"].append(rel_path)
+    missing_packs = sorted(name for name in pack_files if not os.path.exists(os.path.join(output_dir, name)))
+    log()
+
+    descriptions = {
+        "missing": "Missing (deleted from Data)",
+        "broken": "Broken links (replaced by a copy)",
+        "modified": "Modified (edited through to the mod source)",
+        "foreign": "Foreign (not created by the build)",
+    }
+    for category, paths in results.items():
+        log(f"{descriptions[category]}: {len(paths)}")
+        for rel_path in paths[:10]:
+            if category == "foreign":
+                log(f"    {rel_path}")
+            else:
+                log(f"    {rel_path} <- {entries[rel_path][0]}")
+        if len(paths) > 10:
+            log(f"    ... and {len(paths) - 10} more")
+    results["missing_packs"] = missing_packs
+    if missing_packs:
+        log(f"Missing pack archives (build again to repack): {len(missing_packs)}")
+        for name in missing_packs[:10]:
+            log(f"    {name}")
+    log()
+
+    if repair:
+        log("Repairing...")
+        repaired = 0
+        repair_failed = []
+        for dest_path in results["missing"] + results["broken"]:
+            mod_name, original_path = entries[dest_path][:2]
+            source = get_entry_source(meta, mod_name, original_path)
+            dest_file = os.path.join(output_dir, dest_path)
+            tmp_file = dest_file + ".mo2tmp"
+            try:
+                source_stat = os.stat(source)
+                os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+                if os.path.lexists(tmp_file):
+                    os.remove(tmp_file)
+                # Link next to the target then rename over it, so the entry is never absent
+                os.link(source, tmp_file)
+                os.replace(tmp_file, dest_file)
+                entries[dest_path][2:6] = [source_stat.st_size, source_stat.st_ino,
+                                          source_stat.st_dev, source_stat.st_mtime_ns]
+                repaired += 1
+            except OSError as e:
+                repair_failed.append((dest_path, str(e)))
+        results["repair_failed"] = [dest_path for dest_path, _ in repair_failed]
+
+        # Source edits are kept; just accept the new size/mtime into the snapshot
+        for dest_path in results["modified"]:
+            try:
+                st = os.stat(os.path.join(output_dir, dest_path))
+                entries[dest_path][2:6] = [st.st_size, st.st_ino, st.st_dev, st.st_mtime_ns]
+            except OSError:
+                pass
+
+        write_build_index(output_dir, meta, [(p, *v) for p, v in entries.items()])
+
+        log(f"  Re-linked: {repaired}")
+        log(f"  Accepted source edits: {len(results['modified'])}")
+        if results["foreign"]:
+            log(f"  Foreign files left untouched: {len(results['foreign'])}")
+        if repair_failed:
+            log(f"  Failed: {len(repair_failed)}")
+            for dest_path, error in repair_failed[:10]:
+                log(f"    {dest_path}: {error}")
+        log()
+
+    log("=" * 70)
+    return results
+
+
+def link_plugins_txt(modlist_path, plugins_dest_dir, events=None, extra_plugins=None):
+    """
+    Symlink MO2's plugins.txt (next to modlist.txt) into the folder the game reads it from.
+    extra_plugins: lines to add at the end of the load order (the plugins of packed
+                   archives); plugins.txt is then written as a copy instead of a symlink.
+    Returns True if the symlink (or copy) was created, False if that failed and None
+    if the profile has no plugins.txt.
+    """
+    log = make_logger(events)
+    plugins_source = os.path.join(os.path.dirname(modlist_path), 'plugins.txt')
+    if not os.path.exists(plugins_source):
+        log(f"\nWarning: plugins.txt not found at: {plugins_source}")
+        log("Skipping plugins.txt symlinking.")
+        return None
+
+    # Some games (e.g. Oblivion Remastered) have plugins.txt inside the game
+    # folder rather than a wine prefix. Detect this so we can log appropriately.
+    plugins_in_game_folder = "/pfx/" not in plugins_dest_dir
+    plugins_dest = os.path.join(plugins_dest_dir, 'plugins.txt')
+
+    log()
+    log("=" * 70)
+    log("PLUGINS.TXT SYMLINK")
+    log("=" * 70)
+    log(f"Source:      {plugins_source}")
+    log(f"Destination: {plugins_dest}")
+
+    # Create destination directory if it doesn't exist
+    if not os.path.exists(plugins_dest_dir):
+        log(f"Creating destination directory: {plugins_dest_dir}")
+        os.makedirs(plugins_dest_dir)
+
+    # Remove existing plugins.txt (file or symlink)
+    if os.path.exists(plugins_dest) or os.path.islink(plugins_dest):
+        if os.path.islink(plugins_dest):
+            log("Removing existing symlink...")
+        elif plugins_in_game_folder:
+            log("Removing existing plugins.txt (inside data folder)...")
+        else:
+            log("Removing existing plugins.txt...")
+        os.remove(plugins_dest)
+
+    if extra_plugins:
+        # MO2 lists the pack plugins it finds in the Data folder; keep them once, at the end
+        import pack
+
+        try:
+            with open(plugins_source, 'r', encoding='utf-8-sig', errors='surrogateescape') as f:
+                lines = [line.rstrip('\r\n') for line in f
+                         if not pack.is_pack_plugin(line.strip().lstrip('*'))]
+            with open(plugins_dest, 'w', encoding='utf-8', errors='surrogateescape') as f:
+                f.write("\n".join(lines + list(extra_plugins)) + "\n")
+            log(f"Written as a copy with {len(extra_plugins)} pack plugins added at the end")
+            log("(build again after changing the load order in MO2)")
+            return True
+        except OSError as e:
+            log(f"ERROR: Failed to write plugins.txt: {e}")
+            return False
+        finally:
+            log("=" * 70)
+
+    # Create symlink
+    try:
+        os.symlink(plugins_source, plugins_dest)
+        log("Symlink created successfully!")
+        return True
+    except OSError as e:
+        log(f"ERROR: Failed to create symlink: {e}")
+        return False
+    finally:
+        log("=" * 70)
+
+
+def swap_script_extender_launcher(game_data, output_dir, events=None):
+    """
+    Back up the game's launcher and replace it with the script extender loader, so
+    Play in Steam starts the game with the script extender.
+    Skipped for games whose launcher is not in the game root (e.g. UE5 games like
+    Oblivion Remastered), where the swap breaks them.
+    Returns True if the launcher was swapped.
+    """
+    log = make_logger(events)
+    if not game_data or game_data.get("launcher_location", "") != game_data.get("game_root", ""):
+        return False
+
+    launcher_name = game_data.get("launcher_name")
+    script_extender_name = game_data.get("script_extender_name")
+    if not (launcher_name and script_extender_name):
+        return False
+
+    # Get the launcher directory
+    game_folder = game_data.get("launcher_location") or game_data.get("game_root") or os.path.dirname(output_dir)
+    launcher_path = os.path.join(game_folder, launcher_name)
+    script_extender_path = os.path.join(game_folder, script_extender_name)
+    backup_path = os.path.join(game_folder, launcher_name.replace(".exe", ".bak"))
+
+    log()
+    log("=" * 70)
+    if not os.path.exists(script_extender_path):
+        log("SCRIPT EXTENDER LAUNCHER SWAP - SKIPPED")
+        log("=" * 70)
+        log(f"Script extender not found: {script_extender_path}")
+        log("=" * 70)
+        return False
+
+    log("SCRIPT EXTENDER LAUNCHER SWAP")
+    log("=" * 70)
+    log(f"Game folder: {game_folder}")
+    log(f"Launcher: {launcher_name}")
+    log(f"Script Extender: {script_extender_name}")
+
+    # Backup the original launcher if it exists and backup doesn't
+    if os.path.exists(launcher_path) and not os.path.exists(backup_path):
+        log(f"Backing up {launcher_name} -> {launcher_name.replace('.exe', '.bak')}")
+        shutil.copy2(launcher_path, backup_path)
+    elif os.path.exists(backup_path):
+        log(f"Backup already exists: {launcher_name.replace('.exe', '.bak')}")
+
+    # Copy script extender to launcher name (overwrite)
+    log(f"Copying {script_extender_name} -> {launcher_name}")
+    shutil.copy2(script_extender_path, launcher_path)
+    log("Script extender launcher swap completed!")
+    log("=" * 70)
+    return True
+
+
+def run_build(modlist_path, mods_folder, output_dir, overwrite_folder=None, plugins_dest=None,
+              game_data=None, resume=False, incremental=False, profile_trees=False,
+              cancel=None, events=None):
+    """
+    The full build as run from the GUI: harvest and set aside the existing Data folder,
+    build the new one, then symlink plugins.txt and swap in the script extender launcher.
+    The previous Data folder is put back if the build is cancelled or fails.
+    incremental: update the existing Data folder in place instead (no rollback on cancel,
+                 building again finishes the update)
+    profile_trees: keep a prebuilt Data.<profile> per MO2 profile; the profile's tree is
+                   swapped in and updated incrementally (implies incremental)
+    Loose files are packed into archives afterwards if game_data has "pack_archives" set.
+    Returns (success, message).
+    """
+    log = make_logger(events)
+    incremental = incremental or profile_trees
+    try:
+        # Preserve files the game and tools wrote into the Data folder, then set it
+        # aside so the build starts clean (unless resuming an interrupted build).
+        # The old Data folder is only deleted once the new one is complete.
+        if os.path.exists(output_dir) and not resume:
+            if overwrite_folder:
+                log("=" * 70)
+                log("HARVEST (preserving files written into the Data folder)")
+                log("=" * 70)
+                harvest_data_folder(output_dir, overwrite_folder, keep_source=True, events=events)
+                log("=" * 70)
+                log()
+            if not incremental:
+                log(f"Setting existing Data folder aside: {output_dir}")
+                set_aside_data_folder(output_dir, events=events)
+                log()
+
+        # Swap in the tree of this profile (parking the other profile's tree)
+        if profile_trees:
+            profile = os.path.basename(os.path.dirname(os.path.abspath(modlist_path)))
+            log(f"Profile Data folder: {profile}")
+            switch_profile_tree(output_dir, profile, events=events)
+            log()
+
+        # Run the build process
+        try:
+            result = build_data_folder(modlist_path, mods_folder, output_dir, overwrite_folder,
+                                       resume=resume, incremental=incremental, cancel=cancel,
+                                       events=events)
+        except BuildCancelled:
+            log()
+            log("=" * 70)
+            log("BUILD CANCELLED")
+            log("=" * 70)
+            if rollback_data_folder(output_dir):
+                message = "Build cancelled. The previous Data folder was restored."
+            else:
+                message = "Build cancelled. Build again to resume where it stopped."
+            log(message)
+            return False, message
+        except Exception:
+            log()
+            if rollback_data_folder(output_dir):
+                log("Build failed, the previous Data folder was restored.")
+            raise
+
+        log("Removing the previous Data folder...")
+        discard_previous_data_folder(output_dir)
+
+        # Pack loose files into archives (the game's "pack_archives" setting); their
+        # plugins must reach plugins.txt, so nothing is packed without plugins_dest.
+        # Otherwise the packs of the last build are removed: the build linked their files loose again.
+        import pack
+
+        pack_plugins = None
+        pack_cancelled = False
+        pack_mode = (game_data or {}).get("pack_archives")
+        if pack_mode and plugins_dest:
+            try:
+                pack_plugins = pack.pack_data_folder(output_dir, game_data, mode=pack_mode,
+                                                     cancel=cancel, events=events)
+            except BuildCancelled:
+                # The archives packed so far replace their loose files, so their plugins must still be listed
+                pack_cancelled = True
+                pack_plugins = pack.get_pack_plugins(output_dir, game_data)
+        else:
+            if pack.remove_packs(output_dir, events=events) and not plugins_dest:
+                log("WARNING: plugins.txt still lists the removed pack plugins, build from MO2 Manager to relink it")
+            pack.prune_pack_cache(output_dir)
+
+        # Handle plugins.txt symlinking
+        if plugins_dest and link_plugins_txt(modlist_path, plugins_dest, events=events,
+                                             extra_plugins=pack_plugins) is False:
+            return False, (f"Build failed: plugins.txt could not be linked into {plugins_dest}, see the log. "
+                           f"The Data folder itself was built.\n\n{result.summary()}")
+
+        if pack_cancelled:
+            message = (f"Build cancelled while packing. The Data folder is complete with "
+                       f"{len(pack_plugins)} pack archives, the remaining files stay loose.")
+            log(message)
+            return False, f"{message}\n\n{result.summary()}"
+
+        # Handle script extender launcher swap
+        swap_script_extender_launcher(game_data, output_dir, events=events)
+
+        return True, f"Build completed successfully!\n\n{result.summary()}"
+
+    except Exception as e:
+        import traceback
+        log(f"ERROR: {str(e)}")
+        log(traceback.format_exc())
+        return False, f"Build failed: {str(e)}"
+
+
+def build_process_main(conn, cancel, kwargs):
+    """
+    Entry point of the child process the GUI builds in (multiprocessing, spawn).
+    Runs run_build(**kwargs) and sends every event, then a DoneEvent, over conn.
+    """
+    try:
+        success, message = run_build(cancel=cancel, events=conn.send, **kwargs)
+        conn.send(DoneEvent(success, message))
+    finally:
+        conn.close()
+
+
 def main():
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='Build a data folder with hardlinked files from mods.'
     )
     parser.add_argument(
         '--modlist', '-m',
-        required=True,
+        default=None,
         help='Path to modlist.txt file'
     )
     parser.add_argument(
         '--mods', '-d',
-        required=True,
+        default=None,
         help='Path to the mods folder'
     )
     parser.add_argument(
@@ -704,9 +2559,49 @@ def main():
         action='store_true',
         help='Skip plugins.txt symlinking'
     )
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='Compare the Data folder with the last build snapshot and report drift'
+    )
+    parser.add_argument(
+        '--repair',
+        action='store_true',
+        help='Like --verify, but also re-link missing and broken entries'
+    )
+    parser.add_argument(
+        '--reclaim',
+        action='store_true',
+        help='List the overridden files no profile uses, grouped by mod (from the last build snapshot)'
+    )
+    parser.add_argument(
+        '--reclaim-to',
+        default=None,
+        metavar='FOLDER',
+        help='Like --reclaim, but move those files into FOLDER'
+    )
+    parser.add_argument(
+        '--reclaim-delete',
+        action='store_true',
+        help='Like --reclaim, but delete those files'
+    )
+    parser.add_argument(
+        '--no-resume',
+        action='store_true',
+        help='Start over instead of resuming an interrupted build'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Update the existing Data folder in place, only linking what changed since the last build'
+    )
 
     args = parser.parse_args()
 
+    reclaim = args.reclaim or args.reclaim_to or args.reclaim_delete
+    if not (args.verify or args.repair or reclaim) and not (args.modlist and args.mods):
+        parser.error("--modlist and --mods are required unless --verify, --repair or --reclaim is used")
+
     # Default output to script directory + /Data
     if args.output is None:
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -720,6 +2615,21 @@ def main():
             args.output = os.path.join(args.output, 'Data')
             print(f"Note: Output path adjusted to: {args.output}")
 
+    # Verify mode - compare the Data folder with the last build snapshot
+    if args.verify or args.repair:
+        results = verify_data_folder(args.output, repair=args.repair)
+        sys.exit(1 if results is None or count_verify_problems(results) else 0)
+
+    # Reclaim mode - report (and move or delete) overridden files no profile uses
+    if reclaim:
+        if args.reclaim_delete and not args.yes:
+            response = input("Delete every overridden file no profile uses? (y/N): ").strip().lower()
+            if response not in ('y', 'yes'):
+                print("Aborted. Nothing was deleted.")
+                sys.exit(0)
+        report = reclaim_overridden_files(args.output, archive_dir=args.reclaim_to, delete=args.reclaim_delete)
+        sys.exit(1 if report is None else 0)
+
     # Check mode - just show which mod provides a file
     if args.check:
         check_file_source(args.modlist, args.mods, args.check)
@@ -732,21 +2642,27 @@ def main():
         print("This is a safety check to prevent accidentally deleting important folders.")
         sys.exit(1)
 
-    # Step 0: Sync ShaderCache from existing Data folder to overwrite folder
-    # This preserves any shader cache changes made by the game before we delete the Data folder
-    if args.overwrite and os.path.exists(args.output):
-        print("=" * 70)
-        print("SHADERCACHE SYNC (preserving game changes)")
-        print("=" * 70)
-        if sync_shadercache(args.output, args.overwrite):
-            print("ShaderCache synced to overwrite folder!")
+    # Resume an interrupted build instead of deleting its partial Data folder
+    resume = False
+    interrupted = find_interrupted_build(args.output)
+    if interrupted and not args.no_resume:
+        print(f"Found an interrupted build of: {args.output}")
+        print(f"  Started: {interrupted['started']}, {interrupted['completed_dirs']} folders already linked")
+        if args.yes:
+            print("--yes flag specified, resuming...")
+            resume = True
         else:
-            print("No ShaderCache to sync")
-        print("=" * 70)
+            response = input("Resume it? (Y/n): ").strip().lower()
+            resume = response in ('', 'y', 'yes')
         print()
 
     # Check if output directory already exists
-    if os.path.exists(args.output):
+    if os.path.exists(args.output) and not resume and args.incremental:
+        if args.overwrite:
+            print("Harvesting files written into the Data folder...")
+            harvest_data_folder(args.output, args.overwrite, keep_source=True)
+            print()
+    elif os.path.exists(args.output) and not resume:
         print(f"Data folder already exists: {args.output}")
         if args.yes:
             print("--yes flag specified, deleting existing folder...")
@@ -756,77 +2672,41 @@ def main():
             delete = response in ('y', 'yes')
 
         if delete:
-            print("Deleting existing Data folder...")
-            shutil.rmtree(args.output)
-            print("Deleted.")
+            # Preserve files the game and tools wrote into the Data folder
+            if args.overwrite:
+                print("Harvesting files written into the Data folder...")
+                harvest_data_folder(args.output, args.overwrite, keep_source=True)
+            # Kept until the build finishes so Ctrl+C can roll back to it
+            print("Setting existing Data folder aside...")
+            set_aside_data_folder(args.output)
         else:
             print("Aborted. Existing Data folder was not modified.")
             sys.exit(0)
 
         print()
 
-    build_data_folder(args.modlist, args.mods, args.output, args.overwrite, args.filemap)
-
-    # Handle ShaderCache folder copying (from overwrite folder to new Data folder)
-    if args.overwrite:
+    try:
+        build_data_folder(args.modlist, args.mods, args.output, args.overwrite, args.filemap,
+                          resume=resume, incremental=args.incremental)
+    except KeyboardInterrupt:
         print()
-        print("=" * 70)
-        print("SHADERCACHE COPY")
-        print("=" * 70)
-        if copy_shadercache_to_data(args.overwrite, args.output):
-            print("ShaderCache copied successfully!")
-            print("(Game will create/modify shaders in the Data folder)")
+        print("Build cancelled.")
+        if rollback_data_folder(args.output):
+            print("Previous Data folder restored.")
         else:
-            print("No ShaderCache to copy")
-        print("=" * 70)
+            print("Partial Data folder kept, run again to resume.")
+        sys.exit(1)
+    discard_previous_data_folder(args.output)
 
     # Handle plugins.txt symlinking
     if not args.no_plugins:
-        # plugins.txt is in the same folder as modlist.txt
-        modlist_dir = os.path.dirname(args.modlist)
-        plugins_source = os.path.join(modlist_dir, 'plugins.txt')
-
-        if not os.path.exists(plugins_source):
-            print(f"\nWarning: plugins.txt not found at: {plugins_source}")
-            print("Skipping plugins.txt symlinking.")
+        # Default destination for Skyrim SSE in Wine/Proton prefix
+        if args.plugins_dest:
+            plugins_dest_dir = args.plugins_dest
         else:
-            # Default destination for Skyrim SSE in Wine/Proton prefix
-            if args.plugins_dest:
-                plugins_dest_dir = args.plugins_dest
-            else:
-                plugins_dest_dir = "/home/deck/.local/share/Steam/steamapps/compatdata/489830/pfx/drive_c/users/steamuser/AppData/Local/Skyrim Special Edition"
-
-            plugins_dest = os.path.join(plugins_dest_dir, 'plugins.txt')
-
-            print()
-            print("=" * 70)
-            print("PLUGINS.TXT SYMLINK")
-            print("=" * 70)
-            print(f"Source:      {plugins_source}")
-            print(f"Destination: {plugins_dest}")
-
-            # Create destination directory if it doesn't exist
-            if not os.path.exists(plugins_dest_dir):
-                print(f"Creating destination directory: {plugins_dest_dir}")
-                os.makedirs(plugins_dest_dir)
-
-            # Remove existing plugins.txt (file or symlink)
-            if os.path.exists(plugins_dest) or os.path.islink(plugins_dest):
-                if os.path.islink(plugins_dest):
-                    print("Removing existing symlink...")
-                else:
-                    print("Removing existing plugins.txt...")
-                os.remove(plugins_dest)
-
-            # Create symlink
-            try:
-                os.symlink(plugins_source, plugins_dest)
-                print("Symlink created successfully!")
-            except OSError as e:
-                print(f"ERROR: Failed to create symlink: {e}")
-
-            print("=" * 70)
-
+            plugins_dest_dir = "/home/deck/.local/share/Steam/steamapps/compatdata/489830/pfx/drive_c/users/steamuser/AppData/Local/Skyrim Special Edition"
+        if link_plugins_txt(args.modlist, plugins_dest_dir) is False:
+            sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -1,5 +1,5 @@
 import os
-import utils
+import core
 
 def get_default_game_paths():
     """Return the default game configuration data."""
@@ -11,10 +11,10 @@ def get_default_game_paths():
     return {"games": [
         {
             "name": "Skyrim Special Edition",
-            "prefix_path": os.path.join(steam_compat, utils.get_steam_id("Skyrim Special Edition"), pfx_path),
+            "prefix_path": os.path.join(steam_compat, core.get_steam_id("Skyrim Special Edition"), pfx_path),
             "data_path": os.path.join(steam_common, "Skyrim Special Edition/Data"),
-            "plugins_path": os.path.join(steam_compat, utils.get_steam_id("Skyrim Special Edition"), pfx_path, "Skyrim Special Edition"),
-            "default_plugins_path": os.path.join(steam_compat, utils.get_steam_id("Skyrim Special Edition"), pfx_path, "Skyrim Special Edition"),
+            "plugins_path": os.path.join(steam_compat, core.get_steam_id("Skyrim Special Edition"), pfx_path, "Skyrim Special Edition"),
+            "default_plugins_path": os.path.join(steam_compat, core.get_steam_id("Skyrim Special Edition"), pfx_path, "Skyrim Special Edition"),
             "launcher_name": "SkyrimSELauncher.exe",
             "launcher_location": os.path.join(steam_common, "Skyrim Special Edition"),
             "game_root": os.path.join(steam_common, "Skyrim Special Edition"),
@@ -24,10 +24,10 @@ def get_default_game_paths():
         },
         {
             "name": "Skyrim",
-            "prefix_path": os.path.join(steam_compat, utils.get_steam_id("Skyrim"), pfx_path),
+            "prefix_path": os.path.join(steam_compat, core.get_steam_id("Skyrim"), pfx_path),
             "data_path": os.path.join(steam_common, "Skyrim/Data"),
-            "plugins_path": os.path.join(steam_compat, utils.get_steam_id("Skyrim"), pfx_path, "Skyrim"),
-            "default_plugins_path": os.path.join(steam_compat, utils.get_steam_id("Skyrim"), pfx_path, "Skyrim"),
+            "plugins_path": os.path.join(steam_compat, core.get_steam_id("Skyrim"), pfx_path, "Skyrim"),
+            "default_plugins_path": os.path.join(steam_compat, core.get_steam_id("Skyrim"), pfx_path, "Skyrim"),
             "launcher_name": "SkyrimLauncher.exe",
             "launcher_location": os.path.join(steam_common, "Skyrim"),
             "game_root": os.path.join(steam_common, "Skyrim"),
@@ -37,10 +37,10 @@ def get_default_game_paths():
         },
         {
             "name": "Fallout 4",
-            "prefix_path": os.path.join(steam_compat, utils.get_steam_id("Fallout 4"), pfx_path),
+            "prefix_path": os.path.join(steam_compat, core.get_steam_id("Fallout 4"), pfx_path),
             "data_path": os.path.join(steam_common, "Fallout 4/Data"),
-            "plugins_path": os.path.join(steam_compat, utils.get_steam_id("Fallout 4"), pfx_path, "Fallout4"),
-            "default_plugins_path": os.path.join(steam_compat, utils.get_steam_id("Fallout 4"), pfx_path, "Fallout4"),
+            "plugins_path": os.path.join(steam_compat, core.get_steam_id("Fallout 4"), pfx_path, "Fallout4"),
+            "default_plugins_path": os.path.join(steam_compat, core.get_steam_id("Fallout 4"), pfx_path, "Fallout4"),
             "launcher_name": "Fallout4Launcher.exe",
             "launcher_location": os.path.join(steam_common, "Fallout 4"),
             "game_root": os.path.join(steam_common, "Fallout 4"),
@@ -63,10 +63,10 @@ def get_default_game_paths():
         },
         {
             "name": "Fallout 3",
-            "prefix_path": os.path.join(steam_compat, utils.get_steam_id("Fallout 3"), pfx_path),
+            "prefix_path": os.path.join(steam_compat, core.get_steam_id("Fallout 3"), pfx_path),
             "data_path": os.path.join(steam_common, "Fallout 3/Data"),
-            "plugins_path": os.path.join(steam_compat, utils.get_steam_id("Fallout 3"), pfx_path, "Fallout3"),
-            "default_plugins_path": os.path.join(steam_compat, utils.get_steam_id("Fallout 3"), pfx_path, "Fallout3"),
+            "plugins_path": os.path.join(steam_compat, core.get_steam_id("Fallout 3"), pfx_path, "Fallout3"),
+            "default_plugins_path": os.path.join(steam_compat, core.get_steam_id("Fallout 3"), pfx_path, "Fallout3"),
             "launcher_name": "Fallout3Launcher.exe",
             "launcher_location": os.path.join(steam_common, "Fallout 3"),
             "game_root": os.path.join(steam_common, "Fallout 3"),
@@ -76,10 +76,10 @@ def get_default_game_paths():
         },
         {
             "name": "Fallout 3 GOTY",
-            "prefix_path": os.path.join(steam_compat, utils.get_steam_id("Fallout 3 GOTY"), pfx_path),
+            "prefix_path": os.path.join(steam_compat, core.get_steam_id("Fallout 3 GOTY"), pfx_path),
             "data_path": os.path.join(steam_common, "Fallout 3 goty/Data"),
-            "plugins_path": os.path.join(steam_compat, utils.get_steam_id("Fallout 3 GOTY"), pfx_path, "Fallout3"),
-            "default_plugins_path": os.path.join(steam_compat, utils.get_steam_id("Fallout 3 GOTY"), pfx_path, "Fallout3"),
+            "plugins_path": os.path.join(steam_compat, core.get_steam_id("Fallout 3 GOTY"), pfx_path, "Fallout3"),
+            "default_plugins_path": os.path.join(steam_compat, core.get_steam_id("Fallout 3 GOTY"), pfx_path, "Fallout3"),
             "launcher_name": "Fallout3Launcher.exe",
             "launcher_location": os.path.join(steam_common, "Fallout 3 goty"),
             "game_root": os.path.join(steam_common, "Fallout 3 goty"),
@@ -89,10 +89,10 @@ def get_default_game_paths():
         },
         {
             "name": "New Vegas",
-            "prefix_path": os.path.join(steam_compat, utils.get_steam_id("New Vegas"), pfx_path),
+            "prefix_path": os.path.join(steam_compat, core.get_steam_id("New Vegas"), pfx_path),
             "data_path": os.path.join(steam_common, "Fallout New Vegas/Data"),
-            "plugins_path": os.path.join(steam_compat, utils.get_steam_id("New Vegas"), pfx_path, "FalloutNV"),
-            "default_plugins_path": os.path.join(steam_compat, utils.get_steam_id("New Vegas"), pfx_path, "FalloutNV"),
+            "plugins_path": os.path.join(steam_compat, core.get_steam_id("New Vegas"), pfx_path, "FalloutNV"),
+            "default_plugins_path": os.path.join(steam_compat, core.get_steam_id("New Vegas"), pfx_path, "FalloutNV"),
             "launcher_name": "FalloutNVLauncher.exe",
             "launcher_location": os.path.join(steam_common, "Fallout New Vegas"),
             "game_root": os.path.join(steam_common, "Fallout New Vegas"),
@@ -102,10 +102,10 @@ def get_default_game_paths():
         },
         {
             "name": "Oblivion",
-            "prefix_path": os.path.join(steam_compat, utils.get_steam_id("Oblivion"), pfx_path),
+            "prefix_path": os.path.join(steam_compat, core.get_steam_id("Oblivion"), pfx_path),
             "data_path": os.path.join(steam_common, "Oblivion/Data"),
-            "plugins_path": os.path.join(steam_compat, utils.get_steam_id("Oblivion"), pfx_path, "Oblivion"),
-            "default_plugins_path": os.path.join(steam_compat, utils.get_steam_id("Oblivion"), pfx_path, "Oblivion"),
+            "plugins_path": os.path.join(steam_compat, core.get_steam_id("Oblivion"), pfx_path, "Oblivion"),
+            "default_plugins_path": os.path.join(steam_compat, core.get_steam_id("Oblivion"), pfx_path, "Oblivion"),
             "launcher_name": "OblivionLauncher.exe",
             "launcher_location": os.path.join(steam_common, "Oblivion"),
             "game_root": os.path.join(steam_common, "Oblivion"),
@@ -115,7 +115,7 @@ def get_default_game_paths():
         },
         {
             "name": "Oblivion Remastered",
-            "prefix_path": os.path.join(steam_compat, utils.get_steam_id("Oblivion Remastered"), pfx_path),
+            "prefix_path": os.path.join(steam_compat, core.get_steam_id("Oblivion Remastered"), pfx_path),
             "data_path": os.path.join(steam_common, "Oblivion Remastered/OblivionRemastered/Content"),
             "plugins_path": os.path.join(steam_common, "Oblivion Remastered/OblivionRemastered/Content/Dev/ObvData/Data"),
             "default_plugins_path": os.path.join(steam_common, "Oblivion Remastered/OblivionRemastered/Content/Dev/ObvData/Data"),
@@ -129,10 +129,10 @@ def get_default_game_paths():
         },
         {
             "name": "Morrowind",
-            "prefix_path": os.path.join(steam_compat, utils.get_steam_id("Morrowind"), pfx_path),
+            "prefix_path": os.path.join(steam_compat, core.get_steam_id("Morrowind"), pfx_path),
             "data_path": os.path.join(steam_common, "Morrowind/Data Files"),
-            "plugins_path": os.path.join(steam_compat, utils.get_steam_id("Morrowind"), pfx_path, "Morrowind"),
-            "default_plugins_path": os.path.join(steam_compat, utils.get_steam_id("Morrowind"), pfx_path, "Morrowind"),
+            "plugins_path": os.path.join(steam_compat, core.get_steam_id("Morrowind"), pfx_path, "Morrowind"),
+            "default_plugins_path": os.path.join(steam_compat, core.get_steam_id("Morrowind"), pfx_path, "Morrowind"),
             "launcher_name": "Morrowind Launcher.exe",
             "launcher_location": os.path.join(steam_common, "Morrowind"),
             "game_root": os.path.join(steam_common, "Morrowind"),
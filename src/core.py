@@ -0,0 +1,544 @@
+"""
+Qt-free logic shared by the GUI and the command line: the game config, game and
+MO2 instance discovery and Proton resolution. Importing this never loads PyQt, so
+the mo2manager CLI starts quickly (e.g. over SSH or from Game Mode scripts).
+"""
+
+import os
+import sys
+import json
+
+
+def get_clean_env():
+    """Get a clean environment for launching external processes like Proton.
+
+    When running inside an AppImage, environment variables like LD_LIBRARY_PATH
+    and QT_PLUGIN_PATH are modified to point to the AppImage's internal libraries.
+    These can interfere with external applications like Proton/Wine.
+    """
+    env = os.environ.copy()
+
+    # Check if running inside an AppImage
+    if 'APPIMAGE' in env or 'APPDIR' in env:
+        # Remove or clean AppImage-specific paths from library paths
+        appdir = env.get('APPDIR', '')
+
+        # Clean LD_LIBRARY_PATH
+        if 'LD_LIBRARY_PATH' in env:
+            paths = env['LD_LIBRARY_PATH'].split(':')
+            cleaned = [p for p in paths if appdir not in p and '/tmp/.mount_' not in p]
+            if cleaned:
+                env['LD_LIBRARY_PATH'] = ':'.join(cleaned)
+            else:
+                del env['LD_LIBRARY_PATH']
+
+        # Clean QT_PLUGIN_PATH
+        if 'QT_PLUGIN_PATH' in env:
+            paths = env['QT_PLUGIN_PATH'].split(':')
+            cleaned = [p for p in paths if appdir not in p and '/tmp/.mount_' not in p]
+            if cleaned:
+                env['QT_PLUGIN_PATH'] = ':'.join(cleaned)
+            else:
+                del env['QT_PLUGIN_PATH']
+
+        # Clean PATH
+        if 'PATH' in env:
+            paths = env['PATH'].split(':')
+            cleaned = [p for p in paths if appdir not in p and '/tmp/.mount_' not in p]
+            env['PATH'] = ':'.join(cleaned) if cleaned else '/usr/bin:/bin'
+
+        # Remove AppImage-specific variables
+        for var in ['APPDIR', 'APPIMAGE', 'ARGV0', 'OWD']:
+            env.pop(var, None)
+
+    return env
+
+
+def get_app_path():
+    """Get the application base path, handling both frozen (PyInstaller) and normal execution."""
+    if getattr(sys, 'frozen', False):
+        # Running as bundled app (PyInstaller)
+        return sys._MEIPASS
+    else:
+        # Running as script
+        return os.path.dirname(os.path.abspath(__file__))
+
+
+def get_prefix_from_plugins_path(plugins_path):
+    """Extract the Wine prefix path from a full plugins_path.
+
+    For example, given:
+      /home/deck/.local/share/Steam/steamapps/compatdata/377160/pfx/drive_c/users/steamuser/AppData/Local/Fallout4
+    Returns:
+      /home/deck/.local/share/Steam/steamapps/compatdata/377160
+    """
+    pfx_index = plugins_path.find("/pfx/")
+    if pfx_index != -1:
+        return plugins_path[:pfx_index]
+    return plugins_path
+
+
+def get_config_path():
+    """Get the config file path - uses user's home directory for writability."""
+    user_config_dir = os.path.join(os.path.expanduser("~"), ".config", "mo2manager")
+    user_config = os.path.join(user_config_dir, "game_paths.json")
+
+    # If user config exists, use it
+    if os.path.exists(user_config):
+        return user_config
+
+    # Generate default config
+    import build_json
+    try:
+        os.makedirs(user_config_dir, exist_ok=True)
+        with open(user_config, 'w', encoding='utf-8') as f:
+            json.dump(build_json.get_default_game_paths(), f, indent=4)
+        return user_config
+    except (OSError, IOError):
+        return user_config
+
+
+def load_game_paths():
+    """Load game paths from the JSON config file."""
+    config_path = get_config_path()
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                games = data.get("games", [])
+                _migrate_game_fields(games)
+                return games
+        except (json.JSONDecodeError, IOError):
+            pass
+    return []
+
+
+def _migrate_game_fields(games):
+    """Backfill new fields (game_root, data_subpath, launcher_location) from defaults."""
+    import build_json
+    defaults = build_json.get_default_game_paths()
+    defaults_by_name = {g["name"]: g for g in defaults["games"]}
+    for game in games:
+        name = game.get("name", "")
+        default = defaults_by_name.get(name, {})
+        # Migrate launcer_location typo -> launcher_location
+        if "launcer_location" in game and "launcher_location" not in game:
+            game["launcher_location"] = game.pop("launcer_location")
+        elif "launcer_location" in game:
+            del game["launcer_location"]
+        # Backfill missing fields from defaults
+        for field in ("game_root", "data_subpath", "launcher_location",
+                       "mge_xe_download", "code_patch_download",
+                       "mo2_download_url", "plugins_path",
+                       "default_plugins_path"):
+            if field not in game and field in default:
+                game[field] = default[field]
+        # Migrate Oblivion Remastered data_subpath and data_path to Content folder
+        if name == "Oblivion Remastered":
+            old_subpath = "OblivionRemastered/Content/Dev/ObvData"
+            new_subpath = default.get("data_subpath", "OblivionRemastered/Content")
+            if game.get("data_subpath") == old_subpath:
+                game["data_subpath"] = new_subpath
+                game_root = game.get("game_root", "")
+                if game_root:
+                    game["data_path"] = os.path.join(game_root, new_subpath)
+        # If game_root was customized but data_path still points to the default,
+        # rebuild data_path from game_root + data_subpath
+        game_root = game.get("game_root", "")
+        default_game_root = default.get("game_root", "")
+        default_data_path = default.get("data_path", "")
+        if (game_root and default_game_root and game_root != default_game_root
+                and game.get("data_path") == default_data_path):
+            data_subpath = game.get("data_subpath", "Data")
+            game["data_path"] = os.path.join(game_root, data_subpath)
+
+
+def save_game_paths(game_paths):
+    """Save game paths list back to the JSON config file."""
+    config_path = get_config_path()
+    try:
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump({"games": game_paths}, f, indent=4)
+    except (OSError, IOError):
+        pass
+
+
+# How many folders below a scan root the launcher fallback scan looks
+# (<SD card>/steamapps/common/<game>/<launcher> is 3, Oblivion Remastered's
+# <game>/OblivionRemastered/Binaries/Win64/<launcher> is 4 below common)
+LAUNCHER_SCAN_DEPTH = 5
+
+
+def get_app_id(game_data):
+    """The Steam app id of a game: its compatdata folder, else the known Steam ids. None if unknown."""
+    app_id = os.path.basename(get_prefix_from_plugins_path(game_data.get("prefix_path", "")))
+    if app_id.isdigit():
+        return app_id
+    try:
+        return get_steam_id(game_data.get("name", ""))
+    except KeyError:
+        return None
+
+
+def _find_launcher(game_folder, game_data):
+    """
+    The folder holding game_data's launcher_name inside an install folder, or None.
+    Looks where the config expects it first (one stat), then a shallow scan of the folder.
+    """
+    launcher = game_data.get("launcher_name", "")
+    if not launcher or not os.path.isdir(game_folder):
+        return None
+
+    # e.g. OblivionRemastered/Binaries/Win64 for Oblivion Remastered, "." for the rest
+    launcher_rel = "."
+    if game_data.get("launcher_location") and game_data.get("game_root"):
+        launcher_rel = os.path.relpath(game_data["launcher_location"], game_data["game_root"])
+        if launcher_rel.startswith(".."):
+            launcher_rel = "."
+    expected = os.path.normpath(os.path.join(game_folder, launcher_rel))
+    if os.path.isfile(os.path.join(expected, launcher)):
+        return expected
+
+    found = _scan_for_launchers([dict(game_data, launcher_location="")], [(game_folder, LAUNCHER_SCAN_DEPTH)])
+    return found.get(game_data.get("name", ""))
+
+
+def find_game_installs(game_paths):
+    """
+    Find installed games. Each game's Steam app id is resolved through the Steam
+    library manifests (see steam.py), then its configured launcher_location is checked.
+    Games not found either way (not Steam apps, or Steam games without a manifest,
+    e.g. copied into a custom library) fall back to the depth-limited discovery walk
+    of the Steam common folders, SD cards and game folders (see discovery.py), which
+    is shared by all of them and reused while recent.
+    Returns a dict mapping game name to the folder containing the launcher.
+    """
+    import discovery
+    import steam
+
+    found = {}
+    libraries = steam.get_library_folders()
+    for game in game_paths:
+        game_name = game.get("name", "")
+        app_id = get_app_id(game)
+        install_dir = steam.find_app_install(app_id, libraries) if app_id else None
+        launcher_folder = _find_launcher(install_dir, game) if install_dir else None
+        if launcher_folder is None:
+            # Not a Steam app (e.g. Fallout London) or no manifest: try where the config says
+            location = game.get("launcher_location", "")
+            if location and os.path.isfile(os.path.join(location, game.get("launcher_name", ""))):
+                launcher_folder = location
+        if launcher_folder:
+            found[game_name] = launcher_folder
+
+    # Walk for the rest: a Steam game can be installed without a manifest
+    missing = [game for game in game_paths if game.get("name", "") not in found]
+    if not missing:
+        return found
+
+    # Reuse a recent walk (e.g. the instance scan), it looked for the launchers too
+    roots = discovery.get_scan_roots(game_paths)
+    found.update(_scan_for_launchers(missing, roots, patterns=discovery.get_patterns(game_paths),
+                                     max_age=discovery.CACHE_SECONDS))
+    return found
+
+
+def find_game_in_folder(game_paths, folder):
+    """
+    Detect which configured game is installed in folder (the Custom Location flow).
+    A Steam install folder is identified by its library's app manifest; anything
+    else by a depth-limited scan for launcher_name.
+    Returns a dict mapping game name to the folder containing the launcher.
+    """
+    import steam
+
+    app_id = steam.find_app_for_folder(folder)
+    if app_id:
+        for game in game_paths:
+            if get_app_id(game) == app_id:
+                launcher_folder = _find_launcher(folder, game)
+                if launcher_folder:
+                    return {game.get("name", ""): launcher_folder}
+    return _scan_for_launchers(game_paths, [(folder, LAUNCHER_SCAN_DEPTH)])
+
+
+def _scan_for_launchers(game_paths, scan_roots, patterns=None, max_age=0):
+    """
+    Scan the given (path, max_depth) roots for launcher_name executables in one
+    shared walk (see discovery.py). patterns can add more file names to the walk
+    so a later scan can reuse it within max_age seconds.
+    Returns a dict mapping game name to the game folder path found.
+    """
+    import discovery
+
+    # Build a lookup: lowercase launcher_name -> list of game dicts
+    launcher_lookup = {}
+    for game in game_paths:
+        launcher = game.get("launcher_name", "")
+        if launcher:
+            launcher_lookup.setdefault(launcher.lower(), []).append(game)
+
+    if not launcher_lookup:
+        return {}
+
+    matches = discovery.discover(set(launcher_lookup) | set(patterns or ()), scan_roots, max_age=max_age)
+    found = {}  # game name -> game folder path
+    for lower_name, games in launcher_lookup.items():
+        for launcher_path in matches.get(lower_name, []):
+            game_folder = os.path.dirname(launcher_path)  # folder containing the launcher
+            for game in games:
+                game_name = game.get("name", "")
+                if game_name not in found:
+                    # When multiple games share a launcher, use
+                    # launcher_location to disambiguate so that
+                    # e.g. Fallout 4 and Fallout London each map
+                    # to their own folder.
+                    expected = game.get("launcher_location", "")
+                    if expected and os.path.isdir(expected):
+                        if os.path.normpath(game_folder) != os.path.normpath(expected):
+                            continue
+                    found[game_name] = game_folder
+
+    return found
+
+
+def get_instance_registry_path():
+    """The list of MO2 instances found by the last scan, next to the game config."""
+    return os.path.join(os.path.expanduser("~"), ".config", "mo2manager", "instances.json")
+
+
+def load_known_instances():
+    """
+    Load the MO2 instances found by the last scan without walking any folders.
+    Each one is revalidated with a single stat of its ModOrganizer.exe and dropped if it is gone.
+    Returns a list of tuples: (display_name, folder_path)
+    """
+    try:
+        with open(get_instance_registry_path(), 'r', encoding='utf-8') as f:
+            entries = json.load(f).get("instances", [])
+    except (OSError, ValueError, AttributeError):
+        return []
+
+    instances = []
+    for entry in entries:
+        try:
+            display_name, folder_path = entry["name"], entry["path"]
+            if os.path.isfile(os.path.join(folder_path, entry.get("exe", "ModOrganizer.exe"))):
+                instances.append((display_name, folder_path))
+        except (KeyError, TypeError):
+            continue
+    return instances
+
+
+def save_known_instances(instances, exe_names=None):
+    """Save (display_name, folder_path) tuples to the instance registry."""
+    exe_names = exe_names or {}
+    path = get_instance_registry_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"instances": [{"name": display_name, "path": folder_path,
+                                      "exe": exe_names.get(folder_path, "ModOrganizer.exe")}
+                                     for display_name, folder_path in instances]}, f, indent=4)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def scan_for_mo2_instances(on_found=None, cancel=None):
+    """
+    Scan the Steam libraries, SD cards and game directories for ModOrganizer.exe instances,
+    in the same walk as the game launchers (see discovery.py).
+    on_found(display_name, folder_path) is called for each instance as soon as it is found.
+    A completed scan is saved as the instance registry (see load_known_instances);
+    if cancel (a threading.Event) is set the walk stops and the registry is left as it was.
+    Returns a list of tuples: (display_name, folder_path)
+    """
+    import discovery
+
+    def on_match(lower_name, file_path):
+        if on_found is not None and lower_name == discovery.MO2_EXE:
+            mo2_folder = os.path.dirname(file_path)
+            on_found(os.path.basename(os.path.dirname(mo2_folder)), mo2_folder)
+
+    game_paths = load_game_paths()
+    matches = discovery.discover(discovery.get_patterns(game_paths), discovery.get_scan_roots(game_paths),
+                                 cancel=cancel, on_match=on_match)
+
+    instances = []
+    exe_names = {}
+    for exe_path in matches[discovery.MO2_EXE]:
+        mo2_folder = os.path.dirname(exe_path)
+        exe_names[mo2_folder] = os.path.basename(exe_path)
+        # Use the grandparent folder as the display name (the game folder)
+        instances.append((os.path.basename(os.path.dirname(mo2_folder)), mo2_folder))
+
+    # Sort by path for consistent ordering
+    instances.sort(key=lambda x: x[1])
+    if cancel is None or not cancel.is_set():
+        save_known_instances(instances, exe_names)
+    return instances
+
+
+def detect_proton_path(prefix_path):
+    """Detect the Proton binary path from a game's prefix_path.
+
+    Args:
+        prefix_path: Path to the Wine prefix like
+            .../compatdata/489830/pfx/drive_c/users/steamuser/AppData/Local
+
+    Returns:
+        tuple: (proton_path, compat_data_path) on success
+
+    Raises:
+        ValueError: with descriptive message if detection fails
+    """
+    if not prefix_path:
+        raise ValueError("No prefix path configured for this game.")
+
+    pfx_index = prefix_path.find("/pfx/")
+    if pfx_index == -1:
+        raise ValueError("Could not determine Wine prefix from prefix path.")
+
+    compat_data_path = prefix_path[:pfx_index]
+
+    if not os.path.isdir(compat_data_path):
+        raise ValueError(f"Compatdata folder not found:\n{compat_data_path}")
+
+    # Detect which Proton version was used by reading config_info
+    config_info_path = os.path.join(compat_data_path, "config_info")
+    proton_path = None
+
+    if os.path.isfile(config_info_path):
+        try:
+            with open(config_info_path, 'r') as f:
+                lines = f.readlines()
+            if len(lines) >= 2:
+                font_path = lines[1].strip()
+                files_index = font_path.find("/files/")
+                if files_index != -1:
+                    proton_dir = font_path[:files_index]
+                    candidate = os.path.join(proton_dir, "proton")
+                    if os.path.isfile(candidate):
+                        proton_path = candidate
+        except Exception:
+            pass
+
+    if not proton_path:
+        raise ValueError(
+            f"Could not detect Proton version.\n\n"
+            f"The config_info file was not found or could not be parsed at:\n"
+            f"{config_info_path}\n\n"
+            "Make sure the game has been launched at least once via Steam."
+        )
+
+    return proton_path, compat_data_path
+
+
+def detect_game_for_instance(mo2_path, game_paths):
+    """
+    Return the game of an MO2 instance, or None.
+    Instance folders follow the format "<game name> MO2" (e.g., "Skyrim Special Edition MO2").
+    """
+    folder_name = os.path.basename(os.path.normpath(mo2_path))
+    for game in game_paths:
+        game_name = game.get("name", "")
+        if game_name and folder_name.lower() == f"{game_name} MO2".lower():
+            return game
+    return None
+
+
+def get_proton_env(compat_data_path):
+    """Environment for running something with Proton in the given compatdata folder."""
+    env = get_clean_env()
+    env["STEAM_COMPAT_CLIENT_INSTALL_PATH"] = os.path.expanduser("~/.local/share/Steam")
+    env["STEAM_COMPAT_DATA_PATH"] = compat_data_path
+    return env
+
+
+def launch_mo2(mo2_path, game_data):
+    """
+    Launch ModOrganizer.exe using the game's Proton version and prefix.
+    Returns the name of the Proton version used.
+    Raises ValueError if MO2 or Proton can't be found, OSError if it fails to start.
+    """
+    import subprocess
+
+    mo2_exe = os.path.join(mo2_path, "ModOrganizer.exe")
+    if not os.path.isfile(mo2_exe):
+        raise ValueError(f"ModOrganizer.exe not found at:\n{mo2_exe}")
+
+    proton_path, compat_data_path = detect_proton_path(game_data.get("prefix_path", ""))
+    env = get_proton_env(compat_data_path)
+
+    # Newer MO2 builds (e.g. for Oblivion Remastered) crash with
+    # "free(): unaligned chunk detected in tcache 2" due to glibc
+    # allocator conflicts under Proton. Clearing LD_PRELOAD fixes this.
+    if game_data.get("mo2_download_url"):
+        env.pop("LD_PRELOAD", None)
+
+    subprocess.Popen([proton_path, "run", mo2_exe], env=env, cwd=mo2_path)
+    return os.path.basename(os.path.dirname(proton_path))
+
+
+def launch_game(game_data):
+    """
+    Start the game through Steam (so Steam Input, the overlay and Proton settings apply).
+    The app id is the game's compatdata folder, falling back to the known Steam ids.
+    Raises ValueError if the app id is unknown, OSError if Steam can't be started.
+    """
+    import subprocess
+
+    app_id = get_app_id(game_data)
+    if app_id is None:
+        raise ValueError(f"No Steam app id known for {game_data.get('name', 'this game')}, "
+                         f"start it from Steam instead.")
+    subprocess.Popen(["xdg-open", f"steam://rungameid/{app_id}"], env=get_clean_env())
+    return app_id
+
+
+def get_se_manifest_path(game_data):
+    """Get the path to the script extender install manifest for a game."""
+    if not game_data:
+        return None
+    game_name = game_data.get("name", "").replace(" ", "_").lower()
+    if not game_name:
+        return None
+    config_dir = os.path.join(os.path.expanduser("~"), ".config", "mo2manager")
+    return os.path.join(config_dir, f"se_installed_{game_name}.json")
+
+
+def get_steam_id(game):
+    steam_id = {
+        "Skyrim Special Edition" : "489830",
+        "Skyrim" :                 "72850",
+        "Fallout 4" :              "377160",
+        "Fallout 3" :              "22300",
+        "Fallout 3 GOTY" :         "22370",
+        "New Vegas" :              "22380",
+        "Oblivion" :               "22330",
+        "Oblivion Remastered" :    "2623190",
+        "Morrowind" :              "22320"
+    }
+    return steam_id[game]
+
+def folon_depot_files():
+    path = "home/deck/.local/share/Steam/ubuntu12_32/steamapps/content/app_377160"
+    path_id = [
+        os.path.join(path,"depot_377161"),
+        os.path.join(path,"depot_377162"),
+        os.path.join(path,"depot_377163"),
+        os.path.join(path,"depot_377164"),
+        os.path.join(path,"depot_393885"),
+        os.path.join(path,"depot_393895"),
+        os.path.join(path,"depot_435870"),
+        os.path.join(path,"depot_435871"),
+        os.path.join(path,"depot_435880"),
+        os.path.join(path,"depot_435881"),
+        os.path.join(path,"depot_435882"),
+        os.path.join(path,"depot_480630"),
+        os.path.join(path,"depot_480631"),
+        os.path.join(path,"depot_490650"),
+    ]
+    return path_id
@@ -0,0 +1,404 @@
+"""
+Moving the game's Data folder in and out of the DataFolder mod.
+
+Building for the first time moves the game's original Data folder contents into
+mods/DataFolder so they become an ordinary (lowest priority) mod; restoring moves
+them back. Both folders are usually on the same filesystem, where every item is a
+single rename. When the MO2 instance is on another device (e.g. game on the SD card,
+instance on internal storage) the contents are copied in parallel with byte progress,
+verified and only then deleted from the source, so a cancel leaves the source intact.
+
+No Qt in here: the GUI runs these in utils.DataFolderWorker.
+"""
+
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from build_data_folder import (
+    ProgressEvent, make_logger, format_size,
+    discard_build_journal, discard_previous_data_folder, trash_folder, empty_trash,
+    list_profile_trees, remove_profile_tree, discard_build_snapshot
+)
+
+
+DATAFOLDER_MOD_NAME = "DataFolder"
+COPY_WORKERS = 4
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class MoveCancelled(Exception):
+    """Raised when a DataFolder move is cancelled; the source is left untouched."""
+
+
+def _check_cancel(cancel):
+    if cancel is not None and cancel.is_set():
+        raise MoveCancelled("Cancelled")
+
+
+def same_device(path_a, path_b):
+    """True if both (existing) paths are on the same filesystem, so a rename can move between them."""
+    return os.stat(path_a).st_dev == os.stat(path_b).st_dev
+
+
+def _copy_file(src, dest, add_bytes, cancel):
+    """Copy one file in chunks so large archives report progress and can be cancelled."""
+    with open(src, 'rb') as fin, open(dest, 'wb') as fout:
+        while True:
+            _check_cancel(cancel)
+            chunk = fin.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            fout.write(chunk)
+            add_bytes(len(chunk))
+    shutil.copystat(src, dest)
+
+
+def _move_items_same_device(src_dir, dest_dir, names, cancel, events):
+    """
+    Move each top-level item with a single rename. Renames are instant, so a cancel is
+    only honoured before the first one; if a rename fails the items already moved are
+    renamed back, so the source is never left split.
+    """
+    log = make_logger(events)
+    _check_cancel(cancel)
+    started = time.monotonic()
+    moved = []
+    try:
+        for i, name in enumerate(names):
+            os.rename(os.path.join(src_dir, name), os.path.join(dest_dir, name))
+            moved.append(name)
+            if events is not None:
+                events(ProgressEvent("Moving", i + 1, len(names), 0, time.monotonic() - started, "items"))
+    except BaseException:
+        log(f"Moving back the {len(moved)} items already moved, the source was not changed")
+        for name in reversed(moved):
+            os.rename(os.path.join(dest_dir, name), os.path.join(src_dir, name))
+        raise
+    log(f"Moved {len(names)} items (renamed, same filesystem)")
+
+
+def _move_items_cross_device(src_dir, dest_dir, names, cancel, events, workers):
+    """
+    Copy every file under the top-level items in parallel, verify the copies by size,
+    then delete the sources. On cancel or error the partial copies are removed.
+    """
+    log = make_logger(events)
+
+    # Plan the copy: directories to create, files (with sizes) and symlinks
+    dirs = []
+    files = []
+    symlinks = []
+    for name in names:
+        src = os.path.join(src_dir, name)
+        if os.path.islink(src):
+            symlinks.append(name)
+        elif os.path.isdir(src):
+            for root, dirnames, filenames in os.walk(src):
+                rel_root = os.path.relpath(root, src_dir)
+                dirs.append(rel_root)
+                for filename in filenames:
+                    path = os.path.join(root, filename)
+                    rel_path = os.path.join(rel_root, filename)
+                    if os.path.islink(path):
+                        symlinks.append(rel_path)
+                    else:
+                        files.append((rel_path, os.lstat(path).st_size))
+        else:
+            files.append((name, os.lstat(src).st_size))
+
+    total_bytes = sum(size for _, size in files)
+    log(f"Copying {len(files)} files ({format_size(total_bytes)}) with {workers} threads...")
+
+    copied_bytes = [0]
+    lock = threading.Lock()
+
+    def add_bytes(n):
+        with lock:
+            copied_bytes[0] += n
+
+    started = time.monotonic()
+    try:
+        for rel_dir in dirs:
+            os.makedirs(os.path.join(dest_dir, rel_dir), exist_ok=True)
+        for rel_path in symlinks:
+            os.symlink(os.readlink(os.path.join(src_dir, rel_path)), os.path.join(dest_dir, rel_path))
+
+        # Keep a small window of copies in flight so waiting on them stays cheap
+        # with hundreds of thousands of files
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            queued = iter(files)
+            in_flight = set()
+            done_count = 0
+            while True:
+                for rel_path, _ in queued:
+                    in_flight.add(pool.submit(_copy_file, os.path.join(src_dir, rel_path),
+                                              os.path.join(dest_dir, rel_path), add_bytes, cancel))
+                    if len(in_flight) >= workers * 4:
+                        break
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()  # re-raise copy errors and cancellation
+                done_count += len(finished)
+                if events is not None:
+                    events(ProgressEvent("Copying", done_count, len(files), copied_bytes[0],
+                                         time.monotonic() - started, "files", total_bytes))
+
+        # Verify before anything is deleted from the source
+        log("Verifying copies...")
+        for rel_path, size in files:
+            _check_cancel(cancel)
+            dest_size = os.lstat(os.path.join(dest_dir, rel_path)).st_size
+            if dest_size != size:
+                raise OSError(f"Copy of {rel_path} has {dest_size} bytes, expected {size}")
+    except BaseException:
+        log("Removing partial copies, the source was not changed")
+        for name in names:
+            dest = os.path.join(dest_dir, name)
+            if os.path.isdir(dest) and not os.path.islink(dest):
+                shutil.rmtree(dest, ignore_errors=True)
+            elif os.path.lexists(dest):
+                os.remove(dest)
+        raise
+
+    log("Copies verified, deleting the source...")
+    for name in names:
+        src = os.path.join(src_dir, name)
+        if os.path.isdir(src) and not os.path.islink(src):
+            shutil.rmtree(src)
+        else:
+            os.remove(src)
+    log(f"Moved {len(names)} items ({format_size(total_bytes)} copied across filesystems)")
+
+
+def move_folder_contents(src_dir, dest_dir, cancel=None, events=None, workers=COPY_WORKERS):
+    """
+    Move every item in src_dir into dest_dir (which must exist).
+    Same filesystem: one rename per item. Otherwise: parallel copy, verify, delete.
+    cancel: optional token with is_set(); raises MoveCancelled with the source intact.
+    Returns the number of top-level items moved.
+    """
+    log = make_logger(events)
+    names = os.listdir(src_dir)
+    if not names:
+        return 0
+
+    if same_device(src_dir, dest_dir):
+        _move_items_same_device(src_dir, dest_dir, names, cancel, events)
+    else:
+        log(f"{src_dir} and {dest_dir} are on different filesystems")
+        _move_items_cross_device(src_dir, dest_dir, names, cancel, events, workers)
+    return len(names)
+
+
+def create_datafolder_mod(data_path, datafolder_dest, modlist_path, cancel=None, events=None):
+    """
+    Create the initial DataFolder mod by moving game Data folder contents
+    to MO2 mods folder and adding it to modlist.txt.
+    Returns the number of items moved.
+    """
+    log = make_logger(events)
+
+    # Create the DataFolder directory
+    os.makedirs(datafolder_dest)
+    log(f"Created: {datafolder_dest}")
+
+    # Move all contents from Data folder to DataFolder mod
+    log(f"Moving contents from {data_path}...")
+    try:
+        moved_count = move_folder_contents(data_path, datafolder_dest, cancel, events)
+    except BaseException:
+        # Nothing was moved for good, don't leave an empty (or partial) mod behind
+        if not os.listdir(datafolder_dest):
+            os.rmdir(datafolder_dest)
+        raise
+
+    # Update modlist.txt: remove * entries and add +DataFolder
+    log(f"Updating modlist.txt...")
+
+    # Read existing modlist
+    with open(modlist_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    # Remove any lines starting with * (separator lines)
+    original_count = len(lines)
+    lines = [line for line in lines if not line.strip().startswith('*')]
+    removed_count = original_count - len(lines)
+    if removed_count > 0:
+        log(f"  Removed {removed_count} separator entries (lines starting with *)")
+
+    # Check if DataFolder is already in the list
+    datafolder_entry = f"+{DATAFOLDER_MOD_NAME}\n"
+    has_datafolder = any(line.strip() in (f"+{DATAFOLDER_MOD_NAME}", f"-{DATAFOLDER_MOD_NAME}") for line in lines)
+
+    if has_datafolder:
+        log("  DataFolder already in modlist.txt, skipping add...")
+    else:
+        # Add at the bottom (before any empty lines at the end)
+        # Find the last non-empty line
+        insert_pos = len(lines)
+        for i in range(len(lines) - 1, -1, -1):
+            if lines[i].strip():
+                insert_pos = i + 1
+                break
+
+        lines.insert(insert_pos, datafolder_entry)
+        log(f"  Added '+DataFolder' to modlist.txt")
+
+    # Write updated modlist
+    with open(modlist_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+
+    log("")
+    log("=" * 50)
+    log("DataFolder mod created successfully!")
+    log("=" * 50)
+    return moved_count
+
+
+def restore_launcher(game_data, data_path, events=None):
+    """Put the game's original launcher back from its .bak. Returns True if it was restored."""
+    log = make_logger(events)
+    if not game_data:
+        return False
+    launcher_name = game_data.get("launcher_name")
+    if not launcher_name:
+        return False
+
+    game_folder = game_data.get("launcher_location") or game_data.get("game_root") or os.path.dirname(data_path)
+    launcher_path = os.path.join(game_folder, launcher_name)
+    backup_path = os.path.join(game_folder, launcher_name.replace(".exe", ".bak"))
+    if not os.path.exists(backup_path):
+        return False
+
+    log("")
+    log("=" * 50)
+    log("RESTORING ORIGINAL LAUNCHER")
+    log("=" * 50)
+    log(f"Game folder: {game_folder}")
+
+    # Delete the current launcher (script extender copy)
+    if os.path.exists(launcher_path):
+        log(f"Deleting: {launcher_name}")
+        os.remove(launcher_path)
+
+    # Rename .bak back to .exe
+    log(f"Restoring: {launcher_name.replace('.exe', '.bak')} -> {launcher_name}")
+    os.rename(backup_path, launcher_path)
+    log("Original launcher restored!")
+    return True
+
+
+def get_restore_staging_path(data_path):
+    """Where a restore across filesystems copies the DataFolder mod before it replaces the Data folder."""
+    return os.path.abspath(data_path.rstrip(os.sep)) + ".restoring"
+
+
+def restore_datafolder(data_path, datafolder_source, modlist_path, game_data=None, cancel=None, events=None):
+    """
+    Restore the Data folder by moving contents from the DataFolder mod back to the
+    game's Data folder location, then moving the built one aside.
+    On the same filesystem the whole DataFolder mod is renamed to Data in one step;
+    otherwise its items are first moved (copied) into a sibling of the Data folder,
+    and the built Data folder is only replaced once that is complete, so a cancel or
+    error leaves it in place.
+    Also removes the DataFolder entry from modlist.txt and restores the launcher.
+    Returns (moved_count, launcher_restored).
+    """
+    log = make_logger(events)
+
+    moved_count = len(os.listdir(datafolder_source))
+    data_parent = os.path.dirname(os.path.abspath(data_path.rstrip(os.sep)))
+
+    if same_device(datafolder_source, data_parent):
+        # Fast path: the DataFolder mod simply becomes the Data folder
+        staging = datafolder_source
+    else:
+        # Items a restore interrupted after deleting them from the DataFolder mod are
+        # kept; the rest are copied (again) over them
+        staging = get_restore_staging_path(data_path)
+        os.makedirs(staging, exist_ok=True)
+        log(f"Moving contents from {datafolder_source} to {staging}...")
+        try:
+            move_folder_contents(datafolder_source, staging, cancel, events)
+        except BaseException:
+            if not os.listdir(staging):
+                os.rmdir(staging)
+            raise
+        moved_count = len(os.listdir(staging))
+
+        # Remove the now-empty DataFolder directory
+        log(f"Removing empty DataFolder mod directory...")
+        os.rmdir(datafolder_source)
+        log("Removed.")
+
+    # Swap: move the built Data folder aside (a rename) and the restored one in
+    old_data = None
+    if os.path.exists(data_path):
+        old_data = trash_folder(data_path, data_path)
+        if old_data is None:
+            old_data = f"{os.path.abspath(data_path.rstrip(os.sep))}.old-{time.time_ns()}"
+            os.rename(data_path, old_data)
+    try:
+        os.rename(staging, data_path)
+    except OSError:
+        if old_data is not None:
+            os.rename(old_data, data_path)
+        raise
+    log(f"Renamed {staging} -> {data_path}")
+    if old_data is not None:
+        if os.path.dirname(old_data) == data_parent:
+            log(f"Deleting the built Data folder: {old_data}")
+            shutil.rmtree(old_data)
+            log("Deleted.")
+        else:
+            log("Moved the built Data folder aside, deleting it in the background")
+
+    # Builds in progress, kept for rollback or prebuilt for other profiles no longer apply
+    discard_build_journal(data_path)
+    discard_previous_data_folder(data_path)
+    for profile in list_profile_trees(data_path):
+        remove_profile_tree(data_path, profile)
+    empty_trash(data_path, background=True)
+
+    # The restored Data folder is not a build: drop the snapshot (index, overrides, pack
+    # and archive lists) so Verify, Reclaim and the Conflict Explorer don't act on it,
+    # and the archives packed for the built Data folders
+    import pack
+
+    discard_build_snapshot(data_path)
+    pack.prune_pack_cache(data_path)
+
+    # Update modlist.txt: remove DataFolder entry
+    log(f"Updating modlist.txt...")
+
+    # Read existing modlist
+    with open(modlist_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    # Remove any lines containing DataFolder (+ or -)
+    original_count = len(lines)
+    lines = [line for line in lines if line.strip() not in (f"+{DATAFOLDER_MOD_NAME}", f"-{DATAFOLDER_MOD_NAME}")]
+    removed_count = original_count - len(lines)
+
+    if removed_count > 0:
+        log(f"  Removed {removed_count} DataFolder entry/entries from modlist.txt")
+    else:
+        log("  No DataFolder entry found in modlist.txt")
+
+    # Write updated modlist
+    with open(modlist_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+
+    # Restore original launcher from backup
+    launcher_restored = restore_launcher(game_data, data_path, events)
+
+    log("")
+    log("=" * 50)
+    log("Data folder restored successfully!")
+    log("=" * 50)
+    return moved_count, launcher_restored
@@ -0,0 +1,364 @@
+"""
+Replace identical files in the mods folders of every known MO2 instance with
+hardlinks to a single copy.
+
+The same body meshes, texture packs and SKSE plugins often end up installed in
+several instances. Candidates are narrowed down cheaply before anything is read
+in full: files are grouped by device and size, then by a hash of their first and
+last blocks, and only what still matches is hashed completely (in a thread pool,
+hashlib releases the GIL while hashing). Hashes are kept in a cache keyed by
+device, inode, size and mtime, so a second run only reads new or changed files.
+
+Only files on the same filesystem can share an inode. Each duplicate is replaced
+atomically (linked next to it under a temporary name, then renamed over it) and
+only if it is still the file that was hashed. Hardlinked copies share their
+contents: editing one edits them all, like the links of a built Data folder.
+
+No Qt in here: the GUI runs this in utils.DedupeWorker.
+"""
+
+import os
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from build_data_folder import ProgressEvent, make_logger, format_size
+
+
+# Smaller files save little and are by far the most numerous
+MIN_SIZE = 64 * 1024
+# Bytes hashed at each end of a file for the partial hash
+PARTIAL_BYTES = 64 * 1024
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+HASH_WORKERS = 4
+HASH_CACHE_HEADER = "# mo2manager hash cache v1"
+# Suffix of the link made next to a duplicate before it is renamed over it
+TEMP_SUFFIX = ".mo2dedupe"
+
+
+class DedupeCancelled(Exception):
+    """Raised when a dedupe pass is cancelled; files linked so far stay linked."""
+
+
+def _check_cancel(cancel):
+    if cancel is not None and cancel.is_set():
+        raise DedupeCancelled("Cancelled")
+
+
+def get_hash_cache_path():
+    """Where file hashes are kept between runs (~/.cache/mo2manager/hashes.tsv)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "mo2manager", "hashes.tsv")
+
+
+def load_hash_cache():
+    """Return a dict of (device, inode) -> [size, mtime_ns, partial_hash, full_hash] ("" when unknown)."""
+    cache = {}
+    try:
+        with open(get_hash_cache_path(), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) == 6:
+                    cache[(int(parts[0]), int(parts[1]))] = [int(parts[2]), int(parts[3]), parts[4], parts[5]]
+    except (OSError, ValueError):
+        return {}
+    return cache
+
+
+def save_hash_cache(cache):
+    """Write the hash cache atomically; a cache that can't be written is only a slower next run."""
+    path = get_hash_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(HASH_CACHE_HEADER + "\n")
+            for (device, inode), (size, mtime_ns, partial, full) in cache.items():
+                if partial or full:
+                    f.write(f"{device}\t{inode}\t{size}\t{mtime_ns}\t{partial}\t{full}\n")
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def get_known_mods_folders():
+    """The mods folder of every MO2 instance found by the last scan (see core.load_known_instances)."""
+    import core
+
+    folders = []
+    for _, instance in core.load_known_instances():
+        mods_folder = os.path.join(instance, "mods")
+        if os.path.isdir(mods_folder) and mods_folder not in folders:
+            folders.append(mods_folder)
+    return folders
+
+
+def partial_hash(path, size):
+    """Hash of the size and the first and last PARTIAL_BYTES of a file."""
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(PARTIAL_BYTES))
+        if size > PARTIAL_BYTES:
+            f.seek(max(size - PARTIAL_BYTES, PARTIAL_BYTES))
+            digest.update(f.read(PARTIAL_BYTES))
+    return digest.hexdigest()
+
+
+def full_hash(path, cancel=None):
+    """Hash of the whole file."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as f:
+        while True:
+            _check_cancel(cancel)
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _collect_files(mods_folders, min_size, cancel, leftovers=None):
+    """
+    Every regular file of at least min_size bytes in the mods folders, by inode.
+    Temporary links left by an interrupted run are added to leftovers instead.
+    Returns a dict of (device, inode) -> [stat_result, [paths]].
+    """
+    files = {}
+    for mods_folder in mods_folders:
+        stack = [mods_folder]
+        while stack:
+            _check_cancel(cancel)
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                if entry.name.endswith(TEMP_SUFFIX):
+                                    if leftovers is not None:
+                                        leftovers.append(entry.path)
+                                    continue
+                                st = entry.stat(follow_symlinks=False)
+                                if st.st_size < min_size:
+                                    continue
+                                key = (st.st_dev, st.st_ino)
+                                if key in files:
+                                    if entry.path not in files[key][1]:
+                                        files[key][1].append(entry.path)
+                                else:
+                                    files[key] = [st, [entry.path]]
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+    return files
+
+
+def _regroup(groups, key_of):
+    """Split each group of inodes by key_of(inode); keep only the groups with more than one inode."""
+    regrouped = {}
+    for group_key, inodes in groups.items():
+        for inode in inodes:
+            key = key_of(inode)
+            if key is not None:
+                regrouped.setdefault(group_key + (key,), []).append(inode)
+    return {key: inodes for key, inodes in regrouped.items() if len(inodes) > 1}
+
+
+def _replace_with_link(keeper_path, keeper_stat, path, st):
+    """Replace path with a hardlink to keeper_path if neither changed since they were hashed."""
+    for check_path, expected in ((keeper_path, keeper_stat), (path, st)):
+        current = os.lstat(check_path)
+        if ((current.st_dev, current.st_ino, current.st_size, current.st_mtime_ns) !=
+                (expected.st_dev, expected.st_ino, expected.st_size, expected.st_mtime_ns)):
+            raise OSError(f"changed since it was hashed: {check_path}")
+    tmp_path = path + TEMP_SUFFIX
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    os.link(keeper_path, tmp_path)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+def dedupe_mod_folders(mods_folders=None, link=True, min_size=MIN_SIZE, workers=HASH_WORKERS,
+                       events=None, cancel=None):
+    """
+    Find identical files across mods_folders (default: every known instance's mods
+    folder) and, with link=True, replace the duplicates with hardlinks to one copy.
+    The copy kept is the one with the most links already (e.g. one linked into a
+    Data folder), so duplicates that are only in a mods folder free their space now.
+    Returns a dict with "groups", "duplicates" (files that are or would be linked),
+    "linked", "reclaimed" (bytes freed), "pending" (bytes still held by other links,
+    freed once e.g. the Data folders are rebuilt) and "failed" ([(path, error)]).
+    """
+    log = make_logger(events)
+    if mods_folders is None:
+        mods_folders = get_known_mods_folders()
+
+    log("=" * 70)
+    log("DEDUPLICATE MOD FILES" if link else "DUPLICATE MOD FILES (dry run)")
+    log("=" * 70)
+    for mods_folder in mods_folders:
+        log(f"Mods folder: {mods_folder}")
+    if not mods_folders:
+        log("No MO2 instances found. Scan for instances first.")
+    log()
+
+    # Step 1: group the files by device and size (hardlinks to one inode count once)
+    log("Step 1: Listing files...")
+    leftovers = []
+    files = _collect_files(mods_folders, min_size, cancel, leftovers)
+    # Links of an interrupted run (the duplicate they were for is still in place);
+    # a build would link them into the Data folder
+    if leftovers:
+        removed = 0
+        for path in leftovers if link else []:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError as e:
+                log(f"  Could not remove {path}: {e}")
+        log(f"  Temporary files left by an interrupted run: {len(leftovers)}"
+            + (f" (removed {removed})" if link else ""))
+    by_size = {}
+    for key, (st, paths) in files.items():
+        by_size.setdefault((st.st_dev, st.st_size), []).append(key)
+    by_size = {key: inodes for key, inodes in by_size.items() if len(inodes) > 1}
+    log(f"  Files of {format_size(min_size)} or more: {sum(len(paths) for _, paths in files.values())}"
+        f" ({len(files)} distinct)")
+    log(f"  Sharing a size with another file: {sum(len(inodes) for inodes in by_size.values())}")
+    log()
+
+    cache = load_hash_cache()
+    lock = threading.Lock()
+    progress = {"done": 0, "bytes": 0}
+
+    def hashes_of(key):
+        st = files[key][0]
+        entry = cache.get(key)
+        if entry is None or entry[0] != st.st_size or entry[1] != st.st_mtime_ns:
+            entry = cache[key] = [st.st_size, st.st_mtime_ns, "", ""]
+        return entry
+
+    def run_pool(phase, keys, compute, index, total_bytes):
+        """Fill hash number index (2: partial, 3: full) of every key in a thread pool."""
+        started = time.monotonic()
+        progress["done"] = 0
+        progress["bytes"] = 0
+
+        def work(key):
+            _check_cancel(cancel)
+            with lock:
+                entry = hashes_of(key)
+                cached = entry[index]
+            if not cached:
+                st, paths = files[key]
+                try:
+                    value = compute(paths[0], st.st_size)
+                except OSError:
+                    value = ""
+                with lock:
+                    entry[index] = value
+            with lock:
+                progress["done"] += 1
+                progress["bytes"] += files[key][0].st_size if index == 3 else 0
+                if events is not None:
+                    events(ProgressEvent(phase, progress["done"], len(keys), progress["bytes"],
+                                         time.monotonic() - started, "files", total_bytes))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(work, keys))
+
+    try:
+        # Step 2: partial hashes, unless the file is small enough to hash whole
+        log("Step 2: Comparing the start and end of each candidate...")
+        partial_keys = [key for inodes in by_size.values() for key in inodes
+                        if files[key][0].st_size > 2 * PARTIAL_BYTES]
+        run_pool("Partial hashing", partial_keys, partial_hash, 2, 0)
+
+        def partial_key(key):
+            # Small files all fall through to the full hash; a file that can't be read drops out
+            if files[key][0].st_size <= 2 * PARTIAL_BYTES:
+                return ""
+            return hashes_of(key)[2] or None
+
+        by_partial = _regroup(by_size, partial_key)
+        log(f"  Still matching: {sum(len(inodes) for inodes in by_partial.values())}")
+        log()
+
+        # Step 3: full hashes of what is left
+        log("Step 3: Hashing the remaining candidates...")
+        full_keys = [key for inodes in by_partial.values() for key in inodes]
+        to_read = sum(files[key][0].st_size for key in full_keys if not hashes_of(key)[3])
+        log(f"  {len(full_keys)} files, {format_size(to_read)} not in the hash cache")
+        run_pool("Hashing", full_keys, lambda path, size: full_hash(path, cancel), 3,
+                 sum(files[key][0].st_size for key in full_keys))
+        groups = _regroup(by_partial, lambda key: hashes_of(key)[3] or None)
+        log()
+    finally:
+        # Only files still in the mods folders; the rest was deleted or replaced
+        save_hash_cache({key: entry for key, entry in cache.items() if key in files})
+
+    result = {"groups": len(groups), "duplicates": 0, "linked": 0, "reclaimed": 0, "pending": 0, "failed": []}
+
+    # Step 4: link every copy to the one with the most links
+    log("Step 4: Linking duplicates..." if link else "Step 4: Duplicates found:")
+    ordered = sorted(groups.items(), key=lambda item: item[0][1] * len(item[1]), reverse=True)
+    for n, (group_key, inodes) in enumerate(ordered):
+        _check_cancel(cancel)
+        inodes.sort(key=lambda key: (-files[key][0].st_nlink, files[key][1][0]))
+        keeper_stat, keeper_paths = files[inodes[0]]
+        size = keeper_stat.st_size
+        result["duplicates"] += sum(len(files[key][1]) for key in inodes[1:])
+        if n < 20:
+            log(f"  {format_size(size)} x {len(inodes)}: {keeper_paths[0]}")
+        elif n == 20:
+            log(f"  ... and {len(ordered) - 20} more groups")
+        if not link:
+            continue
+        for key in inodes[1:]:
+            st, paths = files[key]
+            replaced = 0
+            for path in paths:
+                try:
+                    _replace_with_link(keeper_paths[0], keeper_stat, path, st)
+                    replaced += 1
+                    result["linked"] += 1
+                except OSError as e:
+                    result["failed"].append((path, str(e)))
+            if replaced == 0:
+                continue
+            # The old inode is gone only if every link to it was one of ours
+            if replaced == len(paths) and st.st_nlink == len(paths):
+                result["reclaimed"] += size
+            else:
+                result["pending"] += size
+    log()
+
+    log("=" * 70)
+    log("SUMMARY")
+    log("=" * 70)
+    log(f"Groups of identical files: {result['groups']}")
+    if link:
+        log(f"Files replaced by hardlinks: {result['linked']}")
+        log(f"Space reclaimed: {format_size(result['reclaimed'])} ({result['reclaimed']:,} bytes)")
+        if result["pending"]:
+            log(f"Still held by other links (e.g. a built Data folder): {format_size(result['pending'])}")
+            log("  It is freed once those are rebuilt or removed.")
+        if result["failed"]:
+            log(f"Failed: {len(result['failed'])}")
+            for path, error in result["failed"][:10]:
+                log(f"  {path}: {error}")
+    else:
+        saving = sum(group_key[1] * (len(inodes) - 1) for group_key, inodes in groups.items())
+        log(f"Duplicate files: {result['duplicates']}")
+        log(f"Space that linking would reclaim: up to {format_size(saving)} ({saving:,} bytes)")
+    log("=" * 70)
+    return result
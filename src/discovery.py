@@ -0,0 +1,177 @@
+"""
+One shared walk of the Steam libraries, SD cards and game folders for every file
+the app looks for (ModOrganizer.exe and the game launchers).
+
+Each root is walked once, only as deep as the known layouts need
+(<game_root>/<name> MO2/ModOrganizer.exe, the launcher in game_root or in
+Binaries/Win64), and every wanted file name is matched in the same pass.
+Roots on different devices (internal storage, each SD card) are walked at the
+same time; a folder reached from two overlapping roots is only listed once.
+The last complete walk is kept so a second scanner can reuse it.
+"""
+
+import os
+import time
+import threading
+
+MO2_EXE = "modorganizer.exe"
+
+SKIP_DIRS = {'node_modules', '__pycache__', '.git', '.cache', 'Trash',
+             '.build_venv', '.venv', 'venv'}
+
+# Folder levels looked into below each kind of root:
+# <common>/<game>/OblivionRemastered/Binaries/Win64/<launcher> is 4 below a Steam common folder,
+# <card>/steamapps/common/... adds 2 on an SD card, <game_root>/<name> MO2 is 1 below a game folder
+STEAM_COMMON_DEPTH = 4
+MEDIA_DEPTH = 6
+GAME_ROOT_DEPTH = 3
+
+# How long a fallback scan may reuse the last walk (installs rarely change within minutes)
+CACHE_SECONDS = 300
+
+_cache_lock = threading.Lock()
+_cache = None  # (finished time, roots, patterns, matches) of the last complete walk
+
+
+def get_patterns(game_paths):
+    """The lowercase file names every scanner looks for: ModOrganizer.exe and each launcher."""
+    patterns = {MO2_EXE}
+    for game in game_paths:
+        if game.get("launcher_name"):
+            patterns.add(game["launcher_name"].lower())
+    return patterns
+
+
+def get_scan_roots(game_paths):
+    """
+    (path, max_depth) for every place games and MO2 instances are looked for:
+    the Steam library common folders, each mounted SD card and the configured game folders.
+    """
+    import steam
+
+    roots = []
+    home = os.path.expanduser("~")
+
+    # Internal storage and any other Steam libraries
+    steam_commons = [os.path.join(library, "steamapps", "common") for library in steam.get_library_folders()]
+    steam_commons.append(os.path.join(home, ".local/share/Steam/steamapps/common"))
+    for steam_common in steam_commons:
+        roots.append((steam_common, STEAM_COMMON_DEPTH))
+
+    # SD cards and other mounted media
+    media_dir = os.path.join("/run/media", os.path.basename(home))
+    if os.path.isdir(media_dir):
+        for entry in sorted(os.listdir(media_dir)):
+            roots.append((os.path.join(media_dir, entry), MEDIA_DEPTH))
+
+    # Configured game directories (custom locations outside the above)
+    for game in game_paths:
+        game_folder = game.get("game_root") or (os.path.dirname(game["data_path"]) if game.get("data_path") else "")
+        if game_folder:
+            roots.append((game_folder, GAME_ROOT_DEPTH))
+
+    # Resolve symlinks so overlapping roots meet on the same paths; drop missing roots
+    unique = {}
+    for path, max_depth in roots:
+        real = os.path.realpath(path)
+        if os.path.isdir(real) and unique.get(real, -1) < max_depth:
+            unique[real] = max_depth
+    return list(unique.items())
+
+
+def _walk(root, max_depth, patterns, visited, lock, cancel, on_match):
+    """Depth-limited walk of one root; returns (lowercase name, file path) for each match."""
+    matches = []
+    stack = [(root, 0)]
+    while stack:
+        if cancel is not None and cancel.is_set():
+            break
+        path, depth = stack.pop()
+
+        # Skip folders another root already listed at least as deep
+        remaining = max_depth - depth
+        with lock:
+            if visited.get(path, -1) >= remaining:
+                continue
+            visited[path] = remaining
+
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if remaining > 0 and entry.name not in SKIP_DIRS:
+                                subdirs.append(entry.path)
+                        elif entry.name.lower() in patterns:
+                            matches.append((entry.name.lower(), entry.path))
+                            if on_match is not None:
+                                on_match(entry.name.lower(), entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        # Depth first, in name order
+        stack.extend((subdir, depth + 1) for subdir in sorted(subdirs, reverse=True))
+    return matches
+
+
+def discover(patterns, roots, cancel=None, on_match=None, max_age=0):
+    """
+    Walk roots ((path, max_depth) tuples, see get_scan_roots) for files whose lowercase
+    name is in patterns. Roots are grouped by device and the devices walked concurrently.
+    on_match(lowercase_name, file_path) is called from the walking threads as files are found.
+    With max_age, the last complete walk is reused if it covered the same roots and
+    patterns and finished less than max_age seconds ago.
+    If cancel (a threading.Event) is set the walk stops and returns what it found so far.
+    Returns a dict mapping each pattern to the matching file paths, in root order.
+    """
+    global _cache
+
+    patterns = {p.lower() for p in patterns}
+    roots = [(os.path.realpath(path), max_depth) for path, max_depth in roots]
+    if max_age:
+        with _cache_lock:
+            if (_cache is not None and time.monotonic() - _cache[0] < max_age
+                    and _cache[1] == roots and patterns <= _cache[2]):
+                return {p: list(_cache[3].get(p, [])) for p in patterns}
+
+    # One walking thread per device, each walking its roots in order
+    by_device = {}
+    for index, (path, max_depth) in enumerate(roots):
+        try:
+            device = os.stat(path).st_dev
+        except OSError:
+            continue
+        by_device.setdefault(device, []).append((index, path, max_depth))
+
+    visited = {}
+    lock = threading.Lock()
+    per_root = {}
+
+    def walk_device(device_roots):
+        for index, path, max_depth in device_roots:
+            per_root[index] = _walk(path, max_depth, patterns, visited, lock, cancel, on_match)
+
+    if len(by_device) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(by_device)) as executor:
+            list(executor.map(walk_device, by_device.values()))
+    else:
+        for device_roots in by_device.values():
+            walk_device(device_roots)
+
+    # A folder listed again from a deeper root reports its files twice
+    matches = {p: [] for p in patterns}
+    seen = set()
+    for index in sorted(per_root):
+        for name, file_path in per_root[index]:
+            if file_path not in seen:
+                seen.add(file_path)
+                matches[name].append(file_path)
+
+    if cancel is None or not cancel.is_set():
+        with _cache_lock:
+            _cache = (time.monotonic(), roots, patterns, matches)
+    return {p: list(paths) for p, paths in matches.items()}
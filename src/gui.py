@@ -9,21 +9,22 @@ import sys
 import json
 import shutil
 import subprocess
-import tempfile
-import zipfile
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QFileDialog, QComboBox,
-    QTextEdit, QGroupBox, QMessageBox, QProgressBar,
+    QPlainTextEdit, QGroupBox, QMessageBox, QProgressBar,
     QInputDialog, QListWidget, QListWidgetItem,
-    QDialog, QDialogButtonBox
+    QDialog, QDialogButtonBox, QCheckBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QObject, QFileSystemWatcher
 from PyQt6.QtGui import QFont
 
+import core
 import utils
-import build_json
+
+# Lines kept in the on-screen log
+LOG_MAX_LINES = 5000
 
 
 class InstancePanel(QWidget):
@@ -80,6 +81,15 @@ class InstancePanel(QWidget):
             self.list_widget.addItem(item)
         self.list_widget.blockSignals(False)
 
+    def add_instance(self, display_name, folder_path):
+        """Append one (display_name, folder_path) instance unless it is already listed."""
+        if any(path == folder_path for _, path in self.instances):
+            return
+        self.instances = self.instances + [(display_name, folder_path)]
+        item = QListWidgetItem(display_name)
+        item.setData(Qt.ItemDataRole.UserRole, folder_path)
+        self.list_widget.addItem(item)
+
     def _on_item_changed(self, current, previous):
         """Handle list selection change."""
         if current:
@@ -102,6 +112,107 @@ class InstancePanel(QWidget):
         return item.data(Qt.ItemDataRole.UserRole) if item else None
 
 
+class PathStateCache(QObject):
+    """
+    Cached isfile/isdir/non-empty answers for the few paths the buttons depend on.
+    The parent folder of each path is watched (QFileSystemWatcher, inotify on Linux)
+    and any change there drops the cached answers below it and emits changed,
+    so button updates do no file system I/O until something actually changes.
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._states = {}  # (kind, path) -> bool
+        self._watched = {}  # path -> (device, inode) of the folder the watch follows
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._path_changed)
+        self.watcher.fileChanged.connect(self._path_changed)
+        # Coalesce bursts of changes (e.g. a build) into one update
+        self._notify_timer = QTimer(self)
+        self._notify_timer.setSingleShot(True)
+        self._notify_timer.setInterval(100)
+        self._notify_timer.timeout.connect(self.changed.emit)
+
+    def is_file(self, path):
+        return self._get("file", path, os.path.isfile)
+
+    def is_dir(self, path):
+        return self._get("dir", path, os.path.isdir)
+
+    def has_entries(self, path):
+        """Whether path is a folder with anything in it (stops at the first entry)."""
+        return self._get("entries", path, _has_entries)
+
+    def invalidate(self):
+        """Forget every cached answer (e.g. on Refresh)."""
+        self._states.clear()
+
+    def _get(self, kind, path, check):
+        if not path:
+            return False
+        path = os.path.abspath(path)
+        key = (kind, path)
+        if key in self._states:
+            return self._states[key]
+        result = check(path)
+        # Only cache what a watch will tell us about: the nearest existing parent,
+        # and for has_entries the folder itself (or its nearest existing parent)
+        watched = self._watch(os.path.dirname(path))
+        if kind == "entries":
+            watched = self._watch(path) and watched
+        if watched:
+            self._states[key] = result
+        return result
+
+    def _watch(self, path):
+        while path and not os.path.isdir(path):
+            parent = os.path.dirname(path)
+            if parent == path:
+                return False
+            path = parent
+        if path in self._watched:
+            return True
+        identity = _folder_identity(path)
+        if identity is not None and self.watcher.addPath(path):
+            self._watched[path] = identity
+            return True
+        return False
+
+    def _path_changed(self, path):
+        prefix = path.rstrip(os.sep) + os.sep
+        for key in [k for k in self._states if k[1] == path or k[1].startswith(prefix)]:
+            del self._states[key]
+        # A watch follows the folder, not its path: when a folder is removed, or renamed
+        # aside and recreated (a build does this to Data), watch the path again
+        for watched in [w for w in self._watched if w == path or w.startswith(prefix)]:
+            if _folder_identity(watched) != self._watched[watched]:
+                del self._watched[watched]
+                self.watcher.removePath(watched)
+                if os.path.isdir(watched):
+                    self._watch(watched)
+        self._notify_timer.start()
+
+
+def _folder_identity(path):
+    """(device, inode) of a folder, or None if it can't be read."""
+    try:
+        st = os.stat(path)
+        return st.st_dev, st.st_ino
+    except OSError:
+        return None
+
+
+def _has_entries(path):
+    """True if the folder has at least one entry, without listing all of it."""
+    try:
+        with os.scandir(path) as it:
+            return next(it, None) is not None
+    except OSError:
+        return False
+
+
 class MO2MergerGUI(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -115,16 +226,37 @@ class MO2MergerGUI(QMainWindow):
         self.profiles_folder = ""
         self.selected_profile = ""
 
+        # Mod statistics view, created on first use
+        self.mod_stats_model = None
+        self.mod_stats_dialog = None
+        self.mod_stats_worker = None
+        self.conflict_dialog = None
+        self.dedupe_worker = None
+        self.prewarm_worker = None
+        self.mod_stats_cache = {}  # mod path -> (folder signature, files, size)
+
+        # File system state behind the button states, kept current by a watcher
+        self.fs_state = PathStateCache(self)
+        self.fs_state.changed.connect(self.fs_state_changed)
+
         self.init_ui()
 
+        # Look for new or moved MO2 instances without holding up the window
+        self.instance_scan_worker = None
+        self._rescan_pending = False
+        self.start_instance_scan(quiet=True)
+
+        # Report builds cut short by sleep or power loss once the window is up
+        QTimer.singleShot(0, self.report_interrupted_builds)
+
     def init_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         main_layout = QHBoxLayout(central_widget)
         main_layout.setSpacing(10)
 
-        # Instance panel (left sidebar)
-        self.mo2_instances = utils.scan_for_mo2_instances()
+        # Instance panel (left sidebar), from the last scan until the background rescan finishes
+        self.mo2_instances = core.load_known_instances()
         self.instance_panel = InstancePanel()
         self.instance_panel.setMaximumWidth(280)
         self.instance_panel.set_instances(self.mo2_instances)
@@ -161,6 +293,20 @@ class MO2MergerGUI(QMainWindow):
         self.open_instance_btn.clicked.connect(self.open_instance_folder)
         instance_btn_layout.addWidget(self.open_instance_btn)
 
+        # Per-mod statistics (sizes, conflicts), computed in the background
+        self.mod_stats_btn = QPushButton("Mod Stats")
+        self.mod_stats_btn.setEnabled(False)
+        self.mod_stats_btn.setToolTip("Show each mod's file count, size and conflicts won and lost")
+        self.mod_stats_btn.clicked.connect(self.show_mod_stats)
+        instance_btn_layout.addWidget(self.mod_stats_btn)
+
+        # Hardlink identical files across the instances' mods folders
+        self.dedupe_btn = QPushButton("Dedupe Mods")
+        self.dedupe_btn.setToolTip("Find files that are identical across all MO2 instances' mods folders\n"
+                                   "and replace the copies with hardlinks to one file")
+        self.dedupe_btn.clicked.connect(lambda: self.dedupe_mods())
+        instance_btn_layout.addWidget(self.dedupe_btn)
+
         mo2_layout.addLayout(instance_btn_layout)
 
         # Script Extender buttons row
@@ -269,6 +415,16 @@ class MO2MergerGUI(QMainWindow):
         profile_layout.addWidget(self.modlist_status_label)
         profile_layout.addWidget(self.plugins_status_label)
 
+        # Per-profile Data folders (saved per game as "profile_trees")
+        self.profile_trees_check = QCheckBox("Keep a Data folder per profile")
+        self.profile_trees_check.setToolTip(
+            "Keep a prebuilt Data folder (Data.<profile>) next to the game's Data folder for\n"
+            "every profile that has been built. Switching profiles swaps the folders instantly\n"
+            "and builds only update the selected profile's folder."
+        )
+        self.profile_trees_check.toggled.connect(self.on_profile_trees_toggled)
+        profile_layout.addWidget(self.profile_trees_check)
+
         profile_group.setLayout(profile_layout)
         layout.addWidget(profile_group)
 
@@ -277,7 +433,7 @@ class MO2MergerGUI(QMainWindow):
         output_layout = QVBoxLayout()
 
         # Game selection dropdown
-        self.game_paths = utils.load_game_paths()
+        self.game_paths = core.load_game_paths()
         game_select_layout = QHBoxLayout()
         game_select_layout.addWidget(QLabel("Game:"))
         self.game_combo = QComboBox()
@@ -348,11 +504,39 @@ class MO2MergerGUI(QMainWindow):
         plugins_output_layout.addWidget(self.change_prefix_btn)
         output_layout.addLayout(plugins_output_layout)
 
+        # Page cache prewarming (saved per game as "prewarm")
+        self.prewarm_check = QCheckBox("Prewarm the Data folder after builds and at launch")
+        self.prewarm_check.setToolTip(
+            "Ask the kernel to read plugins, archives and then the smallest loose files into\n"
+            "memory (up to the game's prewarm_budget_mb, 2048 MB by default) after a build\n"
+            "and when the game is started through mo2manager launch or prelaunch.\n"
+            "Cuts the random reads of a cold start, most of all from an SD card."
+        )
+        self.prewarm_check.toggled.connect(self.on_prewarm_toggled)
+        output_layout.addWidget(self.prewarm_check)
+
+        # Packing loose files into archives (saved per game as "pack_archives")
+        self.pack_check = QCheckBox("Pack loose files into archives after builds")
+        self.pack_check.setToolTip(
+            "Move the meshes, textures, sounds and scripts the build linked into uncompressed\n"
+            "BSA/BA2 archives, one per folder, loaded by empty plugins added at the end of\n"
+            "plugins.txt. The game sees the same files but opens far fewer of them.\n"
+            "Archives are cached and only rewritten when their files change.\n"
+            "Set pack_archives to \"mod\" in game_paths.json for one archive per mod."
+        )
+        self.pack_check.toggled.connect(self.on_pack_toggled)
+        output_layout.addWidget(self.pack_check)
+
         # Set initial state - show paths from first game if available
         if self.game_paths:
             self.data_output_edit.setText(self.game_paths[0].get("data_path", ""))
-            self.plugins_output_edit.setText(utils.get_prefix_from_plugins_path(self.game_paths[0].get("prefix_path", "")))
+            self.plugins_output_edit.setText(core.get_prefix_from_plugins_path(self.game_paths[0].get("prefix_path", "")))
             self.downgrade_btn.setVisible(self.game_paths[0].get("name") in ("Fallout 3", "Fallout 3 GOTY"))
+            self.profile_trees_check.setChecked(bool(self.game_paths[0].get("profile_trees")))
+            self.prewarm_check.blockSignals(True)
+            self.prewarm_check.setChecked(bool(self.game_paths[0].get("prewarm")))
+            self.prewarm_check.blockSignals(False)
+            self.update_pack_check(self.game_paths[0])
 
         output_group.setLayout(output_layout)
         layout.addWidget(output_group)
@@ -383,21 +567,73 @@ class MO2MergerGUI(QMainWindow):
         )
         buttons_layout.addWidget(self.restore_datafolder_btn)
 
+        # Verify Data Folder Button
+        self.verify_btn = QPushButton("Verify Data Folder")
+        self.verify_btn.setEnabled(False)
+        self.verify_btn.setMinimumHeight(40)
+        self.verify_btn.clicked.connect(self.verify_datafolder)
+        self.verify_btn.setToolTip(
+            "Compare the Data folder with the last build.\n"
+            "Reports broken hardlinks, missing files and files not created by the build,\n"
+            "and offers to repair only the affected files."
+        )
+        buttons_layout.addWidget(self.verify_btn)
+
+        # Explore Conflicts Button
+        self.conflicts_btn = QPushButton("Explore Conflicts")
+        self.conflicts_btn.setEnabled(False)
+        self.conflicts_btn.setMinimumHeight(40)
+        self.conflicts_btn.clicked.connect(lambda: self.show_conflict_explorer())
+        self.conflicts_btn.setToolTip(
+            "Search every file of the last build: which mod it comes from\n"
+            "and which mods it overrides."
+        )
+        buttons_layout.addWidget(self.conflicts_btn)
+
+        # Reclaim Space Button
+        self.reclaim_btn = QPushButton("Reclaim Space")
+        self.reclaim_btn.setEnabled(False)
+        self.reclaim_btn.setMinimumHeight(40)
+        self.reclaim_btn.clicked.connect(lambda: self.reclaim_space())
+        self.reclaim_btn.setToolTip(
+            "List the mod files that are overridden in every profile, using the last build,\n"
+            "and move them to another folder or delete them."
+        )
+        buttons_layout.addWidget(self.reclaim_btn)
+
         layout.addLayout(buttons_layout)
 
-        # Progress Bar
+        # Disabled (with the buttons above) while the DataFolder mod is created or restored
+        self.data_action_widgets = (self.instance_panel, mo2_group, profile_group, output_group)
+
+        # Progress Bar (with a Cancel button while a build runs)
+        progress_layout = QHBoxLayout()
         self.progress_bar = QProgressBar()
         self.progress_bar.setRange(0, 0)  # Indeterminate
         self.progress_bar.setVisible(False)
-        layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_bar)
+
+        self.progress_label = QLabel()
+        self.progress_label.setVisible(False)
+        progress_layout.addWidget(self.progress_label)
+
+        self.cancel_build_btn = QPushButton("Cancel")
+        self.cancel_build_btn.setVisible(False)
+        self.cancel_build_btn.clicked.connect(self.cancel_build)
+        self.cancel_build_btn.setToolTip("Stop the build and restore the previous Data folder")
+        progress_layout.addWidget(self.cancel_build_btn)
+        layout.addLayout(progress_layout)
 
         # Output Log Group
         log_group = QGroupBox("Build Output")
         log_layout = QVBoxLayout()
 
-        self.log_text = QTextEdit()
+        # Only the last LOG_MAX_LINES lines are kept on screen, builds stream the
+        # full log to ~/.config/mo2manager/logs
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setFont(QFont("Monospace", 9))
+        self.log_text.setMaximumBlockCount(LOG_MAX_LINES)
         log_layout.addWidget(self.log_text)
 
         log_group.setLayout(log_layout)
@@ -417,22 +653,83 @@ class MO2MergerGUI(QMainWindow):
             self.validate_mo2_folder()
 
     def rescan_mo2_instances(self):
-        """Rescan for MO2 instances and update the instance panel."""
-        current_path = self.instance_panel.current_path()
+        """Rescan for MO2 instances in the background and report the result."""
+        self.start_instance_scan(quiet=False)
 
-        self.mo2_instances = utils.scan_for_mo2_instances()
-        self.instance_panel.set_instances(self.mo2_instances)
+    def start_instance_scan(self, quiet=False):
+        """
+        Walk the Steam libraries and SD cards for MO2 instances in a worker thread.
+        Instances are added to the panel as they are found; the finished scan replaces
+        the list (dropping ones that are gone). quiet skips the result message box.
+        """
+        worker = self.instance_scan_worker
+        if worker is not None and worker.isRunning():
+            # Scan again once the current walk is done, it may have passed the new folder
+            self._rescan_pending = True
+            self._scan_quiet = self._scan_quiet and quiet
+            return
 
-        # Try to restore previous selection
-        restored = False
-        if current_path:
-            restored = self.instance_panel.select_by_path(current_path)
+        self._scan_quiet = quiet
+        self.instance_panel.rescan_btn.setEnabled(False)
+        self.instance_panel.rescan_btn.setText("Scanning...")
+        self.instance_scan_worker = utils.InstanceScanWorker()
+        self.instance_scan_worker.found_signal.connect(self.instance_found)
+        self.instance_scan_worker.finished_signal.connect(self.instance_scan_finished)
+        self.instance_scan_worker.start()
+
+    def closeEvent(self, event):
+        """Stop the background scans so their threads are not destroyed mid-walk."""
+        for worker in (self.instance_scan_worker, self.mod_stats_worker, self.dedupe_worker):
+            if worker is not None and worker.isRunning():
+                worker.cancel()
+                worker.wait()
+        if self.conflict_dialog is not None:
+            self.conflict_dialog.close()
+        if self.prewarm_worker is not None:
+            self.prewarm_worker.wait()  # only queues reads, never long
+        super().closeEvent(event)
+
+    def instance_found(self, display_name, folder_path):
+        """Show an instance as soon as the scan finds it, selecting it if nothing is selected."""
+        self.instance_panel.add_instance(display_name, folder_path)
+        self.mo2_instances = self.instance_panel.instances
+        if self.instance_panel.current_path() is None:
+            self.instance_panel.select_by_path(folder_path)
+
+    def instance_scan_finished(self, completed, instances, error):
+        """Replace the instance list with the scan result, keeping the selection."""
+        self.instance_panel.rescan_btn.setEnabled(True)
+        self.instance_panel.rescan_btn.setText("Rescan")
+        if self._rescan_pending:
+            self._rescan_pending = False
+            self.start_instance_scan(quiet=self._scan_quiet)
+            return
+        if error:
+            self.append_log(f"Scanning for MO2 instances failed: {error}")
+        if not completed:
+            return
+
+        current_path = self.instance_panel.current_path()
+        self.mo2_instances = instances
+        restored = current_path is not None
+        if instances != self.instance_panel.instances:
+            self.instance_panel.set_instances(self.mo2_instances)
+
+            # Restore the previous selection without reloading the instance
+            restored = False
+            if current_path:
+                self.instance_panel.list_widget.blockSignals(True)
+                restored = self.instance_panel.select_by_path(current_path)
+                self.instance_panel.list_widget.blockSignals(False)
 
         if self.mo2_instances and not restored:
             self.instance_panel.list_widget.setCurrentRow(0)
         elif not self.mo2_instances:
             self.instance_panel.path_label.setText("No instances found - use Add Instance")
 
+        if self._scan_quiet:
+            return
+
         # Show message about scan results
         if self.mo2_instances:
             QMessageBox.information(
@@ -450,6 +747,7 @@ class MO2MergerGUI(QMainWindow):
 
     def refresh_gui(self):
         """Refresh the GUI: re-validate MO2 folder, reload mod list and plugin list."""
+        self.fs_state.invalidate()
         self.validate_mo2_folder()
         self.append_log("GUI refreshed.")
 
@@ -460,32 +758,11 @@ class MO2MergerGUI(QMainWindow):
             QMessageBox.warning(self, "Error", "No game selected. Please select a game first.")
             return
 
-        mo2_exe = os.path.join(self.mo2_path, "ModOrganizer.exe")
-        if not os.path.isfile(mo2_exe):
-            QMessageBox.warning(self, "Error", f"ModOrganizer.exe not found at:\n{mo2_exe}")
-            return
-
         try:
-            proton_path, compat_data_path = utils.detect_proton_path(game_data.get("prefix_path", ""))
+            proton_name = core.launch_mo2(self.mo2_path, game_data)
+            self.append_log(f"Launched ModOrganizer.exe via {proton_name}")
         except ValueError as e:
             QMessageBox.warning(self, "Error", str(e))
-            return
-
-        env = utils.get_clean_env()
-        env["STEAM_COMPAT_CLIENT_INSTALL_PATH"] = os.path.expanduser("~/.local/share/Steam")
-        env["STEAM_COMPAT_DATA_PATH"] = compat_data_path
-
-        # Newer MO2 builds (e.g. for Oblivion Remastered) crash with
-        # "free(): unaligned chunk detected in tcache 2" due to glibc
-        # allocator conflicts under Proton. Clearing LD_PRELOAD fixes this.
-        if game_data.get("mo2_download_url"):
-            env.pop("LD_PRELOAD", None)
-
-        proton_name = os.path.basename(os.path.dirname(proton_path))
-
-        try:
-            subprocess.Popen([proton_path, "run", mo2_exe], env=env, cwd=self.mo2_path)
-            self.append_log(f"Launched ModOrganizer.exe via {proton_name}")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to launch ModOrganizer.exe:\n{str(e)}")
 
@@ -505,7 +782,7 @@ class MO2MergerGUI(QMainWindow):
             )
             return
 
-        subprocess.Popen(["xdg-open", url], env=utils.get_clean_env())
+        subprocess.Popen(["xdg-open", url], env=core.get_clean_env())
 
     def open_mge_xe_download(self):
         """Open the MGE XE download page in the browser."""
@@ -519,10 +796,13 @@ class MO2MergerGUI(QMainWindow):
             QMessageBox.warning(self, "Error", "No MGE XE download URL configured.")
             return
 
-        subprocess.Popen(["xdg-open", url], env=utils.get_clean_env())
+        subprocess.Popen(["xdg-open", url], env=core.get_clean_env())
 
     def install_mge_xe(self):
         """Install MGE XE from a zip: root files go to game root, Data Files go to MO2 mods/mge_xe."""
+        import tempfile
+        import zipfile
+
         game_data = self.game_combo.currentData()
         if not game_data:
             QMessageBox.warning(self, "Error", "No game selected.")
@@ -573,7 +853,7 @@ class MO2MergerGUI(QMainWindow):
                             raise Exception("No 7z extraction tool found. Please install p7zip: sudo pacman -S p7zip")
                         result = subprocess.run(
                             [extract_cmd, "x", "-y", f"-o{temp_dir}", archive_path],
-                            capture_output=True, text=True, env=utils.get_clean_env()
+                            capture_output=True, text=True, env=core.get_clean_env()
                         )
                         if result.returncode != 0:
                             raise Exception(f"Extraction failed: {result.stderr}")
@@ -682,10 +962,13 @@ class MO2MergerGUI(QMainWindow):
             QMessageBox.warning(self, "Error", "No Code Patch download URL configured.")
             return
 
-        subprocess.Popen(["xdg-open", url], env=utils.get_clean_env())
+        subprocess.Popen(["xdg-open", url], env=core.get_clean_env())
 
     def install_code_patch(self):
         """Install Morrowind Code Patch from a zip: extract to game root and run the patcher."""
+        import tempfile
+        import zipfile
+
         game_data = self.game_combo.currentData()
         if not game_data:
             QMessageBox.warning(self, "Error", "No game selected.")
@@ -732,7 +1015,7 @@ class MO2MergerGUI(QMainWindow):
                             raise Exception("No 7z extraction tool found. Please install p7zip: sudo pacman -S p7zip")
                         result = subprocess.run(
                             [extract_cmd, "x", "-y", f"-o{temp_dir}", archive_path],
-                            capture_output=True, text=True, env=utils.get_clean_env()
+                            capture_output=True, text=True, env=core.get_clean_env()
                         )
                         if result.returncode != 0:
                             raise Exception(f"Extraction failed: {result.stderr}")
@@ -773,12 +1056,12 @@ class MO2MergerGUI(QMainWindow):
                 return
 
             try:
-                proton_path, compat_data_path = utils.detect_proton_path(game_data.get("prefix_path", ""))
+                proton_path, compat_data_path = core.detect_proton_path(game_data.get("prefix_path", ""))
             except ValueError as e:
                 QMessageBox.warning(self, "Error", f"Files extracted but could not detect Proton:\n{str(e)}")
                 return
 
-            env = utils.get_clean_env()
+            env = core.get_clean_env()
             env["STEAM_COMPAT_CLIENT_INSTALL_PATH"] = os.path.expanduser("~/.local/share/Steam")
             env["STEAM_COMPAT_DATA_PATH"] = compat_data_path
 
@@ -801,6 +1084,9 @@ class MO2MergerGUI(QMainWindow):
 
     def install_script_extender(self):
         """Install a script extender from a user-selected zip file to the game's root directory."""
+        import tempfile
+        import zipfile
+
         game_data = self.game_combo.currentData()
         if not game_data:
             QMessageBox.warning(self, "Error", "No game selected.")
@@ -862,7 +1148,7 @@ class MO2MergerGUI(QMainWindow):
                             raise Exception("No 7z extraction tool found. Please install p7zip: sudo pacman -S p7zip")
                         result = subprocess.run(
                             [extract_cmd, "x", "-y", f"-o{temp_dir}", archive_path],
-                            capture_output=True, text=True, env=utils.get_clean_env()
+                            capture_output=True, text=True, env=core.get_clean_env()
                         )
                         if result.returncode != 0:
                             raise Exception(f"Extraction failed: {result.stderr}")
@@ -926,7 +1212,7 @@ class MO2MergerGUI(QMainWindow):
                         installed_files.append(dst_file)
 
                 # Save manifest of installed files
-                manifest_path = utils.get_se_manifest_path(game_data)
+                manifest_path = core.get_se_manifest_path(game_data)
                 if manifest_path:
                     os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
                     with open(manifest_path, 'w', encoding='utf-8') as f:
@@ -959,7 +1245,7 @@ class MO2MergerGUI(QMainWindow):
             QMessageBox.warning(self, "Error", "No game selected.")
             return
 
-        manifest_path = utils.get_se_manifest_path(game_data)
+        manifest_path = core.get_se_manifest_path(game_data)
         if not manifest_path or not os.path.isfile(manifest_path):
             QMessageBox.warning(self, "Error", "No script extender installation found for this game.")
             return
@@ -1014,8 +1300,16 @@ class MO2MergerGUI(QMainWindow):
             data_path = self.data_output_edit.text()
             datafolder_source = os.path.join(self.mods_folder, "DataFolder")
             modlist_path = os.path.join(self.profiles_folder, self.selected_profile, "modlist.txt")
-            self._restore_datafolder_internal(data_path, datafolder_source, modlist_path)
+            self._restore_datafolder_internal(
+                data_path, datafolder_source, modlist_path,
+                lambda success, moved_count, launcher_restored:
+                    self._remove_script_extender_files(game_data, manifest_path, files, success)
+            )
+        else:
+            self._remove_script_extender_files(game_data, manifest_path, files, False)
 
+    def _remove_script_extender_files(self, game_data, manifest_path, files, data_restored):
+        """Delete the files of the install manifest and restore the launcher backup."""
         removed = 0
         missing = 0
         for filepath in files:
@@ -1065,7 +1359,7 @@ class MO2MergerGUI(QMainWindow):
             detail += f"\n{missing} files were already missing."
         if launcher_restored:
             detail += f"\n\nOriginal launcher restored."
-        if can_restore:
+        if data_restored:
             detail += f"\n\nData folder has been restored. You will need to re-run Build Data Folder."
         QMessageBox.information(self, "Uninstall Complete",
                                 f"Script extender uninstalled.\n\n{detail}")
@@ -1078,7 +1372,7 @@ class MO2MergerGUI(QMainWindow):
                     return
                 game["data_path"] = new_data_path
                 break
-        utils.save_game_paths(self.game_paths)
+        core.save_game_paths(self.game_paths)
         self.append_log(f"Updated data_path for {game_name}: {new_data_path}")
         self._refresh_game_combo()
 
@@ -1090,7 +1384,7 @@ class MO2MergerGUI(QMainWindow):
                     return
                 game["prefix_path"] = new_prefix_path
                 break
-        utils.save_game_paths(self.game_paths)
+        core.save_game_paths(self.game_paths)
         self.append_log(f"Updated prefix_path for {game_name}: {new_prefix_path}")
         self._refresh_game_combo()
 
@@ -1102,7 +1396,7 @@ class MO2MergerGUI(QMainWindow):
                     return
                 game["plugins_path"] = new_plugins_path
                 break
-        utils.save_game_paths(self.game_paths)
+        core.save_game_paths(self.game_paths)
         self.append_log(f"Updated plugins_path for {game_name}: {new_plugins_path}")
         self._refresh_game_combo()
 
@@ -1127,7 +1421,7 @@ class MO2MergerGUI(QMainWindow):
         game_data = self.game_combo.currentData()
         if game_data:
             self.data_output_edit.setText(game_data.get("data_path", ""))
-            self.plugins_output_edit.setText(utils.get_prefix_from_plugins_path(game_data.get("prefix_path", "")))
+            self.plugins_output_edit.setText(core.get_prefix_from_plugins_path(game_data.get("prefix_path", "")))
 
     def _start_mo2_download(self, folder, selected_game_data):
         """Start the MO2 download/install worker for a given folder and game."""
@@ -1153,7 +1447,7 @@ class MO2MergerGUI(QMainWindow):
                 return
 
             if clicked.text() == "Open Download Page":
-                subprocess.Popen(["xdg-open", mo2_download_url], env=utils.get_clean_env())
+                subprocess.Popen(["xdg-open", mo2_download_url], env=core.get_clean_env())
 
             local_archive, _ = QFileDialog.getOpenFileName(
                 self,
@@ -1183,7 +1477,7 @@ class MO2MergerGUI(QMainWindow):
 
         # Scan for installed games by launcher_name across all locations
         self.append_log("Scanning for installed games...")
-        installed_games = utils.find_game_installs(self.game_paths)
+        installed_games = core.find_game_installs(self.game_paths)
 
         # If both Fallout 3 and Fallout 3 GOTY were found (same launcher),
         # keep only Fallout 3 — the version dialog later handles the choice
@@ -1246,7 +1540,7 @@ class MO2MergerGUI(QMainWindow):
                 return
 
             self.append_log(f"Scanning {folder} for game launchers...")
-            found = utils._scan_for_launchers(self.game_paths, [folder])
+            found = core.find_game_in_folder(self.game_paths, folder)
 
             if not found:
                 QMessageBox.warning(
@@ -1472,7 +1766,7 @@ class MO2MergerGUI(QMainWindow):
         """Open the selected MO2 instance's game folder in the file manager."""
         if self.mo2_path and os.path.isdir(self.mo2_path):
             game_folder = os.path.dirname(self.mo2_path)
-            subprocess.Popen(["xdg-open", game_folder], env=utils.get_clean_env())
+            subprocess.Popen(["xdg-open", game_folder], env=core.get_clean_env())
 
     def download_finished(self, success, result):
         """Handle download completion."""
@@ -1526,7 +1820,8 @@ class MO2MergerGUI(QMainWindow):
         mods_path = os.path.join(path, "mods")
         if os.path.isdir(mods_path):
             self.mods_folder = mods_path
-            mod_count = len([d for d in os.listdir(mods_path) if os.path.isdir(os.path.join(mods_path, d))])
+            with os.scandir(mods_path) as it:
+                mod_count = sum(1 for entry in it if entry.is_dir())
             self.mods_status_label.setText(f"Mods folder: Found ({mod_count} mods)")
             self.mods_status_label.setStyleSheet("color: green;")
         else:
@@ -1550,6 +1845,8 @@ class MO2MergerGUI(QMainWindow):
             profiles = [d for d in os.listdir(profiles_path)
                        if os.path.isdir(os.path.join(profiles_path, d))]
 
+            # Filling the combo must not switch per-profile Data folders
+            self.profile_combo.blockSignals(True)
             self.profile_combo.clear()
             self.profile_combo.setEnabled(True)
 
@@ -1562,6 +1859,13 @@ class MO2MergerGUI(QMainWindow):
             else:
                 self.profile_combo.addItems(sorted(profiles))
                 self.selected_profile = sorted(profiles)[0]
+                # Start on the profile the Data folder was last built for
+                import build_data_folder
+                built_profile = build_data_folder.get_profile_of_build(self.data_output_edit.text())
+                if built_profile in profiles:
+                    self.profile_combo.setCurrentText(built_profile)
+                    self.selected_profile = built_profile
+            self.profile_combo.blockSignals(False)
 
             self.validate_profile()
         else:
@@ -1578,8 +1882,107 @@ class MO2MergerGUI(QMainWindow):
     def on_profile_changed(self, profile_name):
         self.selected_profile = profile_name
         self.validate_profile()
+        self.switch_profile_tree()
         self.update_build_button()
 
+    def on_profile_trees_toggled(self, checked):
+        """Save the per-profile Data folder setting for the selected game."""
+        game_data = self.game_combo.currentData()
+        if game_data is None:
+            return
+        for game in self.game_paths:
+            if game.get("name") == game_data.get("name"):
+                game["profile_trees"] = checked
+                break
+        core.save_game_paths(self.game_paths)
+        self.append_log(f"Per-profile Data folders {'enabled' if checked else 'disabled'} for {game_data.get('name')}")
+        self._refresh_game_combo()
+
+    def on_prewarm_toggled(self, checked):
+        """Save the prewarm setting for the selected game."""
+        game_data = self.game_combo.currentData()
+        if game_data is None:
+            return
+        for game in self.game_paths:
+            if game.get("name") == game_data.get("name"):
+                game["prewarm"] = checked
+                break
+        core.save_game_paths(self.game_paths)
+        self.append_log(f"Prewarming {'enabled' if checked else 'disabled'} for {game_data.get('name')}")
+        self._refresh_game_combo()
+
+    def update_pack_check(self, game_data):
+        """Show the game's packing setting; the checkbox is disabled for games it doesn't support."""
+        import pack
+
+        supported = pack.get_pack_format(game_data) is not None
+        self.pack_check.blockSignals(True)
+        self.pack_check.setChecked(supported and bool(game_data.get("pack_archives")))
+        self.pack_check.blockSignals(False)
+        self.pack_check.setEnabled(supported)
+
+    def on_pack_toggled(self, checked):
+        """Save the packing setting for the selected game (applied by the next build)."""
+        game_data = self.game_combo.currentData()
+        if game_data is None:
+            return
+        for game in self.game_paths:
+            if game.get("name") == game_data.get("name"):
+                # Keep a per mod setting made in game_paths.json
+                game["pack_archives"] = (game.get("pack_archives") or "category") if checked else ""
+                break
+        core.save_game_paths(self.game_paths)
+        self.append_log(f"Packing loose files {'enabled' if checked else 'disabled'} for {game_data.get('name')}"
+                        " (applied by the next build)")
+        self._refresh_game_combo()
+
+    def switch_profile_tree(self):
+        """
+        With per-profile Data folders enabled, swap in the prebuilt Data folder of the
+        selected profile (two renames) and point plugins.txt at the profile.
+        """
+        import build_data_folder
+
+        if not self.profile_trees_check.isChecked() or not self.profiles_folder or not self.selected_profile:
+            return
+        for worker in (getattr(self, 'worker', None), getattr(self, 'datafolder_worker', None)):
+            if worker is not None and worker.isRunning():
+                return
+
+        data_path = self.data_output_edit.text()
+        modlist_path = os.path.join(self.profiles_folder, self.selected_profile, "modlist.txt")
+        if not data_path or build_data_folder.get_profile_of_build(data_path) == self.selected_profile:
+            return
+
+        # Only swap in a tree built from this instance's profile
+        tree = build_data_folder.get_profile_tree_path(data_path, self.selected_profile)
+        meta = build_data_folder.load_build_meta(tree)
+        if meta is None or meta.get("modlist") != os.path.abspath(modlist_path):
+            self.append_log(f"No prebuilt Data folder for profile '{self.selected_profile}' yet, "
+                            f"click Build Data Folder to create it.")
+            return
+
+        try:
+            switched = build_data_folder.switch_profile_tree(data_path, self.selected_profile,
+                                                             events=lambda event: self.append_log(event.text))
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Failed to switch the Data folder:\n{str(e)}")
+            return
+        if not switched:
+            return
+
+        game_data = self.game_combo.currentData()
+        plugins_dest = game_data.get("plugins_path", "") if game_data else ""
+        if plugins_dest:
+            # The tree's packed archives are only loaded through their plugins
+            import pack
+
+            build_data_folder.link_plugins_txt(modlist_path, plugins_dest,
+                                               events=lambda event: self.append_log(event.text),
+                                               extra_plugins=pack.get_pack_plugins(data_path, game_data))
+        self.append_log(f"Data folder built {meta.get('generated', '')}. "
+                        f"Build Data Folder again if mods changed since then (only changes are linked).")
+
     def validate_profile(self):
         if not self.profiles_folder or not self.selected_profile:
             return
@@ -1604,6 +2007,104 @@ class MO2MergerGUI(QMainWindow):
             self.plugins_status_label.setText("plugins.txt: Not found")
             self.plugins_status_label.setStyleSheet("color: red;")
 
+        if self.mod_stats_dialog is not None and self.mod_stats_dialog.isVisible():
+            self.refresh_mod_stats()
+
+    def show_mod_stats(self):
+        """Open the mod statistics table; its numbers fill in from a worker thread."""
+        import views
+
+        if self.mod_stats_dialog is None:
+            self.mod_stats_model = views.ModStatsModel(self)
+            self.mod_stats_dialog = views.ModStatsDialog(self.mod_stats_model, self)
+            self.mod_stats_dialog.refresh_btn.clicked.connect(lambda: self.refresh_mod_stats(rescan=True))
+            self.mod_stats_dialog.table.doubleClicked.connect(
+                lambda index: self.show_conflict_explorer(self.mod_stats_dialog.mod_at(index)))
+        self.refresh_mod_stats()
+        self.mod_stats_dialog.show()
+        self.mod_stats_dialog.raise_()
+
+    def refresh_mod_stats(self, rescan=False):
+        """
+        List the selected profile's mods and (re)compute their statistics in the background.
+        rescan: rescan every mod folder instead of only those that changed (the Refresh button).
+        """
+        import build_data_folder
+
+        if self.mod_stats_worker is not None and self.mod_stats_worker.isRunning():
+            self.mod_stats_worker.cancel()
+            self.mod_stats_worker.wait()
+        if not self.mods_folder or self.mod_stats_model is None:
+            return
+
+        # Mods in priority order, then folders not in this profile's modlist.txt
+        mods = []
+        if self.profiles_folder and self.selected_profile:
+            mods = build_data_folder.read_modlist_entries(
+                os.path.join(self.profiles_folder, self.selected_profile, "modlist.txt"))
+        listed = set(name for name, _ in mods)
+        try:
+            with os.scandir(self.mods_folder) as it:
+                mods += [(entry.name, False) for entry in sorted(it, key=lambda e: e.name.lower())
+                         if entry.is_dir() and entry.name not in listed]
+        except OSError:
+            pass
+        self.mod_stats_model.set_mods(mods)
+        self.mod_stats_dialog.setWindowTitle(f"Mod Statistics - {self.selected_profile or 'no profile'}")
+        self.mod_stats_dialog.set_status(f"Reading {len(mods)} mods...")
+
+        self.mod_stats_worker = utils.ModStatsWorker(
+            self.mods_folder, self.mod_stats_model.mod_names(), self.data_output_edit.text(), self.mod_stats_cache,
+            rescan=rescan)
+        self.mod_stats_worker.stats_signal.connect(self.mod_stats_batch)
+        self.mod_stats_worker.finished_signal.connect(self.mod_stats_finished)
+        self.mod_stats_worker.start()
+
+    def mod_stats_batch(self, batch):
+        # Ignore what a cancelled worker sent before it stopped
+        if self.sender() is self.mod_stats_worker:
+            self.mod_stats_model.update_stats(batch)
+
+    def mod_stats_finished(self, completed, note):
+        if self.sender() is not self.mod_stats_worker:
+            return
+        count = self.mod_stats_model.rowCount()
+        status = f"{count} mods." if completed else "Stopped."
+        self.mod_stats_dialog.set_status(f"{status} {note}".strip())
+
+    def show_conflict_explorer(self, mod_name=None):
+        """Open the conflict explorer on the last build of the Data folder, optionally for one mod."""
+        import views
+        import build_data_folder
+
+        data_path = self.data_output_edit.text()
+        if not data_path:
+            return
+        _, index_path = build_data_folder.get_index_paths(data_path)
+        if not os.path.isfile(index_path):
+            QMessageBox.information(self, "No Build Snapshot",
+                                    "This Data folder has no build snapshot yet.\n"
+                                    "Build it once to see which mod each file comes from.")
+            return
+        try:
+            index_mtime = os.stat(index_path).st_mtime_ns
+        except OSError:
+            index_mtime = None
+
+        # A new build or another Data folder needs a new snapshot reader
+        dialog = self.conflict_dialog
+        if dialog is not None and (dialog.data_path != data_path or dialog.index_mtime != index_mtime):
+            dialog.close()
+            dialog = None
+        if dialog is None:
+            dialog = views.ConflictExplorerDialog(data_path, self)
+            dialog.index_mtime = index_mtime
+            self.conflict_dialog = dialog
+        if mod_name:
+            dialog.select_mod(mod_name)
+        dialog.show()
+        dialog.raise_()
+
     def auto_detect_game(self, profile_path):
         """
         Auto-detect the game based on the MO2 instance folder name.
@@ -1612,28 +2113,23 @@ class MO2MergerGUI(QMainWindow):
         if not self.mo2_path:
             return
 
-        folder_name = os.path.basename(self.mo2_path)
+        game = core.detect_game_for_instance(self.mo2_path, self.game_paths)
+        if game is None:
+            return
 
-        # Match against game names - folder should be "<game name> MO2"
-        for game in self.game_paths:
-            game_name = game.get("name", "")
-            if not game_name:
-                continue
-            expected_folder = f"{game_name} MO2"
-            if folder_name.lower() == expected_folder.lower():
-                # Found a match - select it in the combo box
-                for i in range(self.game_combo.count()):
-                    if self.game_combo.itemText(i) == game_name:
-                        self.game_combo.blockSignals(True)
-                        self.game_combo.setCurrentIndex(i)
-                        self.game_combo.blockSignals(False)
-                        # Update the output paths
-                        self.data_output_edit.setText(game.get("data_path", ""))
-                        self.plugins_output_edit.setText(utils.get_prefix_from_plugins_path(game.get("prefix_path", "")))
-                        # Update downgrade button visibility
-                        self.downgrade_btn.setVisible(game_name in ("Fallout 3", "Fallout 3 GOTY"))
-                        self.update_build_button()
-                        return
+        # Found a match - select it in the combo box
+        game_name = game.get("name", "")
+        for i in range(self.game_combo.count()):
+            if self.game_combo.itemText(i) == game_name:
+                self.game_combo.blockSignals(True)
+                self.game_combo.setCurrentIndex(i)
+                self.game_combo.blockSignals(False)
+                # Update the output paths
+                self.data_output_edit.setText(game.get("data_path", ""))
+                self.plugins_output_edit.setText(core.get_prefix_from_plugins_path(game.get("prefix_path", "")))
+                # Update downgrade button visibility
+                self.downgrade_btn.setVisible(game_name in ("Fallout 3", "Fallout 3 GOTY"))
+                self.update_build_button()
                 return
 
     def browse_data_output(self):
@@ -1652,7 +2148,14 @@ class MO2MergerGUI(QMainWindow):
         game_data = self.game_combo.currentData()
         if game_data:
             self.data_output_edit.setText(game_data.get("data_path", ""))
-            self.plugins_output_edit.setText(utils.get_prefix_from_plugins_path(game_data.get("prefix_path", "")))
+            self.plugins_output_edit.setText(core.get_prefix_from_plugins_path(game_data.get("prefix_path", "")))
+            self.profile_trees_check.blockSignals(True)
+            self.profile_trees_check.setChecked(bool(game_data.get("profile_trees")))
+            self.profile_trees_check.blockSignals(False)
+            self.prewarm_check.blockSignals(True)
+            self.prewarm_check.setChecked(bool(game_data.get("prewarm")))
+            self.prewarm_check.blockSignals(False)
+            self.update_pack_check(game_data)
 
         # Show Downgrade button only for Fallout 3
         is_fallout3 = game_data is not None and game_data.get("name") in ("Fallout 3", "Fallout 3 GOTY")
@@ -1668,12 +2171,12 @@ class MO2MergerGUI(QMainWindow):
             return
 
         try:
-            proton_path, compat_data_path = utils.detect_proton_path(game_data.get("prefix_path", ""))
+            proton_path, compat_data_path = core.detect_proton_path(game_data.get("prefix_path", ""))
         except ValueError as e:
             QMessageBox.warning(self, "Error", str(e))
             return
 
-        env = utils.get_clean_env()
+        env = core.get_clean_env()
         env["STEAM_COMPAT_CLIENT_INSTALL_PATH"] = os.path.expanduser("~/.local/share/Steam")
         env["STEAM_COMPAT_DATA_PATH"] = compat_data_path
 
@@ -1698,7 +2201,7 @@ class MO2MergerGUI(QMainWindow):
             return
 
         # Extract app ID from compatdata path
-        compat_data_path = utils.get_prefix_from_plugins_path(prefix_path)
+        compat_data_path = core.get_prefix_from_plugins_path(prefix_path)
         app_id = os.path.basename(compat_data_path)
 
         if not app_id.isdigit():
@@ -1739,7 +2242,7 @@ class MO2MergerGUI(QMainWindow):
             )
             return
 
-        env = utils.get_clean_env()
+        env = core.get_clean_env()
         # Suppress "Failed to load module canberra-gtk-module" warning
         gtk_modules = env.get("GTK_MODULES", "")
         if gtk_modules:
@@ -1812,7 +2315,7 @@ class MO2MergerGUI(QMainWindow):
             return
 
         try:
-            proton_path, compat_data_path = utils.detect_proton_path(game_data.get("prefix_path", ""))
+            proton_path, compat_data_path = core.detect_proton_path(game_data.get("prefix_path", ""))
         except ValueError as e:
             QMessageBox.warning(self, "Error", str(e))
             return
@@ -1829,7 +2332,7 @@ class MO2MergerGUI(QMainWindow):
             return
 
         # Set up environment for Proton
-        env = utils.get_clean_env()
+        env = core.get_clean_env()
         env["STEAM_COMPAT_CLIENT_INSTALL_PATH"] = os.path.expanduser("~/.local/share/Steam")
         env["STEAM_COMPAT_DATA_PATH"] = compat_data_path
 
@@ -1849,6 +2352,8 @@ class MO2MergerGUI(QMainWindow):
 
     def run_downgrade(self):
         """Downgrade Fallout 3 using the Updated Unofficial Fallout 3 Patch patcher."""
+        import zipfile
+
         game_data = self.game_combo.currentData()
         if game_data is None or game_data.get("name") not in ("Fallout 3", "Fallout 3 GOTY"):
             return
@@ -1881,7 +2386,7 @@ class MO2MergerGUI(QMainWindow):
                 return
 
             if clicked.text() == "Open Download Page":
-                subprocess.Popen(["xdg-open", "https://www.nexusmods.com/fallout3/mods/24913"], env=utils.get_clean_env())
+                subprocess.Popen(["xdg-open", "https://www.nexusmods.com/fallout3/mods/24913"], env=core.get_clean_env())
                 # After opening the page, ask again to select the zip
                 zip_path, _ = QFileDialog.getOpenFileName(
                     self,
@@ -1939,13 +2444,13 @@ class MO2MergerGUI(QMainWindow):
 
         # Detect Proton version
         try:
-            proton_path, compat_data_path = utils.detect_proton_path(game_data.get("prefix_path", ""))
+            proton_path, compat_data_path = core.detect_proton_path(game_data.get("prefix_path", ""))
         except ValueError as e:
             QMessageBox.warning(self, "Error", str(e))
             return
 
         # Run Patcher.exe via Proton
-        env = utils.get_clean_env()
+        env = core.get_clean_env()
         env["STEAM_COMPAT_CLIENT_INSTALL_PATH"] = os.path.expanduser("~/.local/share/Steam")
         env["STEAM_COMPAT_DATA_PATH"] = compat_data_path
 
@@ -1977,6 +2482,7 @@ class MO2MergerGUI(QMainWindow):
         game_name = game_data.get("name", "")
 
         # Get the expected suffix from the default config (e.g. "Fallout 4/Data")
+        import build_json
         defaults = build_json.get_default_game_paths()
         default_path = ""
         expected_suffix = ""
@@ -2002,6 +2508,14 @@ class MO2MergerGUI(QMainWindow):
         else:
             self._update_game_data_path(game_name, path)
 
+    def fs_state_changed(self):
+        """Re-evaluate the buttons after a watched path changed, unless a worker owns them."""
+        for name in ('worker', 'datafolder_worker', 'verify_worker', 'reclaim_worker', 'dedupe_worker'):
+            worker = getattr(self, name, None)
+            if worker is not None and worker.isRunning():
+                return  # its finished handler updates the buttons
+        self.update_build_button()
+
     def update_build_button(self):
         # Update Script Extender buttons (created early, so always safe to check)
         if hasattr(self, 'se_download_btn'):
@@ -2010,8 +2524,7 @@ class MO2MergerGUI(QMainWindow):
             self.se_download_btn.setEnabled(has_se_download)
             has_se_name = bool(game_data and game_data.get("script_extender_name"))
             self.se_install_btn.setEnabled(has_se_name)
-            has_manifest = bool(game_data and utils.get_se_manifest_path(game_data) and
-                                os.path.isfile(utils.get_se_manifest_path(game_data)))
+            has_manifest = bool(game_data and self.fs_state.is_file(core.get_se_manifest_path(game_data)))
             self.se_uninstall_btn.setEnabled(has_manifest)
 
             # Update script extender status label
@@ -2020,7 +2533,7 @@ class MO2MergerGUI(QMainWindow):
                 if se_name:
                     game_folder = game_data.get("launcher_location") or game_data.get("game_root") or (os.path.dirname(game_data.get("data_path", "")) if game_data.get("data_path") else "")
                     se_path = os.path.join(game_folder, se_name) if game_folder else ""
-                    if se_path and os.path.isfile(se_path):
+                    if se_path and self.fs_state.is_file(se_path):
                         self.se_status_label.setText(f"Script Extender: {se_name} found")
                         self.se_status_label.setStyleSheet("color: green;")
                     else:
@@ -2054,48 +2567,77 @@ class MO2MergerGUI(QMainWindow):
         # Check if DataFolder mod exists in mods folder
         datafolder_exists = bool(
             self.mods_folder and
-            os.path.isdir(os.path.join(self.mods_folder, "DataFolder"))
+            self.fs_state.is_dir(os.path.join(self.mods_folder, "DataFolder"))
         )
 
         # Check if all required paths are valid for build
         # If DataFolder doesn't exist, it will be created automatically during build
         data_path = self.data_output_edit.text()
-        can_build = bool(
+        has_modlist = bool(
             self.mods_folder and
             self.profiles_folder and
             self.selected_profile and
-            os.path.isfile(os.path.join(self.profiles_folder, self.selected_profile, "modlist.txt")) and
+            self.fs_state.is_file(os.path.join(self.profiles_folder, self.selected_profile, "modlist.txt"))
+        )
+        can_build = bool(
+            has_modlist and
             data_path and
-            (datafolder_exists or (os.path.isdir(data_path) and os.listdir(data_path)))  # DataFolder exists OR Data folder has contents to create it
+            (datafolder_exists or self.fs_state.has_entries(data_path))  # DataFolder exists OR Data folder has contents to create it
         )
         self.build_btn.setEnabled(can_build)
 
         # Check if DataFolder can be restored
         # Requires: DataFolder mod exists, Data folder path specified, modlist.txt exists
         can_restore_datafolder = bool(
-            self.mods_folder and
-            self.profiles_folder and
-            self.selected_profile and
-            os.path.isfile(os.path.join(self.profiles_folder, self.selected_profile, "modlist.txt")) and
+            has_modlist and
             data_path and
             datafolder_exists  # DataFolder must exist to restore
         )
         self.restore_datafolder_btn.setEnabled(can_restore_datafolder)
 
+        # Verify: needs a built Data folder
+        self.verify_btn.setEnabled(self.fs_state.is_dir(data_path))
+        self.conflicts_btn.setEnabled(self.fs_state.is_dir(data_path))
+        self.reclaim_btn.setEnabled(self.fs_state.is_dir(data_path))
+
         # Check if Run MO2 button can be enabled
         # Requires: MO2 path valid, ModOrganizer.exe exists, game selected
         can_run_mo2 = bool(
             self.mo2_path and
-            os.path.isfile(os.path.join(self.mo2_path, "ModOrganizer.exe")) and
+            self.fs_state.is_file(os.path.join(self.mo2_path, "ModOrganizer.exe")) and
             self.game_combo.currentData()  # Game selected
         )
         self.run_mo2_btn.setEnabled(can_run_mo2)
 
         # Open Folder: just needs a valid MO2 path
         if hasattr(self, 'open_instance_btn'):
-            self.open_instance_btn.setEnabled(bool(self.mo2_path and os.path.isdir(self.mo2_path)))
+            self.open_instance_btn.setEnabled(self.fs_state.is_dir(self.mo2_path))
+            self.mod_stats_btn.setEnabled(bool(self.mods_folder))
+
+    def report_interrupted_builds(self):
+        """Tell the user about Data folder builds that did not finish last time."""
+        import build_data_folder
+
+        interrupted = []
+        for game in self.game_paths:
+            info = build_data_folder.find_interrupted_build(game.get("data_path", ""))
+            if info:
+                interrupted.append(f"{game.get('name', '')} (started {info['started']}, "
+                                   f"{info['completed_dirs']} folders done)")
+        if not interrupted:
+            return
+
+        QMessageBox.information(
+            self,
+            "Interrupted Build",
+            "These Data folder builds did not finish (the Deck may have slept or lost power):\n\n"
+            + "\n".join(interrupted)
+            + "\n\nSelect the game and click Build Data Folder to resume."
+        )
 
     def start_build(self):
+        import build_data_folder
+
         # Get paths
         modlist_path = os.path.join(self.profiles_folder, self.selected_profile, "modlist.txt")
         data_output = self.data_output_edit.text()
@@ -2104,6 +2646,25 @@ class MO2MergerGUI(QMainWindow):
         datafolder_dest = os.path.join(self.mods_folder, "DataFolder")
         needs_datafolder_creation = not os.path.isdir(datafolder_dest)
 
+        # Offer to resume a build that was cut short instead of starting over
+        interrupted = build_data_folder.find_interrupted_build(data_output)
+        if interrupted:
+            reply = QMessageBox.question(
+                self,
+                "Resume Build",
+                f"The last build of this Data folder was interrupted.\n\n"
+                f"Started: {interrupted['started']}\n"
+                f"Folders already linked: {interrupted['completed_dirs']}\n\n"
+                f"Resume it? Choose No to delete the partial Data folder and build from scratch.",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel,
+                QMessageBox.StandardButton.Yes
+            )
+            if reply == QMessageBox.StandardButton.Cancel:
+                return
+            if reply == QMessageBox.StandardButton.Yes:
+                self._run_build(modlist_path, data_output, plugins_dest, resume=True)
+                return
+
         # Confirm with user
         msg = f"Ready to build Data folder:\n\n"
         msg += f"Modlist: {modlist_path}\n"
@@ -2114,7 +2675,16 @@ class MO2MergerGUI(QMainWindow):
         if needs_datafolder_creation:
             msg += "DataFolder mod does not exist and will be created first.\n"
             msg += "This will move Data folder contents to MO2 mods/DataFolder.\n\n"
-        msg += "This will delete any existing Data folder at the output location.\n"
+        if self.profile_trees_check.isChecked():
+            msg += f"The Data folder of profile '{self.selected_profile}' is updated in place (only changes\n"
+            msg += "are linked). Other profiles keep their Data folders as Data.<profile>.\n"
+        else:
+            msg += "This will replace any existing Data folder at the output location\n"
+            msg += "(it is kept until the build finishes, so Cancel restores it).\n"
+        msg += "Files written into it by the game or tools are moved to overwrite first.\n"
+        if self.pack_check.isChecked():
+            msg += "Loose files are then packed into archives, and plugins.txt is written as a\n"
+            msg += "copy with their plugins added at the end.\n"
         msg += "Continue?"
 
         reply = QMessageBox.question(
@@ -2128,23 +2698,17 @@ class MO2MergerGUI(QMainWindow):
         if reply != QMessageBox.StandardButton.Yes:
             return
 
-        # Create DataFolder mod first if it doesn't exist
+        # Create DataFolder mod first if it doesn't exist, the build starts once it is moved
         if needs_datafolder_creation:
-            if not self._create_datafolder_mod_internal(data_output, datafolder_dest, modlist_path):
-                return
+            self._create_datafolder_mod_internal(data_output, datafolder_dest, modlist_path,
+                                                 lambda: self._run_build(modlist_path, data_output, plugins_dest))
+            return
 
-        # Handle existing Data folder deletion
-        if os.path.exists(data_output):
-            self.log_text.clear()
-            self.append_log(f"Deleting existing Data folder: {data_output}")
-            try:
-                shutil.rmtree(data_output)
-                self.append_log("Deleted.")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to delete existing Data folder:\n{str(e)}")
-                return
+        # The worker harvests and deletes the existing Data folder
+        self._run_build(modlist_path, data_output, plugins_dest)
 
-        # Clear log and start build
+    def _run_build(self, modlist_path, data_output, plugins_dest, resume=False):
+        """Clear the log and start the build worker."""
         self.log_text.clear()
         self.build_btn.setEnabled(False)
         self.progress_bar.setVisible(True)
@@ -2158,106 +2722,326 @@ class MO2MergerGUI(QMainWindow):
             output_dir=data_output,
             overwrite_folder=self.overwrite_folder if self.overwrite_folder else None,
             plugins_dest=plugins_dest if plugins_dest else None,
-            game_data=game_data
+            game_data=game_data,
+            resume=resume,
+            profile_trees=self.profile_trees_check.isChecked()
         )
         self.worker.output_signal.connect(self.append_log)
+        self.worker.progress_signal.connect(self.build_progress)
         self.worker.finished_signal.connect(self.build_finished)
+        self.progress_label.setText("Preparing...")
+        self.progress_label.setVisible(True)
+        self.cancel_build_btn.setText("Cancel")
+        self.cancel_build_btn.setEnabled(True)
+        self.cancel_build_btn.setVisible(True)
         self.worker.start()
 
+    def cancel_build(self):
+        """Ask the running build (or DataFolder move, or dedupe) to stop; it rolls back or leaves the source intact."""
+        for name in ('worker', 'datafolder_worker', 'dedupe_worker'):
+            worker = getattr(self, name, None)
+            if worker is not None and worker.isRunning():
+                worker.cancel()
+                self.cancel_build_btn.setText("Cancelling...")
+                self.cancel_build_btn.setEnabled(False)
+
+    def verify_datafolder(self, repair=False):
+        """Check the Data folder against the last build snapshot in a worker thread."""
+        data_path = self.data_output_edit.text()
+        if not data_path or not os.path.isdir(data_path):
+            return
+
+        self.log_text.clear()
+        self.build_btn.setEnabled(False)
+        self.verify_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+
+        self.verify_worker = utils.VerifyWorker(data_path, repair=repair)
+        self.verify_worker.output_signal.connect(self.append_log)
+        self.verify_worker.finished_signal.connect(
+            lambda success, results, error: self.verify_finished(success, results, error, repair)
+        )
+        self.verify_worker.start()
+
+    def reclaim_space(self, mods=None, archive_dir=None, delete=False):
+        """
+        List the overridden files no profile uses in a worker thread, or move or
+        delete those of mods once the user has chosen.
+        """
+        data_path = self.data_output_edit.text()
+        if not data_path or not os.path.isdir(data_path):
+            return
+
+        self.log_text.clear()
+        self.build_btn.setEnabled(False)
+        self.reclaim_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+
+        applied = archive_dir is not None or delete
+        self.reclaim_worker = utils.ReclaimWorker(data_path, mods=mods, archive_dir=archive_dir, delete=delete)
+        self.reclaim_worker.output_signal.connect(self.append_log)
+        self.reclaim_worker.finished_signal.connect(
+            lambda success, report: self.reclaim_finished(success, report, applied)
+        )
+        self.reclaim_worker.start()
+
+    def reclaim_finished(self, success, report, applied):
+        import views
+
+        self.progress_bar.setVisible(False)
+        self.update_build_button()
+        if applied:
+            # Mod folders changed: recount them
+            self.fs_state.invalidate()
+            self.validate_mo2_folder()
+            return
+
+        if not success:
+            QMessageBox.warning(
+                self,
+                "Reclaim Space",
+                "The last build did not record its overridden files.\n"
+                "Run Build Data Folder first."
+            )
+            return
+        if not report:
+            QMessageBox.information(self, "Reclaim Space", "No mod has files that every profile overrides.")
+            return
+
+        dialog = views.ReclaimDialog(report, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        mods = dialog.selected_mods()
+        if dialog.action == "move":
+            default_folder = os.path.join(self.mo2_path, "Reclaimed Files") if self.mo2_path else ""
+            archive_dir = QFileDialog.getExistingDirectory(self, "Move the Overridden Files To", default_folder)
+            if archive_dir:
+                self.reclaim_space(mods, archive_dir=archive_dir)
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "Reclaim Space",
+            f"Delete the overridden files of {len(mods)} mods?\n"
+            "This cannot be undone.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.reclaim_space(mods, delete=True)
+
+    def dedupe_mods(self, link=False, mods_folders=None):
+        """
+        Look for identical files across the known instances' mods folders in a worker
+        thread; once the user agrees, run it again (from the hash cache) to link them.
+        """
+        if mods_folders is None:
+            mods_folders = [os.path.join(path, "mods") for _, path in self.mo2_instances
+                            if os.path.isdir(os.path.join(path, "mods"))]
+        if not mods_folders:
+            QMessageBox.information(self, "Dedupe Mods", "No MO2 instances with a mods folder were found.")
+            return
+
+        self.log_text.clear()
+        self.build_btn.setEnabled(False)
+        self.dedupe_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_label.setText("Listing files...")
+        self.progress_label.setVisible(True)
+        self.cancel_build_btn.setText("Cancel")
+        self.cancel_build_btn.setEnabled(True)
+        self.cancel_build_btn.setVisible(True)
+
+        self.dedupe_worker = utils.DedupeWorker(mods_folders, link=link)
+        self.dedupe_worker.output_signal.connect(self.append_log)
+        self.dedupe_worker.progress_signal.connect(self.build_progress)
+        self.dedupe_worker.finished_signal.connect(
+            lambda completed, result, error: self.dedupe_finished(completed, result, error, link, mods_folders)
+        )
+        self.dedupe_worker.start()
+
+    def dedupe_finished(self, completed, result, error, linked, mods_folders):
+        import build_data_folder
+
+        self.progress_bar.setVisible(False)
+        self.progress_bar.setRange(0, 0)  # Reset to indeterminate
+        self.progress_label.setVisible(False)
+        self.cancel_build_btn.setVisible(False)
+        self.dedupe_btn.setEnabled(True)
+        self.update_build_button()
+
+        if not completed:
+            if error:
+                QMessageBox.warning(self, "Dedupe Mods", f"Dedupe failed:\n{error}")
+            return
+        if linked:
+            message = (f"Replaced {result['linked']} files with hardlinks.\n"
+                       f"Space reclaimed: {build_data_folder.format_size(result['reclaimed'])}")
+            if result["pending"]:
+                message += (f"\n{build_data_folder.format_size(result['pending'])} more is freed once the "
+                            "Data folders that link the old copies are rebuilt.")
+            if result["failed"]:
+                message += f"\n{len(result['failed'])} files could not be linked, see the log."
+            QMessageBox.information(self, "Dedupe Mods", message)
+            return
+        if not result["duplicates"]:
+            QMessageBox.information(self, "Dedupe Mods", "No duplicate mod files were found.")
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "Dedupe Mods",
+            f"Found {result['duplicates']} duplicate files in {result['groups']} groups.\n\n"
+            "Replace them with hardlinks to a single copy?\n"
+            "Linked copies share their contents: editing one changes them all.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.dedupe_mods(link=True, mods_folders=mods_folders)
+
+    def verify_finished(self, success, results, error, repaired):
+        self.progress_bar.setVisible(False)
+        self.update_build_button()
+
+        if not success:
+            if error:
+                QMessageBox.warning(self, "Verify Data Folder", f"Verify failed:\n{error}")
+            else:
+                QMessageBox.warning(
+                    self,
+                    "Verify Data Folder",
+                    "No build snapshot was found for this Data folder.\n"
+                    "Run Build Data Folder first."
+                )
+            return
+
+        fixable = len(results["missing"]) + len(results["broken"]) + len(results["modified"])
+        summary = (f"Missing files: {len(results['missing'])}\n"
+                   f"Broken hardlinks: {len(results['broken'])}\n"
+                   f"Edited mod sources: {len(results['modified'])}\n"
+                   f"Foreign files: {len(results['foreign'])}")
+
+        if repaired or not fixable:
+            QMessageBox.information(self, "Verify Data Folder", summary)
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "Verify Data Folder",
+            f"{summary}\n\n"
+            "Repair the missing and broken entries now?\n"
+            "Foreign files are left untouched.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.verify_datafolder(repair=True)
+
     def append_log(self, text):
-        self.log_text.append(text)
+        # text may be a batch of lines from a worker
+        self.log_text.appendPlainText(text)
         # Auto-scroll to bottom
         scrollbar = self.log_text.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
 
+    def build_progress(self, event):
+        """Show the current build (or DataFolder copy) phase as a determinate progress bar."""
+        if event.total_bytes:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(event.bytes_done * 1000 // event.total_bytes)
+        else:
+            self.progress_bar.setRange(0, max(event.total, 1))
+            self.progress_bar.setValue(event.done)
+        self.progress_label.setText(event.describe())
+
     def build_finished(self, success, message):
         self.progress_bar.setVisible(False)
+        self.progress_bar.setRange(0, 0)  # Reset to indeterminate
+        self.progress_label.setVisible(False)
+        self.cancel_build_btn.setVisible(False)
         self.update_build_button()  # Re-evaluate button states
 
         if success:
+            if self.prewarm_check.isChecked():
+                self.start_prewarm()
             QMessageBox.information(self, "Build Complete", message)
+        elif self.worker.cancel_event.is_set():
+            QMessageBox.information(self, "Build Cancelled", message)
         else:
             QMessageBox.warning(self, "Build Failed", message)
 
-    def _create_datafolder_mod_internal(self, data_path, datafolder_dest, modlist_path):
+    def start_prewarm(self):
+        """Queue the reads of the Data folder in the background; the result goes to the log."""
+        import prewarm
+
+        data_path = self.data_output_edit.text()
+        if not data_path or not os.path.isdir(data_path):
+            return
+        if self.prewarm_worker is not None and self.prewarm_worker.isRunning():
+            return
+        self.prewarm_worker = utils.PrewarmWorker(data_path, prewarm.get_budget(self.game_combo.currentData()))
+        self.prewarm_worker.output_signal.connect(self.append_log)
+        self.prewarm_worker.start()
+
+    def _set_data_actions_enabled(self, enabled):
+        """Enable or disable everything that touches the Data folder or the instance."""
+        for widget in self.data_action_widgets:
+            widget.setEnabled(enabled)
+        if enabled:
+            self.update_build_button()
+        else:
+            for btn in (self.build_btn, self.restore_datafolder_btn, self.verify_btn,
+                        self.conflicts_btn, self.reclaim_btn):
+                btn.setEnabled(False)
+
+    def _run_datafolder_worker(self, mode, data_path, datafolder_path, modlist_path, on_finished):
         """
-        Create the initial DataFolder mod by moving game Data folder contents
-        to MO2 mods folder and adding it to modlist.txt.
-        Returns True on success, False on failure.
+        Start a DataFolderWorker ("create" or "restore"). The Data folder and instance
+        actions are disabled until it is done, then on_finished gets (success, result,
+        message) as sent by the worker.
         """
         self.log_text.clear()
         self.progress_bar.setVisible(True)
-        self.build_btn.setEnabled(False)
-
-        try:
-            # Create the DataFolder directory
-            os.makedirs(datafolder_dest)
-            self.append_log(f"Created: {datafolder_dest}")
-
-            # Move all contents from Data folder to DataFolder mod
-            self.append_log(f"Moving contents from {data_path}...")
-            moved_count = 0
-
-            for item in os.listdir(data_path):
-                src = os.path.join(data_path, item)
-                dst = os.path.join(datafolder_dest, item)
-                shutil.move(src, dst)
-                moved_count += 1
-                if moved_count % 10 == 0:
-                    self.append_log(f"  Moved {moved_count} items...")
-
-            self.append_log(f"Moved {moved_count} items total")
-
-            # Update modlist.txt: remove * entries and add +DataFolder
-            self.append_log(f"Updating modlist.txt...")
-
-            # Read existing modlist
-            with open(modlist_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            # Remove any lines starting with * (separator lines)
-            original_count = len(lines)
-            lines = [line for line in lines if not line.strip().startswith('*')]
-            removed_count = original_count - len(lines)
-            if removed_count > 0:
-                self.append_log(f"  Removed {removed_count} separator entries (lines starting with *)")
-
-            # Check if DataFolder is already in the list
-            datafolder_entry = "+DataFolder\n"
-            has_datafolder = any(line.strip() in ("+DataFolder", "-DataFolder") for line in lines)
-
-            if has_datafolder:
-                self.append_log("  DataFolder already in modlist.txt, skipping add...")
-            else:
-                # Add at the bottom (before any empty lines at the end)
-                # Find the last non-empty line
-                insert_pos = len(lines)
-                for i in range(len(lines) - 1, -1, -1):
-                    if lines[i].strip():
-                        insert_pos = i + 1
-                        break
-
-                lines.insert(insert_pos, datafolder_entry)
-                self.append_log(f"  Added '+DataFolder' to modlist.txt")
-
-            # Write updated modlist
-            with open(modlist_path, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
+        self.progress_label.setText("Preparing...")
+        self.progress_label.setVisible(True)
+        self._set_data_actions_enabled(False)
+        self.cancel_build_btn.setText("Cancel")
+        self.cancel_build_btn.setEnabled(True)
+        self.cancel_build_btn.setVisible(True)
+
+        self.datafolder_worker = utils.DataFolderWorker(
+            mode, data_path, datafolder_path, modlist_path, game_data=self.game_combo.currentData()
+        )
+        self.datafolder_worker.output_signal.connect(self.append_log)
+        self.datafolder_worker.progress_signal.connect(self.build_progress)
+        self.datafolder_worker.finished_signal.connect(
+            lambda success, result, message: self.datafolder_finished(success, result, message, on_finished)
+        )
+        self.datafolder_worker.start()
 
-            self.append_log("")
-            self.append_log("=" * 50)
-            self.append_log("DataFolder mod created successfully!")
-            self.append_log("=" * 50)
-            return True
+    def datafolder_finished(self, success, result, message, on_finished):
+        self.datafolder_worker.wait()  # finished_signal is the last thing run() does
+        self.progress_bar.setVisible(False)
+        self.progress_bar.setRange(0, 0)  # Reset to indeterminate
+        self.progress_label.setVisible(False)
+        self.cancel_build_btn.setVisible(False)
+        self._set_data_actions_enabled(True)
+        on_finished(success, result, message)
 
-        except Exception as e:
-            self.append_log(f"ERROR: {str(e)}")
-            QMessageBox.critical(self, "Error", f"Failed to create DataFolder mod:\n{str(e)}")
-            return False
+    def _create_datafolder_mod_internal(self, data_path, datafolder_dest, modlist_path, on_created):
+        """
+        Create the initial DataFolder mod by moving game Data folder contents
+        to MO2 mods folder and adding it to modlist.txt.
+        Calls on_created() once it succeeded.
+        """
+        def on_finished(success, moved_count, message):
+            if success:
+                on_created()
+            elif not self.datafolder_worker.cancel_event.is_set():
+                QMessageBox.critical(self, "Error", f"Failed to create DataFolder mod:\n{message}")
 
-        finally:
-            self.progress_bar.setVisible(False)
-            self.update_build_button()
+        self._run_datafolder_worker("create", data_path, datafolder_dest, modlist_path, on_finished)
 
     def restore_datafolder(self):
         """
@@ -2269,8 +3053,10 @@ class MO2MergerGUI(QMainWindow):
         datafolder_source = os.path.join(self.mods_folder, "DataFolder")
         modlist_path = os.path.join(self.profiles_folder, self.selected_profile, "modlist.txt")
 
-        # Count files to restore
-        file_count = sum(len(files) for _, _, files in os.walk(datafolder_source))
+        # File count recorded by the last build (walking the whole DataFolder mod is slow)
+        import build_data_folder
+        meta = build_data_folder.load_build_meta(data_path) or {}
+        file_count = meta.get("mod_file_counts", {}).get("DataFolder", "unknown")
 
         # Confirm with user
         msg = f"This will restore the original Data folder:\n\n"
@@ -2278,9 +3064,9 @@ class MO2MergerGUI(QMainWindow):
         msg += f"Destination: {data_path}\n"
         msg += f"Files to restore: {file_count}\n\n"
         msg += "This will:\n"
-        msg += "1. Delete the existing Data folder (if present)\n"
-        msg += "2. Move all contents from mods/DataFolder back to the Data folder\n"
-        msg += "3. Delete the empty DataFolder mod directory\n"
+        msg += "1. Move the existing Data folder aside and delete it in the background\n"
+        msg += "2. Move mods/DataFolder back to the Data folder location\n"
+        msg += "3. Remove the DataFolder mod directory\n"
         msg += "4. Remove the DataFolder entry from modlist.txt\n\n"
         msg += "Continue?"
 
@@ -2295,128 +3081,43 @@ class MO2MergerGUI(QMainWindow):
         if reply != QMessageBox.StandardButton.Yes:
             return
 
-        success, moved_count, launcher_restored = self._restore_datafolder_internal(data_path, datafolder_source, modlist_path)
+        def on_restored(success, moved_count, launcher_restored):
+            if success:
+                success_msg = f"Data folder restored successfully!\n\n"
+                success_msg += f"Moved {moved_count} items to:\n{data_path}\n\n"
+                success_msg += f"DataFolder mod removed from mods folder and modlist.txt"
+                if launcher_restored:
+                    success_msg += f"\n\nOriginal launcher restored."
 
-        if success:
-            success_msg = f"Data folder restored successfully!\n\n"
-            success_msg += f"Moved {moved_count} items to:\n{data_path}\n\n"
-            success_msg += f"DataFolder mod removed from mods folder and modlist.txt"
-            if launcher_restored:
-                success_msg += f"\n\nOriginal launcher restored."
+                QMessageBox.information(
+                    self,
+                    "Success",
+                    success_msg
+                )
 
-            QMessageBox.information(
-                self,
-                "Success",
-                success_msg
-            )
+        self._restore_datafolder_internal(data_path, datafolder_source, modlist_path, on_restored)
 
-    def _restore_datafolder_internal(self, data_path, datafolder_source, modlist_path):
+    def _restore_datafolder_internal(self, data_path, datafolder_source, modlist_path, on_restored):
         """
         Internal method to restore the Data folder without showing confirmation dialogs.
-        Returns (success, moved_count, launcher_restored).
+        Calls on_restored(success, moved_count, launcher_restored) once it is done.
         """
-        self.log_text.clear()
-        self.progress_bar.setVisible(True)
-        self.restore_datafolder_btn.setEnabled(False)
-        self.build_btn.setEnabled(False)
-
-        try:
-            # Delete existing Data folder if it exists
-            if os.path.exists(data_path):
-                self.append_log(f"Deleting existing Data folder: {data_path}")
-                shutil.rmtree(data_path)
-                self.append_log("Deleted.")
-
-            # Create the Data folder
-            os.makedirs(data_path)
-            self.append_log(f"Created: {data_path}")
-
-            # Move all contents from DataFolder mod to Data folder
-            self.append_log(f"Moving contents from {datafolder_source}...")
-            moved_count = 0
-
-            for item in os.listdir(datafolder_source):
-                src = os.path.join(datafolder_source, item)
-                dst = os.path.join(data_path, item)
-                shutil.move(src, dst)
-                moved_count += 1
-                if moved_count % 10 == 0:
-                    self.append_log(f"  Moved {moved_count} items...")
-
-            self.append_log(f"Moved {moved_count} items total")
-
-            # Remove the now-empty DataFolder directory
-            self.append_log(f"Removing empty DataFolder mod directory...")
-            os.rmdir(datafolder_source)
-            self.append_log("Removed.")
-
-            # Update modlist.txt: remove DataFolder entry
-            self.append_log(f"Updating modlist.txt...")
-
-            # Read existing modlist
-            with open(modlist_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            # Remove any lines containing DataFolder (+ or -)
-            original_count = len(lines)
-            lines = [line for line in lines if line.strip() not in ("+DataFolder", "-DataFolder")]
-            removed_count = original_count - len(lines)
-
-            if removed_count > 0:
-                self.append_log(f"  Removed {removed_count} DataFolder entry/entries from modlist.txt")
-            else:
-                self.append_log("  No DataFolder entry found in modlist.txt")
-
-            # Write updated modlist
-            with open(modlist_path, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
-
-            # Restore original launcher from backup
-            game_data = self.game_combo.currentData()
-            launcher_restored = False
-            if game_data:
-                launcher_name = game_data.get("launcher_name")
-                if launcher_name:
-                    game_folder = game_data.get("launcher_location") or game_data.get("game_root") or os.path.dirname(data_path)
-                    launcher_path = os.path.join(game_folder, launcher_name)
-                    backup_path = os.path.join(game_folder, launcher_name.replace(".exe", ".bak"))
-
-                    if os.path.exists(backup_path):
-                        self.append_log("")
-                        self.append_log("=" * 50)
-                        self.append_log("RESTORING ORIGINAL LAUNCHER")
-                        self.append_log("=" * 50)
-                        self.append_log(f"Game folder: {game_folder}")
-
-                        # Delete the current launcher (script extender copy)
-                        if os.path.exists(launcher_path):
-                            self.append_log(f"Deleting: {launcher_name}")
-                            os.remove(launcher_path)
-
-                        # Rename .bak back to .exe
-                        self.append_log(f"Restoring: {launcher_name.replace('.exe', '.bak')} -> {launcher_name}")
-                        os.rename(backup_path, launcher_path)
-                        self.append_log("Original launcher restored!")
-                        launcher_restored = True
-
-            self.append_log("")
-            self.append_log("=" * 50)
-            self.append_log("Data folder restored successfully!")
-            self.append_log("=" * 50)
-
-            return True, moved_count, launcher_restored
-
-        except Exception as e:
-            self.append_log(f"ERROR: {str(e)}")
-            QMessageBox.critical(self, "Error", f"Failed to restore Data folder:\n{str(e)}")
-            return False, 0, False
-
-        finally:
-            self.progress_bar.setVisible(False)
-            self.update_build_button()
+        def on_finished(success, result, message):
+            if not success:
+                if not self.datafolder_worker.cancel_event.is_set():
+                    QMessageBox.critical(self, "Error", f"Failed to restore Data folder:\n{message}")
+                on_restored(False, 0, False)
+                return
+            moved_count, launcher_restored = result
+            on_restored(True, moved_count, launcher_restored)
 
+        self._run_datafolder_worker("restore", data_path, datafolder_source, modlist_path, on_finished)
 
 def main():
+    # Builds run in a child process; needed for it to start in the AppImage
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
 
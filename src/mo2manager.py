@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+MO2 Manager entry point.
+
+    mo2manager                       Start the GUI
+    mo2manager build [--pack MODE]   Build the Data folder of a game (and pack loose files)
+    mo2manager restore               Move the DataFolder mod back to the game's Data folder
+    mo2manager verify [--repair]     Compare the Data folder with its last build
+    mo2manager reclaim [--move-to FOLDER | --delete]
+                                     List (and move or delete) overridden mod files no profile uses
+    mo2manager dedupe [--dry-run]    Hardlink identical files across all MO2 instances' mods folders
+    mo2manager prewarm [--wait]      Read the Data folder into the page cache before playing
+    mo2manager scan                  List the configured games, their builds and MO2 instances
+    mo2manager launch [--mo2]        Update the Data folder if needed and start the game (or MO2)
+    mo2manager prelaunch %command%   Steam launch option: rebuild the Data folder if
+                                     anything changed in MO2, then start the game
+
+The command line only uses the Qt-free modules (core, build_data_folder, datafolder),
+so it works over SSH and from Game Mode scripts. prelaunch runs on every game launch,
+so it only reads the last build's metadata and stats the mod folders (see
+build_data_folder.get_source_fingerprint), and imports nothing heavy unless a
+rebuild is needed.
+"""
+
+import os
+import sys
+
+
+COMMANDS = ("build", "restore", "verify", "reclaim", "dedupe", "prewarm", "scan", "launch", "prelaunch")
+
+
+class CommandError(Exception):
+    """A command line problem to report to the user (exit code 2)."""
+
+
+def find_game_for_command(command, games):
+    """Return the configured game whose folder contains a path in the launch command, or None."""
+    for game in games:
+        roots = [game.get("game_root"), game.get("launcher_location")]
+        if game.get("data_path"):
+            roots.append(os.path.dirname(game["data_path"]))
+        roots = [os.path.abspath(root) + os.sep for root in roots if root]
+        for arg in command:
+            path = os.path.abspath(arg)
+            if any(path.startswith(root) for root in roots):
+                return game
+    return None
+
+
+def resolve_game(name, instance, games):
+    """
+    Pick the game to work on: by name, by the MO2 instance folder name, or the only
+    game that has been built.
+    """
+    import build_data_folder
+    import core
+
+    if name:
+        for game in games:
+            if game.get("name", "").lower() == name.lower():
+                return game
+        raise CommandError(f"Unknown game: {name}. Configured games: "
+                           + ", ".join(game.get("name", "") for game in games))
+    if instance:
+        game = core.detect_game_for_instance(instance, games)
+        if game is None:
+            raise CommandError(f"Can't tell the game of {instance} (expected a '<game name> MO2' folder), use --game")
+        return game
+
+    built = [game for game in games
+             if game.get("data_path") and build_data_folder.load_build_meta(game["data_path"]) is not None]
+    if len(built) == 1:
+        return built[0]
+    raise CommandError("Use --game to choose the game"
+                       + (": " + ", ".join(game["name"] for game in built) if built else ""))
+
+
+def resolve_instance(instance, game):
+    """The MO2 instance folder: given, the one the game was last built from, or found by scanning."""
+    import build_data_folder
+    import core
+
+    if instance:
+        if not os.path.isdir(os.path.join(instance, "mods")):
+            raise CommandError(f"Not an MO2 instance (no mods folder): {instance}")
+        return instance
+
+    meta = build_data_folder.load_build_meta(game.get("data_path", ""))
+    if meta and meta.get("mods_folder") and os.path.isdir(meta["mods_folder"]):
+        return os.path.dirname(meta["mods_folder"])
+
+    # The instances found last time first (one stat each), then a full scan
+    for find_instances in (core.load_known_instances, core.scan_for_mo2_instances):
+        for _, folder_path in find_instances():
+            detected = core.detect_game_for_instance(folder_path, [game])
+            if detected is not None:
+                return folder_path
+    raise CommandError(f"No MO2 instance found for {game.get('name')}, use --instance")
+
+
+def resolve_profile(profile, instance, game):
+    """The MO2 profile: given, the one last built, or the only/Default profile."""
+    import build_data_folder
+
+    profiles_folder = os.path.join(instance, "profiles")
+    profiles = sorted(d for d in os.listdir(profiles_folder)
+                      if os.path.isdir(os.path.join(profiles_folder, d))) if os.path.isdir(profiles_folder) else []
+    if profile:
+        if profile not in profiles:
+            raise CommandError(f"Unknown profile: {profile}. Profiles: {', '.join(profiles)}")
+        return profile
+
+    built = build_data_folder.get_profile_of_build(game.get("data_path", ""))
+    for candidate in (built, "Default"):
+        if candidate in profiles:
+            return candidate
+    if len(profiles) == 1:
+        return profiles[0]
+    raise CommandError(f"Use --profile to choose the profile: {', '.join(profiles)}")
+
+
+def prelaunch(data_path, game=None, force=False):
+    """
+    Rebuild the Data folder incrementally if the mod list, plugins or mod folders
+    changed since its last build. Returns True if the Data folder is up to date.
+    """
+    import build_data_folder
+
+    meta = build_data_folder.load_build_meta(data_path)
+    if meta is None or not meta.get("modlist"):
+        print(f"[mo2manager] No build found for {data_path}, use Build Data Folder in MO2 Manager first")
+        return False
+
+    fingerprint = build_data_folder.get_source_fingerprint(
+        meta["modlist"], meta["mods_folder"], meta.get("overwrite_folder")
+    )
+    if fingerprint == meta.get("source_fingerprint") and not force:
+        return True
+
+    log_path, log_file = build_data_folder.open_build_log("prelaunch")
+    print(f"[mo2manager] Mods changed since the last build, updating {data_path}")
+    if log_path:
+        print(f"[mo2manager] Log: {log_path}")
+
+    def events(event):
+        if isinstance(event, build_data_folder.LogEvent) and log_file:
+            log_file.write(event.text + "\n")
+
+    try:
+        success, message = build_data_folder.run_build(
+            meta["modlist"], meta["mods_folder"], data_path, meta.get("overwrite_folder"),
+            resume=build_data_folder.find_interrupted_build(data_path) is not None,
+            plugins_dest=(game or {}).get("plugins_path") or None,
+            game_data=game,
+            incremental=True,
+            profile_trees=bool(game and game.get("profile_trees")),
+            events=events
+        )
+    finally:
+        if log_file:
+            log_file.close()
+    print(f"[mo2manager] {message.splitlines()[0]}")
+    return success
+
+
+def prelaunch_prewarm(data_path, game):
+    """Queue the Data folder's reads if the game has prewarming enabled; never fails the launch."""
+    if not (game and game.get("prewarm")):
+        return
+    import build_data_folder
+    import prewarm
+
+    try:
+        result = prewarm.prewarm_data_folder(data_path, budget=prewarm.get_budget(game), events=lambda event: None)
+        print(f"[mo2manager] Prewarmed {result['files']} files "
+              f"({build_data_folder.format_size(result['bytes'])}) in {result['seconds']:.1f} s")
+    except Exception as e:
+        print(f"[mo2manager] Prewarm failed: {e}")
+
+
+def cmd_prelaunch(args, games):
+    command = args.game_command[1:] if args.game_command[:1] == ['--'] else args.game_command
+
+    game = find_game_for_command(command, games) if command else None
+    if args.data and game is None:
+        game = next((game for game in games if game.get("data_path")
+                     and os.path.abspath(game["data_path"]) == os.path.abspath(args.data)), None)
+    data_path = args.data or (game.get("data_path") if game else None)
+    if data_path:
+        try:
+            prelaunch(data_path, game, force=args.force)
+        except Exception as e:
+            # Never keep the game from starting
+            print(f"[mo2manager] Data folder update failed: {e}")
+        prelaunch_prewarm(data_path, game)
+    else:
+        print("[mo2manager] No configured game found in the launch command, starting it unchanged")
+
+    if not command:
+        return 0
+    import core
+    sys.stdout.flush()
+    try:
+        # Without the AppImage's library paths, like every other process we start
+        os.execvpe(command[0], command, core.get_clean_env())
+    except OSError as e:
+        print(f"[mo2manager] Could not run {command[0]}: {e}")
+        return 127
+
+
+def cmd_build(args, games):
+    import build_data_folder
+    import datafolder
+
+    game = resolve_game(args.game, args.instance, games)
+    instance = resolve_instance(args.instance, game)
+    profile = resolve_profile(args.profile, instance, game)
+    data_path = game["data_path"]
+    mods_folder = os.path.join(instance, "mods")
+    overwrite_folder = os.path.join(instance, "overwrite")
+    modlist_path = os.path.join(instance, "profiles", profile, "modlist.txt")
+    if not os.path.isfile(modlist_path):
+        raise CommandError(f"modlist.txt not found: {modlist_path}")
+
+    print(f"Game:     {game['name']}")
+    print(f"Instance: {instance}")
+    print(f"Profile:  {profile}")
+    print()
+
+    # The game's own files become the lowest priority mod before the first build
+    datafolder_dest = os.path.join(mods_folder, datafolder.DATAFOLDER_MOD_NAME)
+    if not os.path.isdir(datafolder_dest):
+        print("DataFolder mod does not exist, moving the Data folder contents into it first...")
+        datafolder.create_datafolder_mod(data_path, datafolder_dest, modlist_path)
+        print()
+
+    if args.pack:
+        game = dict(game, pack_archives="" if args.pack == "off" else args.pack)
+
+    interrupted = build_data_folder.find_interrupted_build(data_path)
+    if interrupted and not args.no_resume:
+        print(f"Resuming the build interrupted after {interrupted['started']}")
+    try:
+        success, message = build_data_folder.run_build(
+            modlist_path, mods_folder, data_path,
+            overwrite_folder if os.path.isdir(overwrite_folder) else None,
+            plugins_dest=game.get("plugins_path") or None,
+            game_data=game,
+            resume=bool(interrupted) and not args.no_resume,
+            incremental=args.incremental,
+            profile_trees=bool(game.get("profile_trees"))
+        )
+    except KeyboardInterrupt:
+        print()
+        print("Build cancelled.")
+        if build_data_folder.rollback_data_folder(data_path):
+            print("Previous Data folder restored.")
+        else:
+            print("Partial Data folder kept, run again to resume.")
+        return 1
+    print()
+    print(message)
+    return 0 if success else 1
+
+
+def cmd_restore(args, games):
+    import datafolder
+
+    game = resolve_game(args.game, args.instance, games)
+    instance = resolve_instance(args.instance, game)
+    datafolder_source = os.path.join(instance, "mods", datafolder.DATAFOLDER_MOD_NAME)
+    if not os.path.isdir(datafolder_source):
+        raise CommandError(f"There is no DataFolder mod to restore: {datafolder_source}")
+    profile = resolve_profile(args.profile, instance, game)
+    modlist_path = os.path.join(instance, "profiles", profile, "modlist.txt")
+
+    moved_count, launcher_restored = datafolder.restore_datafolder(
+        game["data_path"], datafolder_source, modlist_path, game_data=game
+    )
+    print(f"Moved {moved_count} items to {game['data_path']}")
+    if launcher_restored:
+        print("Original launcher restored.")
+    return 0
+
+
+def cmd_verify(args, games):
+    import build_data_folder
+
+    game = resolve_game(args.game, None, games)
+    results = build_data_folder.verify_data_folder(game["data_path"], repair=args.repair)
+    if results is None:
+        return 1
+    return 1 if build_data_folder.count_verify_problems(results) else 0
+
+
+def cmd_reclaim(args, games):
+    import build_data_folder
+
+    game = resolve_game(args.game, None, games)
+    if args.move_to and args.delete:
+        raise CommandError("Use either --move-to or --delete")
+    if args.delete and not args.yes:
+        response = input("Delete every overridden file no profile uses? (y/N): ").strip().lower()
+        if response not in ('y', 'yes'):
+            print("Nothing was deleted.")
+            return 0
+    report = build_data_folder.reclaim_overridden_files(
+        game["data_path"], mods=set(args.mod) if args.mod else None,
+        archive_dir=args.move_to, delete=args.delete)
+    return 1 if report is None else 0
+
+
+def cmd_dedupe(args, games):
+    import dedupe
+
+    mods_folders = [os.path.join(os.path.abspath(instance), "mods") for instance in args.instance or []]
+    for mods_folder in mods_folders:
+        if not os.path.isdir(mods_folder):
+            raise CommandError(f"Not an MO2 instance (no mods folder): {os.path.dirname(mods_folder)}")
+    try:
+        dedupe.dedupe_mod_folders(mods_folders or None, link=not args.dry_run)
+    except dedupe.DedupeCancelled:
+        print("Cancelled.")
+        return 1
+    return 0
+
+
+def cmd_prewarm(args, games):
+    import prewarm
+
+    game = resolve_game(args.game, None, games)
+    if not os.path.isdir(game["data_path"]):
+        raise CommandError(f"Data folder not found: {game['data_path']}")
+    budget = args.budget * 1024 * 1024 if args.budget else prewarm.get_budget(game)
+    prewarm.prewarm_data_folder(game["data_path"], budget=budget, wait=args.wait)
+    return 0
+
+
+def cmd_scan(args, games):
+    import build_data_folder
+    import core
+
+    print("Games:")
+    for game in games:
+        data_path = game.get("data_path", "")
+        game_folder = game.get("game_root") or os.path.dirname(data_path)
+        if not os.path.isdir(game_folder):
+            continue
+        meta = build_data_folder.load_build_meta(data_path)
+        interrupted = build_data_folder.find_interrupted_build(data_path)
+        if interrupted:
+            status = f"build interrupted (started {interrupted['started']})"
+        elif meta:
+            status = (f"built {meta.get('generated', '?')} for profile "
+                      f"'{build_data_folder.get_profile_of_build(data_path)}', {meta.get('file_count', 0)} files")
+        else:
+            status = "not built"
+        print(f"  {game['name']}: {status}")
+        print(f"    Data: {data_path}")
+        trees = [p for p in build_data_folder.list_profile_trees(data_path)
+                 if p != build_data_folder.get_profile_of_build(data_path)]
+        if trees:
+            print(f"    Prebuilt profiles: {', '.join(trees)}")
+
+    print()
+    print("MO2 instances:")
+    instances = core.scan_for_mo2_instances()
+    for display_name, folder_path in instances:
+        game = core.detect_game_for_instance(folder_path, games)
+        print(f"  {folder_path}" + (f" ({game['name']})" if game else ""))
+    if not instances:
+        print("  None found")
+    return 0
+
+
+def cmd_launch(args, games):
+    import core
+
+    game = resolve_game(args.game, args.instance, games)
+    if args.mo2:
+        instance = resolve_instance(args.instance, game)
+        print(f"Launched ModOrganizer.exe via {core.launch_mo2(instance, game)}")
+        return 0
+
+    if not args.no_update:
+        prelaunch(game["data_path"], game)
+    prelaunch_prewarm(game["data_path"], game)
+    app_id = core.launch_game(game)
+    print(f"Started {game['name']} through Steam (app {app_id})")
+    return 0
+
+
+def cli_main(argv):
+    import argparse
+    import core
+
+    parser = argparse.ArgumentParser(
+        prog="mo2manager",
+        description="Build and manage hardlinked Data folders from MO2 instances. Run without a command for the GUI."
+    )
+    subparsers = parser.add_subparsers(dest="subcommand", required=True)
+
+    def add_selection(subparser, instance=True, profile=True):
+        subparser.add_argument('--game', '-g', default=None,
+                               help='Game name as in the config (default: the only game that has been built)')
+        if instance:
+            subparser.add_argument('--instance', '-i', default=None,
+                                   help='MO2 instance folder (default: the one the game was last built from)')
+        if profile:
+            subparser.add_argument('--profile', '-p', default=None,
+                                   help='MO2 profile (default: the one last built, Default or the only one)')
+
+    build = subparsers.add_parser('build', help='Build the Data folder')
+    add_selection(build)
+    build.add_argument('--incremental', action='store_true',
+                       help='Update the Data folder in place, only linking what changed')
+    build.add_argument('--pack', choices=('category', 'mod', 'off'),
+                       help="Pack loose files into archives, one per folder or per mod "
+                            "(default: the game's pack_archives setting)")
+    build.add_argument('--no-resume', action='store_true',
+                       help='Start over instead of resuming an interrupted build')
+    build.set_defaults(handler=cmd_build)
+
+    restore = subparsers.add_parser('restore', help='Move the DataFolder mod back to the Data folder')
+    add_selection(restore)
+    restore.set_defaults(handler=cmd_restore)
+
+    verify = subparsers.add_parser('verify', help='Compare the Data folder with its last build')
+    add_selection(verify, instance=False, profile=False)
+    verify.add_argument('--repair', action='store_true', help='Re-link missing and broken files')
+    verify.set_defaults(handler=cmd_verify)
+
+    reclaim = subparsers.add_parser('reclaim', help='List overridden mod files no profile uses, by mod')
+    add_selection(reclaim, instance=False, profile=False)
+    reclaim.add_argument('--move-to', default=None, metavar='FOLDER',
+                         help='Move the files into FOLDER (as FOLDER/<mod>/<path>)')
+    reclaim.add_argument('--delete', action='store_true', help='Delete the files')
+    reclaim.add_argument('--mod', action='append', default=None,
+                         help='Only this mod (can be repeated)')
+    reclaim.add_argument('--yes', '-y', action='store_true', help="Don't ask before deleting")
+    reclaim.set_defaults(handler=cmd_reclaim)
+
+    dedupe_parser = subparsers.add_parser(
+        'dedupe', help="Hardlink identical files across the MO2 instances' mods folders")
+    dedupe_parser.add_argument('--instance', '-i', action='append', default=None,
+                               help='MO2 instance folder (can be repeated; default: every instance found by scan)')
+    dedupe_parser.add_argument('--dry-run', '-n', action='store_true',
+                               help='Only report the duplicates and the space linking would save')
+    dedupe_parser.set_defaults(handler=cmd_dedupe)
+
+    prewarm_parser = subparsers.add_parser('prewarm', help='Read the Data folder into the page cache')
+    add_selection(prewarm_parser, instance=False, profile=False)
+    prewarm_parser.add_argument('--budget', '-b', type=int, default=None, metavar='MB',
+                                help='Most data to prewarm (default: the game\'s prewarm_budget_mb, or 2048)')
+    prewarm_parser.add_argument('--wait', action='store_true',
+                                help='Read the files instead of queueing the reads, and report when done')
+    prewarm_parser.set_defaults(handler=cmd_prewarm)
+
+    scan = subparsers.add_parser('scan', help='List games, their builds and MO2 instances')
+    scan.set_defaults(handler=cmd_scan)
+
+    launch = subparsers.add_parser('launch', help='Start the game through Steam (or MO2 with --mo2)')
+    add_selection(launch, profile=False)
+    launch.add_argument('--mo2', action='store_true', help='Run ModOrganizer.exe instead of the game')
+    launch.add_argument('--no-update', action='store_true',
+                        help="Don't rebuild the Data folder first when mods changed")
+    launch.set_defaults(handler=cmd_launch)
+
+    prelaunch_parser = subparsers.add_parser(
+        'prelaunch',
+        help='Steam launch option: rebuild if mods changed, then run %%command%%',
+        description="Rebuild the Data folder if mods changed, then run the game command. "
+                    "Use as a Steam launch option: mo2manager prelaunch %%command%%"
+    )
+    prelaunch_parser.add_argument(
+        '--data', '-o',
+        default=None,
+        help='Data folder to update (default: the configured game whose folder is in the command)'
+    )
+    prelaunch_parser.add_argument('--force', action='store_true', help='Rebuild even if nothing changed')
+    prelaunch_parser.add_argument(
+        'game_command',
+        nargs=argparse.REMAINDER,
+        help='Game command to run afterwards (%%command%% in Steam)'
+    )
+    prelaunch_parser.set_defaults(handler=cmd_prelaunch)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args, core.load_game_paths())
+    except CommandError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print()
+        print("Cancelled.")
+        return 1
+
+
+def main():
+    # Frozen (AppImage) builds re-run this executable for build child processes
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+
+    if len(sys.argv) > 1 and (sys.argv[1] in COMMANDS or sys.argv[1] in ("-h", "--help")):
+        sys.exit(cli_main(sys.argv[1:]))
+
+    import gui
+    gui.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,565 @@
+"""
+Pack the loose files of a built Data folder into uncompressed BSA/BA2 archives.
+
+A big mod list puts hundreds of thousands of loose files in the Data folder, and
+the game (and the filesystem, most of all on an SD card) pays for each one of them
+when it starts. Packing moves the files the build linked into a few archives, one
+per top level folder (meshes, textures, ...) or one per mod, each loaded by an
+empty plugin added at the end of plugins.txt. Loaded last, the archives win over
+every other archive, and no loose file with the same path is left to win over
+them, so the game sees the same files as before. Games that order plugins by
+modification time (Oblivion, Fallout 3, New Vegas, Skyrim) get a copy of the
+plugin per pack, dated after the newest plugin in the Data folder.
+
+Archives are uncompressed (writing one is a copy, and the game reads it as fast
+as loose files). They are kept in .mo2manager/packs next to the Data folder, named
+after a fingerprint of their files (path, size, mtime and inode), and hardlinked
+into Data, so a build that leaves a group unchanged reuses its archive as it is.
+
+Only folders the game reads through its archives are packed; plugins, archives,
+script extender plugins and config files (which SKSE plugins read from disk) stay
+loose. Fallout 4 archives are general BA2s, so its textures stay loose (they need
+the DX10 layout). Morrowind and Oblivion Remastered are not supported.
+
+No Qt in here: run_build calls this in the build process, after the build.
+"""
+
+import os
+import glob
+import struct
+import time
+import zlib
+import hashlib
+
+from build_data_folder import (BuildCancelled, ProgressEvent, make_logger, format_size, get_state_dir,
+                               load_build_index, load_pack_manifest, write_pack_manifest)
+
+
+PACK_PREFIX = "MO2M Pack - "
+PACK_CACHE_DIR_NAME = "packs"
+# Bumped when the archive layout changes, so cached archives are rewritten
+PACK_VERSION = 1
+
+# Archive offsets are 32 bit in BSAs and the games misbehave well before 4 GB
+MAX_ARCHIVE_BYTES = 2000 * 1024 * 1024
+# Bit 30 of a BSA file size toggles compression, so bigger files stay loose
+MAX_BSA_FILE_BYTES = 0x40000000 - 1
+# Per mod packing leaves mods with fewer loose files alone (one plugin each is not worth it)
+MIN_MOD_FILES = 100
+COPY_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Read from disk by the script extenders and their plugins, or never from archives
+LOOSE_EXTENSIONS = {".esp", ".esm", ".esl", ".bsa", ".ba2", ".dll", ".exe", ".ini", ".json",
+                    ".toml", ".yaml", ".yml", ".txt", ".xml", ".log", ".bik"}
+
+# Top level Data folders each game loads through its archives
+# (music must stay loose in Oblivion, Fallout 3 and New Vegas)
+SKYRIM_FOLDERS = {"meshes", "textures", "sound", "music", "interface", "scripts", "seq",
+                  "lodsettings", "grass", "shadersfx", "trees"}
+FALLOUT3_FOLDERS = {"meshes", "textures", "sound", "menus", "trees", "lodsettings"}
+OBLIVION_FOLDERS = {"meshes", "textures", "sound", "menus", "trees", "distantlod"}
+FALLOUT4_FOLDERS = {"meshes", "materials", "sound", "interface", "scripts", "seq", "vis", "lodsettings"}
+
+# archive: "bsa" (version 103-105) or "ba2" (general, version 1)
+# form_version/hedr: the plugin header of the game (form_version None: 20 byte record headers)
+# light: the dummy plugins are ESL flagged; active: prefix of an active plugin in plugins.txt
+# mtime_order: the game loads plugins by file modification time, not in plugins.txt order
+SKYRIM_SE = {"archive": "bsa", "version": 105, "form_version": 44, "hedr": 1.7,
+             "light": True, "active": "*", "mtime_order": False, "folders": SKYRIM_FOLDERS}
+SKYRIM = {"archive": "bsa", "version": 104, "form_version": 43, "hedr": 0.94,
+          "light": False, "active": "", "mtime_order": True, "folders": SKYRIM_FOLDERS}
+FALLOUT4 = {"archive": "ba2", "version": 1, "form_version": 131, "hedr": 1.0,
+            "light": True, "active": "*", "mtime_order": False, "folders": FALLOUT4_FOLDERS}
+FALLOUT3 = {"archive": "bsa", "version": 104, "form_version": 15, "hedr": 0.94,
+            "light": False, "active": "", "mtime_order": True, "folders": FALLOUT3_FOLDERS}
+NEW_VEGAS = {"archive": "bsa", "version": 104, "form_version": 15, "hedr": 1.34,
+             "light": False, "active": "", "mtime_order": True, "folders": FALLOUT3_FOLDERS}
+OBLIVION = {"archive": "bsa", "version": 103, "form_version": None, "hedr": 1.0,
+            "light": False, "active": "", "mtime_order": True, "folders": OBLIVION_FOLDERS}
+
+GAME_FORMATS = {
+    "Skyrim Special Edition": SKYRIM_SE,
+    "Skyrim": SKYRIM,
+    "Fallout 4": FALLOUT4,
+    "Fallout London": FALLOUT4,
+    "Fallout 3": FALLOUT3,
+    "Fallout 3 GOTY": FALLOUT3,
+    "New Vegas": NEW_VEGAS,
+    "Oblivion": OBLIVION,
+}
+
+# BSA archive flags: directory and file names are stored
+BSA_ARCHIVE_FLAGS = 0x1 | 0x2
+# BSA content flags by top level folder (anything else is "misc")
+BSA_CONTENT_FLAGS = {"meshes": 0x1, "textures": 0x2, "interface": 0x4, "menus": 0x4, "sound": 0x8,
+                     "music": 0x8, "shadersfx": 0x20, "trees": 0x40}
+BSA_VOICE_FLAG = 0x10
+BSA_MISC_FLAG = 0x100
+
+
+def get_pack_format(game_data):
+    """The archive format of the game (see GAME_FORMATS), or None if packing is not supported."""
+    return GAME_FORMATS.get((game_data or {}).get("name"))
+
+
+def get_format_key(fmt):
+    """Short name of an archive format: "bsa103" to "bsa105", or "ba2"."""
+    return fmt["archive"] if fmt["archive"] == "ba2" else f"{fmt['archive']}{fmt['version']}"
+
+
+def is_pack_plugin(plugin_name):
+    """True for the dummy plugins that load packed archives."""
+    name = plugin_name.lower()
+    return name.startswith(PACK_PREFIX.lower()) and name.endswith(".esp")
+
+
+def get_pack_plugins(output_dir, game_data):
+    """
+    The plugins.txt lines of the pack plugins in the Data folder at output_dir (from its
+    pack manifest), to add at the end of the load order; empty if nothing is packed.
+    """
+    fmt = get_pack_format(game_data)
+    active = fmt["active"] if fmt else ""
+    return [active + pack["plugin"] for pack in (load_pack_manifest(output_dir) or {}).get("packs", [])]
+
+
+def _safe_name(name):
+    """A group name usable in a plugin name (ASCII letters, digits and a few separators)."""
+    safe = "".join(c if c.isascii() and (c.isalnum() or c in " -_.()") else "_" for c in name)
+    return safe.strip(" .")[:60] or "Files"
+
+
+def get_pack_names(group, fmt):
+    """(plugin, archive) file names of a pack; the game loads the archive because of its name."""
+    stem = PACK_PREFIX + group
+    if fmt["archive"] == "ba2":
+        return stem + ".esp", stem + " - Main.ba2"
+    return stem + ".esp", stem + ".bsa"
+
+
+def _is_packable(dest_path, fmt):
+    """True if the game would read the file at dest_path (in the Data folder) from an archive."""
+    parts = dest_path.split(os.sep)
+    if len(parts) < 2 or parts[0].lower() not in fmt["folders"]:
+        return False
+    if os.path.splitext(parts[-1])[1].lower() in LOOSE_EXTENSIONS:
+        return False
+    # Archive names are Windows-1252 with at most 254 characters per folder or file name
+    try:
+        encoded = [part.encode("cp1252") for part in (os.path.dirname(dest_path), parts[-1])]
+    except UnicodeEncodeError:
+        return False
+    return all(len(part) < 255 for part in encoded)
+
+
+def plan_packs(entries, fmt, mode="category"):
+    """
+    Group the packable files of a build index (see load_build_index) into archives.
+    mode: "category" packs each top level folder (Meshes, Textures, ...) on its own,
+          "mod" packs each mod with at least MIN_MOD_FILES packable files on its own
+    Returns a list of (group name, files) with files a sorted list of (dest_path, size);
+    groups over MAX_ARCHIVE_BYTES are split ("Textures", "Textures 2", ...). Files too
+    big for the archive (see MAX_BSA_FILE_BYTES) stay loose.
+    """
+    max_file_bytes = MAX_BSA_FILE_BYTES if fmt["archive"] == "bsa" else MAX_ARCHIVE_BYTES
+    groups = {}
+    for dest_path, entry in entries.items():
+        size = entry[2]
+        if size > max_file_bytes or not _is_packable(dest_path, fmt):
+            continue
+        group = entry[0] if mode == "mod" else dest_path.split(os.sep, 1)[0].lower().capitalize()
+        groups.setdefault(group, []).append((dest_path, size))
+
+    plan = []
+    used = set()
+    for group in sorted(groups, key=str.lower):
+        files = sorted(groups[group])
+        if mode == "mod" and len(files) < MIN_MOD_FILES:
+            continue
+        # Mods whose names only differ in characters a plugin name can't have
+        name = _safe_name(group)
+        base, n = name, 1
+        while name.lower() in used:
+            n += 1
+            name = f"{base} ({n})"
+        used.add(name.lower())
+
+        part, part_size, number = [], 0, 1
+        for dest_path, size in files:
+            if part and part_size + size > MAX_ARCHIVE_BYTES:
+                plan.append((name if number == 1 else f"{name} {number}", part))
+                part, part_size, number = [], 0, number + 1
+            part.append((dest_path, size))
+            part_size += size
+        if part:
+            plan.append((name if number == 1 else f"{name} {number}", part))
+    return plan
+
+
+def get_pack_fingerprint(fmt, files, entries):
+    """Hash of an archive's format and files (path, size, mtime, inode): equal means the archive is unchanged."""
+    h = hashlib.sha1(f"{PACK_VERSION}\t{get_format_key(fmt)}\n".encode())
+    for dest_path, size in files:
+        entry = entries[dest_path]
+        h.update(f"{dest_path}\t{size}\t{entry[5]}\t{entry[3]}\n".encode('utf-8', 'surrogateescape'))
+    return h.hexdigest()
+
+
+def make_dummy_plugin(fmt):
+    """An empty plugin (TES4 header only) that makes the game load the archive named after it."""
+    def subrecord(signature, data):
+        return signature + struct.pack('<H', len(data)) + data
+
+    data = (subrecord(b'HEDR', struct.pack('<fII', fmt["hedr"], 0, 0x800))
+            + subrecord(b'CNAM', b'mo2manager\0'))
+    flags = 0x200 if fmt["light"] else 0
+    if fmt["form_version"] is None:
+        # Oblivion: type, size, flags, form id, version control
+        return b'TES4' + struct.pack('<IIII', len(data), flags, 0, 0) + data
+    return b'TES4' + struct.pack('<IIIIHH', len(data), flags, 0, 0, fmt["form_version"], 0) + data
+
+
+def bsa_hash(name, is_folder=False):
+    """The 64 bit hash BSAs sort and look up folder and file names by."""
+    name = name.lower().replace('/', '\\')
+    root, ext = (name, '') if is_folder else os.path.splitext(name)
+    chars = root.encode('cp1252')
+    ext = ext.encode('cp1252')
+    length = len(chars)
+    h1 = 0
+    if length:
+        h1 = chars[-1] | ((chars[-2] if length > 2 else 0) << 8) | (length << 16) | (chars[0] << 24)
+    h1 |= {b'.kf': 0x80, b'.nif': 0x8000, b'.dds': 0x8080, b'.wav': 0x80000000}.get(ext, 0)
+    h2 = 0
+    for c in chars[1:-2]:
+        h2 = (h2 * 0x1003f + c) & 0xFFFFFFFF
+    h3 = 0
+    for c in ext:
+        h3 = (h3 * 0x1003f + c) & 0xFFFFFFFF
+    return (((h2 + h3) & 0xFFFFFFFF) << 32) | h1
+
+
+def ba2_hash(name):
+    """The 32 bit hash of BA2 names: CRC-32 without the initial and final inversion."""
+    return zlib.crc32(name.lower().replace('/', '\\').encode('cp1252'), 0xFFFFFFFF) ^ 0xFFFFFFFF
+
+
+def _copy_data(out_fd, source_path, size):
+    """Append size bytes of source_path to out_fd (copied in the kernel where it can be)."""
+    with open(source_path, 'rb', buffering=0) as f:
+        remaining = size
+        while remaining > 0:
+            if hasattr(os, "sendfile"):
+                copied = os.sendfile(out_fd, f.fileno(), None, min(remaining, COPY_CHUNK_SIZE))
+            else:
+                copied = os.write(out_fd, f.read(min(remaining, COPY_CHUNK_SIZE)))
+            if not copied:
+                raise OSError(f"{source_path} changed while it was packed")
+            remaining -= copied
+
+
+def _write_archive_data(path, head, files, cancel, progress):
+    """Write the header block of an archive, then the data of files ((archive path, source, size))."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, head)
+        for i, (_, source_path, size) in enumerate(files):
+            if i % 256 == 0 and cancel is not None and cancel.is_set():
+                raise BuildCancelled("Build cancelled")
+            _copy_data(fd, source_path, size)
+            progress(size)
+    finally:
+        os.close(fd)
+
+
+def write_bsa(path, files, version, cancel=None, progress=lambda size: None):
+    """
+    Write an uncompressed BSA (version 103 Oblivion, 104 Skyrim/Fallout 3/New Vegas,
+    105 Skyrim Special Edition) of files: list of (archive path with backslashes,
+    source path, size). progress(size) is called after each file.
+    """
+    folders = {}
+    content_flags = 0
+    for archive_path, source_path, size in files:
+        folder, name = archive_path.lower().rsplit('\\', 1)
+        folders.setdefault(folder, []).append((bsa_hash(name), name.encode('cp1252'), source_path, size))
+        top = folder.split('\\', 1)[0]
+        if folder.startswith("sound\\voice"):
+            content_flags |= BSA_VOICE_FLAG
+        else:
+            content_flags |= BSA_CONTENT_FLAGS.get(top, BSA_MISC_FLAG)
+
+    # Folders sorted by hash, and the files of each folder by hash
+    ordered = sorted((bsa_hash(folder, is_folder=True), folder.encode('cp1252'), sorted(folder_files))
+                     for folder, folder_files in folders.items())
+    folder_record_size = 24 if version == 105 else 16
+    total_folder_name_length = sum(len(name) + 1 for _, name, _ in ordered)
+    total_file_name_length = sum(len(name) + 1 for _, _, folder_files in ordered for _, name, _, _ in folder_files)
+    records_offset = 36 + folder_record_size * len(ordered)
+    names_offset = records_offset + sum(len(name) + 2 + 16 * len(folder_files) for _, name, folder_files in ordered)
+    data_offset = names_offset + total_file_name_length
+
+    folder_records = bytearray()
+    file_records = bytearray()
+    file_names = bytearray()
+    data_files = []
+    record_offset = records_offset
+    for folder_hash, folder_name, folder_files in ordered:
+        # Folder offsets count the file name block too, a quirk of the format
+        if version == 105:
+            folder_records += struct.pack('<QIIQ', folder_hash, len(folder_files), 0,
+                                          record_offset + total_file_name_length)
+        else:
+            folder_records += struct.pack('<QII', folder_hash, len(folder_files),
+                                          record_offset + total_file_name_length)
+        block = bytes([len(folder_name) + 1]) + folder_name + b'\0'
+        file_records += block
+        for file_hash, file_name, source_path, size in folder_files:
+            file_records += struct.pack('<QII', file_hash, size, data_offset)
+            file_names += file_name + b'\0'
+            data_files.append((file_name, source_path, size))
+            data_offset += size
+        record_offset += len(block) + 16 * len(folder_files)
+    if data_offset > 0xFFFFFFFF:
+        raise ValueError(f"Archive too large: {format_size(data_offset)}")
+
+    header = struct.pack('<4sIIIIIIIHH', b'BSA\0', version, 36, BSA_ARCHIVE_FLAGS, len(ordered), len(files),
+                         total_folder_name_length, total_file_name_length, content_flags, 0)
+    _write_archive_data(path, header + folder_records + file_records + file_names, data_files, cancel, progress)
+
+
+def write_ba2(path, files, cancel=None, progress=lambda size: None):
+    """
+    Write an uncompressed general (GNRL) BA2 of files: list of (archive path with
+    backslashes, source path, size). progress(size) is called after each file.
+    """
+    files = sorted(files)
+    records = bytearray()
+    names = bytearray()
+    data_offset = 24 + 36 * len(files)
+    for archive_path, source_path, size in files:
+        folder, name = archive_path.rsplit('\\', 1)
+        stem, ext = os.path.splitext(name)
+        records += struct.pack('<I4sIIQIII', ba2_hash(stem), ext[1:].lower().encode('cp1252')[:4], ba2_hash(folder),
+                               0x00100100, data_offset, 0, size, 0xBAADF00D)
+        encoded = archive_path.encode('cp1252')
+        names += struct.pack('<H', len(encoded)) + encoded
+        data_offset += size
+
+    # The name table comes after the data
+    header = struct.pack('<4sI4sIQ', b'BTDX', 1, b'GNRL', len(files), data_offset)
+    _write_archive_data(path, header + records, files, cancel, progress)
+    with open(path, 'ab') as f:
+        f.write(names)
+
+
+def _link(source, dest):
+    """Hardlink source to dest (copied if they are on different filesystems), replacing dest."""
+    import shutil
+
+    if os.path.lexists(dest):
+        os.remove(dest)
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+def _get_newest_plugin_mtime_ns(output_dir):
+    """The newest modification time (ns) of the plugins at the top of the Data folder, packs left out."""
+    newest = 0
+    with os.scandir(output_dir) as it:
+        for entry in it:
+            if (os.path.splitext(entry.name)[1].lower() in (".esp", ".esm", ".esl")
+                    and not is_pack_plugin(entry.name)):
+                try:
+                    newest = max(newest, entry.stat().st_mtime_ns)
+                except OSError:
+                    continue
+    return newest
+
+
+def _write_dated_plugin(source, dest, mtime_ns):
+    """Copy the dummy plugin at source to dest (its own inode) and set its mtime."""
+    import shutil
+
+    if os.path.lexists(dest):
+        os.remove(dest)
+    shutil.copyfile(source, dest)
+    os.utime(dest, ns=(mtime_ns, mtime_ns))
+
+
+def _remove_empty_dirs(output_dir, rel_dirs):
+    """Remove the folders of rel_dirs (and their parents) that are now empty, deepest first."""
+    for rel_dir in sorted(rel_dirs, key=lambda d: d.count(os.sep), reverse=True):
+        while rel_dir:
+            try:
+                os.rmdir(os.path.join(output_dir, rel_dir))
+            except OSError:
+                break
+            rel_dir = os.path.dirname(rel_dir)
+
+
+def remove_packs(output_dir, events=None):
+    """
+    Remove the archives and plugins of the last pack from the Data folder and forget it.
+    The files they held must be linked loose again (every build does).
+    Returns the number of packs removed.
+    """
+    manifest = load_pack_manifest(output_dir)
+    if not manifest or not manifest.get("packs"):
+        return 0
+    log = make_logger(events)
+    for pack in manifest["packs"]:
+        for name in (pack["plugin"], pack["archive"]):
+            try:
+                os.remove(os.path.join(output_dir, name))
+            except FileNotFoundError:
+                pass
+    write_pack_manifest(output_dir, None)
+    log(f"Removed {len(manifest['packs'])} packed archives of the last build from the Data folder")
+    return len(manifest["packs"])
+
+
+def prune_pack_cache(output_dir):
+    """Delete the cached archives no Data folder of the game (profile trees included) uses any more."""
+    state_dir = get_state_dir(output_dir)
+    cache_dir = os.path.join(state_dir, PACK_CACHE_DIR_NAME)
+    used = set()
+    for manifest_path in glob.glob(os.path.join(glob.escape(state_dir), "*.packs.json")):
+        tree = os.path.join(os.path.dirname(state_dir), os.path.basename(manifest_path)[:-len(".packs.json")])
+        for pack in (load_pack_manifest(tree) or {}).get("packs", []):
+            used.add(pack["fingerprint"])
+    removed = 0
+    for entry in os.scandir(cache_dir) if os.path.isdir(cache_dir) else []:
+        stem, ext = os.path.splitext(entry.name)
+        if (ext in (".bsa", ".ba2") and stem not in used) or ext == ".tmp":
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def pack_data_folder(output_dir, game_data, mode="category", cancel=None, events=None):
+    """
+    Pack the loose files of the last build of output_dir into archives (see plan_packs
+    for mode), reusing cached archives whose files are unchanged, and replace their
+    loose links with the archives and their plugins. The packs of the previous build
+    are removed first. Cancelling (or an error) stops packing; the files of the
+    archives not done yet stay loose. A cancel raises BuildCancelled once the manifest
+    of the archives done is written (see get_pack_plugins).
+    Returns the plugins.txt lines of the pack plugins, to add at the end of the load order.
+    """
+    log = make_logger(events)
+    log()
+    log("=" * 70)
+    log("PACK LOOSE FILES INTO ARCHIVES")
+    log("=" * 70)
+    remove_packs(output_dir, events=events)
+    fmt = get_pack_format(game_data)
+    if fmt is None:
+        log(f"Packing is not supported for {(game_data or {}).get('name')}, the files stay loose")
+        log("=" * 70)
+        return []
+    _, entries = load_build_index(output_dir)
+    if entries is None:
+        log("No build snapshot found, nothing to pack")
+        log("=" * 70)
+        return []
+    if mode == "mod" and not fmt["light"]:
+        log("Packing per mod needs light (ESL) plugins, packing per folder instead")
+        mode = "category"
+
+    plan = plan_packs(entries, fmt, mode)
+    total_files = sum(len(files) for _, files in plan)
+    total_bytes = sum(size for _, files in plan for _, size in files)
+    log(f"Format:      {'BA2 (general)' if fmt['archive'] == 'ba2' else 'BSA v' + str(fmt['version'])}, "
+        f"one archive per {'mod' if mode == 'mod' else 'folder'}")
+    log(f"Packing:     {total_files:,} of {len(entries):,} files ({format_size(total_bytes)}) "
+        f"into {len(plan)} archives")
+
+    cache_dir = os.path.join(get_state_dir(output_dir), PACK_CACHE_DIR_NAME)
+    os.makedirs(cache_dir, exist_ok=True)
+    plugin_source = os.path.join(cache_dir, f"{get_format_key(fmt)}.esp")
+    if not os.path.exists(plugin_source):
+        with open(plugin_source + ".tmp", 'wb') as f:
+            f.write(make_dummy_plugin(fmt))
+        os.replace(plugin_source + ".tmp", plugin_source)
+    # Games that order plugins by mtime get a copy of the plugin per pack, dated after
+    # every plugin in the Data folder, so the packs still load last
+    plugin_mtime_ns = _get_newest_plugin_mtime_ns(output_dir) if fmt["mtime_order"] else None
+
+    started = time.monotonic()
+    progress = {"files": 0, "bytes": 0}
+
+    def report(size):
+        progress["files"] += 1
+        progress["bytes"] += size
+        if events is not None and (progress["files"] % 256 == 0 or progress["files"] == total_files):
+            events(ProgressEvent("Packing", progress["files"], total_files, progress["bytes"],
+                                 time.monotonic() - started, "files", total_bytes))
+
+    packs = []
+    written = 0
+    tmp_path = None
+    try:
+        for group, files in plan:
+            plugin, archive = get_pack_names(group, fmt)
+            fingerprint = get_pack_fingerprint(fmt, files, entries)
+            cached = os.path.join(cache_dir, f"{fingerprint}.{fmt['archive']}")
+            archive_size = sum(size for _, size in files)
+            unchanged = os.path.exists(cached)
+            if unchanged:
+                for _, size in files:
+                    report(size)
+            else:
+                tmp_path = cached + ".tmp"
+                archive_files = [(dest_path.replace(os.sep, '\\'), os.path.join(output_dir, dest_path), size)
+                                 for dest_path, size in files]
+                if fmt["archive"] == "ba2":
+                    write_ba2(tmp_path, archive_files, cancel, report)
+                else:
+                    write_bsa(tmp_path, archive_files, fmt["version"], cancel, report)
+                os.replace(tmp_path, cached)
+                tmp_path = None
+                written += 1
+
+            # The archive holds the files now: link it in and drop their loose links
+            _link(cached, os.path.join(output_dir, archive))
+            if plugin_mtime_ns is None:
+                _link(plugin_source, os.path.join(output_dir, plugin))
+            else:
+                plugin_mtime_ns += 1_000_000_000
+                _write_dated_plugin(plugin_source, os.path.join(output_dir, plugin), plugin_mtime_ns)
+            emptied_dirs = set()
+            for dest_path, _ in files:
+                try:
+                    os.remove(os.path.join(output_dir, dest_path))
+                    emptied_dirs.add(os.path.dirname(dest_path))
+                except FileNotFoundError:
+                    pass
+            _remove_empty_dirs(output_dir, emptied_dirs)
+            packs.append({"plugin": plugin, "archive": archive, "fingerprint": fingerprint,
+                          "size": archive_size, "files": [dest_path for dest_path, _ in files]})
+            log(f"  {archive}: {len(files):,} files, {format_size(archive_size)}{' (unchanged)' if unchanged else ''}")
+    except BuildCancelled:
+        log("Packing cancelled, the files of the remaining archives stay loose")
+        log("=" * 70)
+        raise
+    except (OSError, ValueError) as e:
+        log(f"WARNING: Packing stopped: {e}")
+        log("The files of the remaining archives stay loose")
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        write_pack_manifest(output_dir, {"format": get_format_key(fmt), "packs": packs})
+        prune_pack_cache(output_dir)
+
+    packed = sum(len(pack["files"]) for pack in packs)
+    log(f"Packed:      {packed:,} files into {len(packs)} archives "
+        f"({written} written, {len(packs) - written} unchanged) in {time.monotonic() - started:.1f} s")
+    log(f"Loose files: {len(entries) - packed:,}")
+    log("=" * 70)
+    return [fmt["active"] + pack["plugin"] for pack in packs]
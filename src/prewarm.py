@@ -0,0 +1,184 @@
+"""
+Read the Data folder into the page cache before the game starts.
+
+On an SD card every mesh and texture the game opens on a cold start costs a
+random read. Prewarming asks the kernel to read the files ahead of time
+(posix_fadvise WILLNEED, which queues the reads and returns), so the game finds
+them in memory. Plugins and archives come first since every load needs them,
+then loose files from the smallest up (small files suffer the most from
+latency), until the byte budget is used. The budget is also capped at half of
+the available memory: prewarming more only evicts what was just read.
+
+The file list comes from the build snapshot, so nothing is walked. With wait=True
+the files are read instead, which takes longer but reports when they are cached.
+
+No Qt in here: the GUI runs this in utils.PrewarmWorker, mo2manager from the launch hook.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from build_data_folder import make_logger, format_size, get_index_paths, load_pack_manifest
+
+
+DEFAULT_BUDGET_MB = 2048
+PREWARM_WORKERS = 4
+READ_CHUNK_SIZE = 1024 * 1024
+
+PLUGIN_EXTENSIONS = {".esm", ".esp", ".esl"}
+# Bethesda archives, and Oblivion Remastered's Unreal packages
+ARCHIVE_EXTENSIONS = {".bsa", ".ba2", ".pak", ".utoc", ".ucas"}
+
+
+def get_budget(game_data=None):
+    """The prewarm budget in bytes from the game's "prewarm_budget_mb" setting."""
+    budget_mb = (game_data or {}).get("prewarm_budget_mb") or DEFAULT_BUDGET_MB
+    return int(budget_mb) * 1024 * 1024
+
+
+def get_available_memory():
+    """MemAvailable from /proc/meminfo in bytes, or None where it can't be read."""
+    try:
+        with open("/proc/meminfo", 'r') as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _list_data_files(data_path):
+    """(relative path, size) of every file in the Data folder: from the build snapshot (and packs), else walked."""
+    files = []
+    _, index_path = get_index_paths(data_path)
+    try:
+        # Files packed into archives are read through the archives and their plugins
+        packed = set()
+        for pack in (load_pack_manifest(data_path) or {}).get("packs", []):
+            packed.update(pack["files"])
+            files.append((pack["archive"], pack["size"]))
+            files.append((pack["plugin"], 0))
+        # Only the path and size columns are needed, so the rows are not fully parsed
+        with open(index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.startswith('#'):
+                    parts = line.split('\t', 4)
+                    if parts[0] not in packed:
+                        files.append((parts[0], int(parts[3])))
+        return files
+    except (OSError, ValueError, IndexError):
+        files = []
+
+    stack = [data_path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            files.append((os.path.relpath(entry.path, data_path), entry.stat().st_size))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return files
+
+
+def plan_prewarm(files, budget):
+    """
+    Order files ((relative path, size)) for prewarming and cut the list at budget bytes:
+    plugins, then archives, then loose files, each from the smallest up.
+    A file that doesn't fit is skipped and smaller ones after it can still be taken.
+    """
+    def rank(item):
+        extension = os.path.splitext(item[0])[1].lower()
+        group = 0 if extension in PLUGIN_EXTENSIONS else 1 if extension in ARCHIVE_EXTENSIONS else 2
+        return group, item[1]
+
+    planned = []
+    total = 0
+    for rel_path, size in sorted(files, key=rank):
+        if total + size <= budget:
+            planned.append((rel_path, size))
+            total += size
+    return planned
+
+
+def _advise(path, size):
+    """Ask the kernel to read the whole file into the page cache; returns the bytes advised."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+    return size
+
+
+def _read(path, size):
+    """Read the whole file (the data lands in the page cache); returns the bytes read."""
+    done = 0
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            done += len(chunk)
+    return done
+
+
+def prewarm_data_folder(data_path, budget=None, wait=False, workers=PREWARM_WORKERS, events=None):
+    """
+    Pull the most useful files of the Data folder into the page cache, up to budget
+    bytes (default DEFAULT_BUDGET_MB, capped at half the available memory).
+    Without wait the reads are only queued (posix_fadvise WILLNEED) and this returns
+    quickly; with wait, or where fadvise is not available, the files are read.
+    Returns a dict with "files", "bytes", "seconds" and "failed".
+    """
+    log = make_logger(events)
+    started = time.monotonic()
+    if budget is None:
+        budget = DEFAULT_BUDGET_MB * 1024 * 1024
+    available = get_available_memory()
+    if available is not None and budget > available // 2:
+        budget = available // 2
+
+    log("=" * 70)
+    log("PREWARM DATA FOLDER")
+    log("=" * 70)
+    log(f"Data folder: {data_path}")
+    log(f"Budget:      {format_size(budget)}"
+        + (f" (memory available: {format_size(available)})" if available is not None else ""))
+
+    files = _list_data_files(data_path)
+    planned = plan_prewarm(files, budget)
+    method = _advise if (hasattr(os, "posix_fadvise") and not wait) else _read
+    log(f"Files:       {len(planned)} of {len(files)}, {format_size(sum(size for _, size in planned))}"
+        f" ({'queued with fadvise' if method is _advise else 'read'})")
+
+    def work(item):
+        rel_path, size = item
+        try:
+            return method(os.path.join(data_path, rel_path), size), None
+        except OSError as e:
+            return 0, f"{rel_path}: {e}"
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(work, planned))
+
+    result = {
+        "files": sum(1 for done, error in results if error is None),
+        "bytes": sum(done for done, _ in results),
+        "seconds": time.monotonic() - started,
+        "failed": [error for _, error in results if error is not None],
+    }
+    log(f"Prewarmed:   {result['files']} files, {format_size(result['bytes'])} in {result['seconds']:.1f} s")
+    if result["failed"]:
+        log(f"Failed:      {len(result['failed'])}")
+        for error in result["failed"][:5]:
+            log(f"    {error}")
+    log("=" * 70)
+    return result
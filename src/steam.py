@@ -0,0 +1,156 @@
+"""
+Locate Steam games from Steam's own records instead of walking the libraries.
+
+Steam lists its library folders (internal storage, SD cards, extra drives) in
+steamapps/libraryfolders.vdf, and each installed game in
+<library>/steamapps/appmanifest_<appid>.acf, whose "installdir" is the game's
+folder under <library>/steamapps/common. Resolving an app id is therefore a
+few small file reads per library rather than a walk of every file.
+"""
+
+import os
+import re
+
+
+# Where Steam keeps its root folder (native install, the ~/.steam symlinks and Flatpak)
+STEAM_ROOT_CANDIDATES = [
+    ".local/share/Steam",
+    ".steam/steam",
+    ".steam/root",
+    ".var/app/com.valvesoftware.Steam/.local/share/Steam",
+]
+
+_VDF_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])|//[^\n]*|([^\s{}"]+)')
+_VDF_ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", '"': '"'}
+
+
+def parse_vdf(text):
+    """
+    Parse Valve KeyValues text (libraryfolders.vdf, appmanifest_*.acf) into nested dicts.
+    Keys are lowercased since Steam is not consistent about their case.
+    Malformed input gives whatever was parsed up to that point.
+    """
+    root = {}
+    stack = [root]
+    key = None
+    for match in _VDF_TOKEN.finditer(text):
+        quoted, brace, bare = match.groups()
+        if brace == "{":
+            child = {}
+            if key is not None:
+                stack[-1][key.lower()] = child
+                key = None
+            stack.append(child)
+        elif brace == "}":
+            if len(stack) > 1:
+                stack.pop()
+            key = None
+        elif quoted is not None or bare is not None:
+            token = bare if quoted is None else re.sub(
+                r'\\(.)', lambda m: _VDF_ESCAPES.get(m.group(1), m.group(0)), quoted)
+            if key is None:
+                key = token
+            else:
+                stack[-1][key.lower()] = token
+                key = None
+    return root
+
+
+def _read_vdf(path):
+    """parse_vdf() of a file, or None if it can't be read."""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return parse_vdf(f.read())
+    except OSError:
+        return None
+
+
+def get_steam_roots():
+    """Existing Steam root folders, each listed once however many symlinks point to it."""
+    home = os.path.expanduser("~")
+    roots = []
+    seen = set()
+    for candidate in STEAM_ROOT_CANDIDATES:
+        path = os.path.join(home, candidate)
+        real = os.path.realpath(path)
+        if real not in seen and os.path.isdir(os.path.join(real, "steamapps")):
+            seen.add(real)
+            roots.append(real)
+    return roots
+
+
+def get_library_folders():
+    """
+    Every Steam library folder (the folders containing steamapps), from each Steam
+    root's libraryfolders.vdf. Libraries on unmounted SD cards are left out.
+    """
+    libraries = []
+    seen = set()
+
+    def add(path):
+        real = os.path.realpath(path)
+        if real not in seen and os.path.isdir(os.path.join(real, "steamapps")):
+            seen.add(real)
+            libraries.append(real)
+
+    for root in get_steam_roots():
+        add(root)
+        data = _read_vdf(os.path.join(root, "steamapps", "libraryfolders.vdf")) or {}
+        folders = data.get("libraryfolders") or {}
+        for key, value in folders.items():
+            if not key.isdigit():
+                continue
+            # Current format: "0" { "path" "..." "apps" {...} }, old format: "1" "/path"
+            path = value.get("path") if isinstance(value, dict) else value
+            if path:
+                add(path)
+    return libraries
+
+
+def read_app_manifest(library, app_id):
+    """The AppState section of <library>/steamapps/appmanifest_<app_id>.acf, or None."""
+    data = _read_vdf(os.path.join(library, "steamapps", f"appmanifest_{app_id}.acf"))
+    if not data:
+        return None
+    return data.get("appstate")
+
+
+def find_app_install(app_id, libraries=None):
+    """
+    The install folder of a Steam app (<library>/steamapps/common/<installdir>),
+    or None if no library has a manifest for it or its folder is gone.
+    """
+    if libraries is None:
+        libraries = get_library_folders()
+    for library in libraries:
+        manifest = read_app_manifest(library, app_id)
+        if not manifest or not manifest.get("installdir"):
+            continue
+        install_dir = os.path.join(library, "steamapps", "common", manifest["installdir"])
+        if os.path.isdir(install_dir):
+            return install_dir
+    return None
+
+
+def find_app_for_folder(folder):
+    """
+    The app id of a Steam game install folder (<library>/steamapps/common/<installdir>),
+    from the manifests of that one library. Returns None for anything else.
+    """
+    folder = os.path.realpath(folder)
+    common = os.path.dirname(folder)
+    steamapps = os.path.dirname(common)
+    if os.path.basename(common).lower() != "common" or os.path.basename(steamapps).lower() != "steamapps":
+        return None
+    installdir = os.path.basename(folder)
+    try:
+        names = os.listdir(steamapps)
+    except OSError:
+        return None
+    for name in names:
+        if not (name.startswith("appmanifest_") and name.endswith(".acf")):
+            continue
+        manifest = (_read_vdf(os.path.join(steamapps, name)) or {}).get("appstate") or {}
+        if manifest.get("installdir", "").lower() == installdir.lower():
+            return manifest.get("appid") or name[len("appmanifest_"):-len(".acf")]
+    return None
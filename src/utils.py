@@ -1,367 +1,18 @@
 """
-Business logic, utility functions, and worker threads for the MO2 Manager GUI.
+Worker threads for the MO2 Manager GUI.
+The Qt-free logic they run lives in core.py.
 """
 
 import os
-import sys
-import json
 import shutil
 import subprocess
-import ssl
-import certifi
-import urllib.request
-import tempfile
-import zipfile
-from pathlib import Path
+import threading
+import time
 
 from PyQt6.QtCore import QThread, pyqtSignal
 
-import build_json
-
-
-def get_clean_env():
-    """Get a clean environment for launching external processes like Proton.
-
-    When running inside an AppImage, environment variables like LD_LIBRARY_PATH
-    and QT_PLUGIN_PATH are modified to point to the AppImage's internal libraries.
-    These can interfere with external applications like Proton/Wine.
-    """
-    env = os.environ.copy()
-
-    # Check if running inside an AppImage
-    if 'APPIMAGE' in env or 'APPDIR' in env:
-        # Remove or clean AppImage-specific paths from library paths
-        appdir = env.get('APPDIR', '')
-
-        # Clean LD_LIBRARY_PATH
-        if 'LD_LIBRARY_PATH' in env:
-            paths = env['LD_LIBRARY_PATH'].split(':')
-            cleaned = [p for p in paths if appdir not in p and '/tmp/.mount_' not in p]
-            if cleaned:
-                env['LD_LIBRARY_PATH'] = ':'.join(cleaned)
-            else:
-                del env['LD_LIBRARY_PATH']
-
-        # Clean QT_PLUGIN_PATH
-        if 'QT_PLUGIN_PATH' in env:
-            paths = env['QT_PLUGIN_PATH'].split(':')
-            cleaned = [p for p in paths if appdir not in p and '/tmp/.mount_' not in p]
-            if cleaned:
-                env['QT_PLUGIN_PATH'] = ':'.join(cleaned)
-            else:
-                del env['QT_PLUGIN_PATH']
-
-        # Clean PATH
-        if 'PATH' in env:
-            paths = env['PATH'].split(':')
-            cleaned = [p for p in paths if appdir not in p and '/tmp/.mount_' not in p]
-            env['PATH'] = ':'.join(cleaned) if cleaned else '/usr/bin:/bin'
-
-        # Remove AppImage-specific variables
-        for var in ['APPDIR', 'APPIMAGE', 'ARGV0', 'OWD']:
-            env.pop(var, None)
-
-    return env
-
-
-def get_app_path():
-    """Get the application base path, handling both frozen (PyInstaller) and normal execution."""
-    if getattr(sys, 'frozen', False):
-        # Running as bundled app (PyInstaller)
-        return sys._MEIPASS
-    else:
-        # Running as script
-        return os.path.dirname(os.path.abspath(__file__))
-
-
-def get_prefix_from_plugins_path(plugins_path):
-    """Extract the Wine prefix path from a full plugins_path.
-
-    For example, given:
-      /home/deck/.local/share/Steam/steamapps/compatdata/377160/pfx/drive_c/users/steamuser/AppData/Local/Fallout4
-    Returns:
-      /home/deck/.local/share/Steam/steamapps/compatdata/377160
-    """
-    pfx_index = plugins_path.find("/pfx/")
-    if pfx_index != -1:
-        return plugins_path[:pfx_index]
-    return plugins_path
-
-
-def get_config_path():
-    """Get the config file path - uses user's home directory for writability."""
-    user_config_dir = os.path.join(os.path.expanduser("~"), ".config", "mo2manager")
-    user_config = os.path.join(user_config_dir, "game_paths.json")
-
-    # If user config exists, use it
-    if os.path.exists(user_config):
-        return user_config
-
-    # Generate default config
-    try:
-        os.makedirs(user_config_dir, exist_ok=True)
-        with open(user_config, 'w', encoding='utf-8') as f:
-            json.dump(build_json.get_default_game_paths(), f, indent=4)
-        return user_config
-    except (OSError, IOError):
-        return user_config
-
-
-def load_game_paths():
-    """Load game paths from the JSON config file."""
-    config_path = get_config_path()
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                games = data.get("games", [])
-                _migrate_game_fields(games)
-                return games
-        except (json.JSONDecodeError, IOError):
-            pass
-    return []
-
-
-def _migrate_game_fields(games):
-    """Backfill new fields (game_root, data_subpath, launcher_location) from defaults."""
-    defaults = build_json.get_default_game_paths()
-    defaults_by_name = {g["name"]: g for g in defaults["games"]}
-    for game in games:
-        name = game.get("name", "")
-        default = defaults_by_name.get(name, {})
-        # Migrate launcer_location typo -> launcher_location
-        if "launcer_location" in game and "launcher_location" not in game:
-            game["launcher_location"] = game.pop("launcer_location")
-        elif "launcer_location" in game:
-            del game["launcer_location"]
-        # Backfill missing fields from defaults
-        for field in ("game_root", "data_subpath", "launcher_location",
-                       "mge_xe_download", "code_patch_download",
-                       "mo2_download_url", "plugins_path",
-                       "default_plugins_path"):
-            if field not in game and field in default:
-                game[field] = default[field]
-        # Migrate Oblivion Remastered data_subpath and data_path to Content folder
-        if name == "Oblivion Remastered":
-            old_subpath = "OblivionRemastered/Content/Dev/ObvData"
-            new_subpath = default.get("data_subpath", "OblivionRemastered/Content")
-            if game.get("data_subpath") == old_subpath:
-                game["data_subpath"] = new_subpath
-                game_root = game.get("game_root", "")
-                if game_root:
-                    game["data_path"] = os.path.join(game_root, new_subpath)
-        # If game_root was customized but data_path still points to the default,
-        # rebuild data_path from game_root + data_subpath
-        game_root = game.get("game_root", "")
-        default_game_root = default.get("game_root", "")
-        default_data_path = default.get("data_path", "")
-        if (game_root and default_game_root and game_root != default_game_root
-                and game.get("data_path") == default_data_path):
-            data_subpath = game.get("data_subpath", "Data")
-            game["data_path"] = os.path.join(game_root, data_subpath)
-
-
-def save_game_paths(game_paths):
-    """Save game paths list back to the JSON config file."""
-    config_path = get_config_path()
-    try:
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump({"games": game_paths}, f, indent=4)
-    except (OSError, IOError):
-        pass
-
-
-def find_game_installs(game_paths):
-    """
-    Search for installed games by scanning for their launcher_name executable
-    across Steam common folders (internal + SD cards).
-    Returns a dict mapping game name to the game folder path found.
-    """
-    scan_roots = []
-    home = os.path.expanduser("~")
-
-    # Internal storage: Steam default library
-    steam_common = os.path.join(home, ".local/share/Steam/steamapps/common")
-    if os.path.isdir(steam_common):
-        scan_roots.append(steam_common)
-
-    # SD cards and other mounted media
-    media_dir = os.path.join("/run/media", os.path.basename(home))
-    if os.path.isdir(media_dir):
-        for entry in os.listdir(media_dir):
-            media_path = os.path.join(media_dir, entry)
-            if os.path.isdir(media_path):
-                scan_roots.append(media_path)
-
-    return _scan_for_launchers(game_paths, scan_roots)
-
-
-def _scan_for_launchers(game_paths, scan_roots):
-    """
-    Scan the given root directories for launcher_name executables.
-    Returns a dict mapping game name to the game folder path found.
-    """
-    # Build a lookup: lowercase launcher_name -> list of game dicts
-    launcher_lookup = {}
-    for game in game_paths:
-        launcher = game.get("launcher_name", "")
-        if launcher:
-            launcher_lookup.setdefault(launcher.lower(), []).append(game)
-
-    if not launcher_lookup:
-        return {}
-
-    skip_dirs = {'node_modules', '__pycache__', '.git', '.cache', 'Trash',
-                 '.build_venv', '.venv', 'venv'}
-    found = {}  # game name -> game folder path
-
-    for scan_root in scan_roots:
-        for root, dirs, files in os.walk(scan_root):
-            # Skip irrelevant directories to keep scanning fast
-            dirs[:] = [d for d in dirs if d not in skip_dirs]
-
-            for filename in files:
-                lower_name = filename.lower()
-                if lower_name in launcher_lookup:
-                    game_folder = root  # folder containing the launcher
-                    for game in launcher_lookup[lower_name]:
-                        game_name = game.get("name", "")
-                        if game_name not in found:
-                            # When multiple games share a launcher, use
-                            # launcher_location to disambiguate so that
-                            # e.g. Fallout 4 and Fallout London each map
-                            # to their own folder.
-                            expected = game.get("launcher_location", "")
-                            if expected and os.path.isdir(expected):
-                                if os.path.normpath(game_folder) != os.path.normpath(expected):
-                                    continue
-                            found[game_name] = game_folder
-        # Stop early if all games found
-        if len(found) >= len(game_paths):
-            break
-
-    return found
-
-
-def scan_for_mo2_instances():
-    """
-    Scan ~/.local, /run/media/deck/, and game directories for ModOrganizer.exe instances.
-    Returns a list of tuples: (display_name, folder_path)
-    """
-    instances = []
-    seen_paths = set()
-    home = os.path.expanduser("~")
-
-    # Collect scan roots: Steam common, SD cards, plus configured game directories
-    scan_roots = []
-
-    # Internal storage: Steam default library
-    steam_common = os.path.join(home, ".local/share/Steam/steamapps/common")
-    if os.path.isdir(steam_common):
-        scan_roots.append(steam_common)
-
-    # SD cards and other mounted media
-    media_dir = os.path.join("/run/media", os.path.basename(home))
-    if os.path.isdir(media_dir):
-        for entry in os.listdir(media_dir):
-            media_path = os.path.join(media_dir, entry)
-            if os.path.isdir(media_path):
-                scan_roots.append(media_path)
-
-    # Also scan configured game directories as a fallback
-    game_paths = load_game_paths()
-    for game in game_paths:
-        game_folder = game.get("game_root") or (os.path.dirname(game.get("data_path", "")) if game.get("data_path") else "")
-        if game_folder and os.path.isdir(game_folder):
-            scan_roots.append(game_folder)
-
-    skip_dirs = {'node_modules', '__pycache__', '.git', '.cache', 'Trash',
-                 '.build_venv', '.venv', 'venv'}
-
-    for scan_root in scan_roots:
-        for root, dirs, files in os.walk(scan_root):
-            # Skip irrelevant directories to keep scanning fast
-            dirs[:] = [d for d in dirs if d not in skip_dirs]
-
-            for filename in files:
-                if filename.lower() == "modorganizer.exe":
-                    mo2_folder = root
-                    if mo2_folder in seen_paths:
-                        continue
-                    seen_paths.add(mo2_folder)
-                    # Use the grandparent folder as the display name (the game folder)
-                    display_name = os.path.basename(os.path.dirname(mo2_folder))
-                    instances.append((display_name, mo2_folder))
-
-    # Sort by path for consistent ordering
-    instances.sort(key=lambda x: x[1])
-    return instances
-
-
-def detect_proton_path(prefix_path):
-    """Detect the Proton binary path from a game's prefix_path.
-
-    Args:
-        prefix_path: Path to the Wine prefix like
-            .../compatdata/489830/pfx/drive_c/users/steamuser/AppData/Local
-
-    Returns:
-        tuple: (proton_path, compat_data_path) on success
-
-    Raises:
-        ValueError: with descriptive message if detection fails
-    """
-    if not prefix_path:
-        raise ValueError("No prefix path configured for this game.")
-
-    pfx_index = prefix_path.find("/pfx/")
-    if pfx_index == -1:
-        raise ValueError("Could not determine Wine prefix from prefix path.")
-
-    compat_data_path = prefix_path[:pfx_index]
-
-    if not os.path.isdir(compat_data_path):
-        raise ValueError(f"Compatdata folder not found:\n{compat_data_path}")
-
-    # Detect which Proton version was used by reading config_info
-    config_info_path = os.path.join(compat_data_path, "config_info")
-    proton_path = None
-
-    if os.path.isfile(config_info_path):
-        try:
-            with open(config_info_path, 'r') as f:
-                lines = f.readlines()
-            if len(lines) >= 2:
-                font_path = lines[1].strip()
-                files_index = font_path.find("/files/")
-                if files_index != -1:
-                    proton_dir = font_path[:files_index]
-                    candidate = os.path.join(proton_dir, "proton")
-                    if os.path.isfile(candidate):
-                        proton_path = candidate
-        except Exception:
-            pass
-
-    if not proton_path:
-        raise ValueError(
-            f"Could not detect Proton version.\n\n"
-            f"The config_info file was not found or could not be parsed at:\n"
-            f"{config_info_path}\n\n"
-            "Make sure the game has been launched at least once via Steam."
-        )
-
-    return proton_path, compat_data_path
-
-
-def get_se_manifest_path(game_data):
-    """Get the path to the script extender install manifest for a game."""
-    if not game_data:
-        return None
-    game_name = game_data.get("name", "").replace(" ", "_").lower()
-    if not game_name:
-        return None
-    config_dir = os.path.join(os.path.expanduser("~"), ".config", "mo2manager")
-    return os.path.join(config_dir, f"se_installed_{game_name}.json")
+from build_data_folder import open_build_log
+from core import get_clean_env, scan_for_mo2_instances, detect_proton_path
 
 
 class DownloadWorker(QThread):
@@ -379,6 +30,12 @@ class DownloadWorker(QThread):
         self.local_archive = local_archive
 
     def run(self):
+        # Only needed for downloads, imported here to keep them out of startup
+        import ssl
+        import tempfile
+        import urllib.request
+        import certifi
+
         try:
             # Create destination folder
             os.makedirs(self.destination_folder, exist_ok=True)
@@ -520,6 +177,11 @@ style=1809 Dark Mode.qss
 
     def install_vcredist(self):
         """Download and install Visual C++ Redistributable into the game's Wine prefix."""
+        import ssl
+        import tempfile
+        import urllib.request
+        import certifi
+
         prefix_path = self.game_data.get("prefix_path", "")
         if not prefix_path:
             self.output_signal.emit("Skipping vcredist: no prefix path configured.")
@@ -575,190 +237,553 @@ style=1809 Dark Mode.qss
                 os.remove(vcredist_file)
 
 
+class LogBatcher:
+    """
+    Collects log lines from a worker thread and emits them as one block per interval,
+    so the GUI appends and repaints once per batch instead of once per line.
+    Lines still waiting after the interval are flushed by a timer, so the last lines
+    before a long silent phase show up. Every line is also streamed to log_file, if given.
+    """
+
+    def __init__(self, signal, log_file=None, interval=0.05):
+        self.signal = signal
+        self.log_file = log_file
+        self.interval = interval
+        self.pending = []
+        self.last_flush = time.monotonic()
+        # The workers run without an event loop (no QTimer), so a plain timer thread
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, text):
+        with self._lock:
+            self.pending.append(text)
+            if self.log_file:
+                self.log_file.write(text + "\n")
+        self.poll()
+        with self._lock:
+            if self.pending and self._timer is None:
+                self._timer = threading.Timer(self.interval, self._timer_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def poll(self):
+        """Flush if the interval has passed since the last batch."""
+        if self.pending and time.monotonic() - self.last_flush >= self.interval:
+            self.flush()
+
+    def _timer_flush(self):
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self.pending:
+                self.signal.emit("\n".join(self.pending))
+                self.pending = []
+            if self.log_file:
+                self.log_file.flush()
+            self.last_flush = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self.flush()
+        with self._lock:
+            if self.log_file:
+                self.log_file.close()
+                self.log_file = None
+
+
 class BuildWorker(QThread):
-    """Worker thread to run the build process without blocking the GUI."""
-    output_signal = pyqtSignal(str)
+    """
+    Runs the build in a child process (build_data_folder.build_process_main) so the
+    engine never competes with the GUI for the GIL, and relays its events as signals.
+    A crash of the child is reported with its exit code instead of taking the app down.
+    """
+    output_signal = pyqtSignal(str)  # a batch of log lines
+    progress_signal = pyqtSignal(object)  # build_data_folder.ProgressEvent
     finished_signal = pyqtSignal(bool, str)
 
-    def __init__(self, modlist, mods_folder, output_dir, overwrite_folder=None, plugins_dest=None, game_data=None):
+    # Minimum seconds between progress updates sent to the GUI
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, modlist, mods_folder, output_dir, overwrite_folder=None, plugins_dest=None, game_data=None,
+                 resume=False, profile_trees=False):
         super().__init__()
+        import multiprocessing
+
         self.modlist = modlist
         self.mods_folder = mods_folder
         self.output_dir = output_dir
         self.overwrite_folder = overwrite_folder
         self.plugins_dest = plugins_dest
         self.game_data = game_data
+        self.resume = resume
+        self.profile_trees = profile_trees
+        # spawn, not fork: forking a process with Qt threads running is not safe
+        self.mp_context = multiprocessing.get_context("spawn")
+        self.cancel_event = self.mp_context.Event()
+        self._last_progress = (None, 0.0)
+        self._log = None
+
+    def _on_event(self, event):
+        """
+        Handle an event from the build process. Log lines are batched, progress is
+        forwarded at most every PROGRESS_INTERVAL (plus phase changes and ends).
+        """
+        import build_data_folder
+
+        if isinstance(event, build_data_folder.LogEvent):
+            self._log.add(event.text)
+        elif isinstance(event, build_data_folder.ProgressEvent):
+            self._log.poll()
+            phase, last_time = self._last_progress
+            now = time.monotonic()
+            if event.phase != phase or event.done >= event.total or now - last_time >= self.PROGRESS_INTERVAL:
+                self._last_progress = (event.phase, now)
+                self.progress_signal.emit(event)
+
+    def log(self, text=""):
+        """Add a line to the build log."""
+        self._log.add(text)
+
+    def _finish(self, success, message):
+        """Send the remaining log lines, close the log file and report the result."""
+        self._log.close()
+        self.finished_signal.emit(success, message)
+
+    def cancel(self):
+        """Ask the build to stop; it rolls back to the previous Data folder."""
+        self.cancel_event.set()
 
     def run(self):
-        import io
-        import contextlib
-
-        # Capture stdout to emit as signals
-        class OutputCapture(io.StringIO):
-            def __init__(self, signal):
-                super().__init__()
-                self.signal = signal
-                self.line_buffer = ""
-
-            def write(self, text):
-                self.line_buffer += text
-                while '\n' in self.line_buffer:
-                    line, self.line_buffer = self.line_buffer.split('\n', 1)
-                    if line:
-                        self.signal.emit(line)
-                return len(text)
-
-            def flush(self):
-                if self.line_buffer:
-                    self.signal.emit(self.line_buffer)
-                    self.line_buffer = ""
+        import build_data_folder
+
+        log_path, log_file = open_build_log()
+        self._log = LogBatcher(self.output_signal, log_file)
+        if log_path:
+            self.log(f"Full log: {log_path}")
+            self.log()
+
+        kwargs = {
+            "modlist_path": self.modlist,
+            "mods_folder": self.mods_folder,
+            "output_dir": self.output_dir,
+            "overwrite_folder": self.overwrite_folder,
+            "plugins_dest": self.plugins_dest,
+            "game_data": self.game_data,
+            "resume": self.resume,
+            "profile_trees": self.profile_trees,
+        }
+        receiver, sender = self.mp_context.Pipe(duplex=False)
+        try:
+            process = self.mp_context.Process(
+                target=build_data_folder.build_process_main,
+                args=(sender, self.cancel_event, kwargs),
+                daemon=True
+            )
+            process.start()
+        except Exception as e:
+            self.log(f"ERROR: Could not start the build process: {e}")
+            self._finish(False, f"Build failed: {str(e)}")
+            return
+        finally:
+            sender.close()
+
+        # Relay events until the child sends its result or the pipe closes
+        done = None
+        while done is None:
+            if receiver.poll(0.05):
+                try:
+                    event = receiver.recv()
+                except EOFError:
+                    break
+                if isinstance(event, build_data_folder.DoneEvent):
+                    done = event
+                else:
+                    self._on_event(event)
+            else:
+                self._log.poll()
+                if not process.is_alive() and not receiver.poll():
+                    break
+        receiver.close()
+        process.join()
+
+        if done is not None:
+            self._finish(done.success, done.message)
+            return
 
+        # The child died without reporting back (crash, killed, out of memory)
+        self.log()
+        self.log("=" * 70)
+        self.log(f"BUILD PROCESS CRASHED (exit code {process.exitcode})")
+        self.log("=" * 70)
         try:
-            # Import build_data_folder module
-            import build_data_folder
+            if build_data_folder.rollback_data_folder(self.output_dir):
+                self.log("The previous Data folder was restored.")
+        except OSError as e:
+            self.log(f"Could not restore the previous Data folder: {e}")
+        self._finish(False, f"The build process crashed (exit code {process.exitcode}).\n"
+                            f"See the log for details.")
+
+
+class DataFolderWorker(QThread):
+    """
+    Worker thread that creates or restores the DataFolder mod (see datafolder.py),
+    which can be a multi-GB copy when the instance and the game are on different devices.
+    finished_signal carries (success, result, message): result is the moved item count
+    for "create" and (moved_count, launcher_restored) for "restore".
+    """
+    output_signal = pyqtSignal(str)  # a batch of log lines
+    progress_signal = pyqtSignal(object)  # build_data_folder.ProgressEvent
+    finished_signal = pyqtSignal(bool, object, str)
 
-            # Capture output
-            output_capture = OutputCapture(self.output_signal)
+    def __init__(self, mode, data_path, datafolder_path, modlist_path, game_data=None):
+        super().__init__()
+        self.mode = mode  # "create" or "restore"
+        self.data_path = data_path
+        self.datafolder_path = datafolder_path
+        self.modlist_path = modlist_path
+        self.game_data = game_data
+        self.cancel_event = threading.Event()
+        self._last_progress = 0.0
 
-            with contextlib.redirect_stdout(output_capture):
-                # Run the build process
-                build_data_folder.build_data_folder(
-                    self.modlist,
-                    self.mods_folder,
-                    self.output_dir,
-                    self.overwrite_folder
+    def cancel(self):
+        """Stop the move; the source folder is left intact."""
+        self.cancel_event.set()
+
+    def run(self):
+        import build_data_folder
+        import datafolder
+
+        log = LogBatcher(self.output_signal)
+
+        def on_event(event):
+            if isinstance(event, build_data_folder.LogEvent):
+                log.add(event.text)
+            elif isinstance(event, build_data_folder.ProgressEvent):
+                log.poll()
+                now = time.monotonic()
+                if event.done >= event.total or now - self._last_progress >= BuildWorker.PROGRESS_INTERVAL:
+                    self._last_progress = now
+                    self.progress_signal.emit(event)
+
+        try:
+            if self.mode == "create":
+                result = datafolder.create_datafolder_mod(
+                    self.data_path, self.datafolder_path, self.modlist_path,
+                    cancel=self.cancel_event, events=on_event
+                )
+            else:
+                result = datafolder.restore_datafolder(
+                    self.data_path, self.datafolder_path, self.modlist_path,
+                    game_data=self.game_data, cancel=self.cancel_event, events=on_event
                 )
+            log.close()
+            self.finished_signal.emit(True, result, "")
+
+        except Exception as e:
+            if isinstance(e, datafolder.MoveCancelled):
+                if self.mode == 'restore':
+                    message = f"Cancelled. {self.data_path} and {self.datafolder_path} were not changed."
+                else:
+                    message = f"Cancelled. {self.data_path} was not changed."
+            else:
+                import traceback
+                log.add(f"ERROR: {str(e)}")
+                log.add(traceback.format_exc())
+                message = str(e)
+            log.add(message)
+            log.close()
+            self.finished_signal.emit(False, None, message)
+
 
-                # Handle ShaderCache if overwrite folder exists
-                if self.overwrite_folder:
-                    print()
-                    print("=" * 70)
-                    print("SHADERCACHE COPY")
-                    print("=" * 70)
-                    if build_data_folder.copy_shadercache_to_data(self.overwrite_folder, self.output_dir):
-                        print("ShaderCache copied successfully!")
-                    else:
-                        print("No ShaderCache to copy")
-                    print("=" * 70)
-
-                # Handle plugins.txt symlinking
-                if self.plugins_dest:
-                    modlist_dir = os.path.dirname(self.modlist)
-                    plugins_source = os.path.join(modlist_dir, 'plugins.txt')
-
-                    if os.path.exists(plugins_source):
-                        # Some games (e.g. Oblivion Remastered) have plugins.txt
-                        # inside the game folder rather than a wine prefix. Detect
-                        # this so we can log appropriately.
-                        plugins_in_game_folder = "/pfx/" not in self.plugins_dest
-
-                        print()
-                        print("=" * 70)
-                        print("PLUGINS.TXT SYMLINK")
-                        print("=" * 70)
-                        print(f"Source:      {plugins_source}")
-                        print(f"Destination: {os.path.join(self.plugins_dest, 'plugins.txt')}")
-
-                        # Create destination directory if needed
-                        if not os.path.exists(self.plugins_dest):
-                            os.makedirs(self.plugins_dest)
-                            print(f"Created directory: {self.plugins_dest}")
-
-                        plugins_dest_file = os.path.join(self.plugins_dest, 'plugins.txt')
-
-                        # Remove existing plugins.txt (regular file or symlink)
-                        if os.path.exists(plugins_dest_file) or os.path.islink(plugins_dest_file):
-                            if plugins_in_game_folder:
-                                print(f"Removing existing plugins.txt (inside data folder)...")
-                            os.remove(plugins_dest_file)
-
-                        # Create symlink
-                        os.symlink(plugins_source, plugins_dest_file)
-                        print("Symlink created successfully!")
-                        print("=" * 70)
-
-                # Handle script extender launcher swap
-                # Skip for games where launcher is in a different dir than game_root
-                # (e.g. UE5 games like Oblivion Remastered) — swap breaks them
-                if self.game_data and self.game_data.get("launcher_location", "") == self.game_data.get("game_root", ""):
-                    launcher_name = self.game_data.get("launcher_name")
-                    script_extender_name = self.game_data.get("script_extender_name")
-
-                    if launcher_name and script_extender_name:
-                        # Get the launcher directory
-                        game_folder = self.game_data.get("launcher_location") or self.game_data.get("game_root") or os.path.dirname(self.output_dir)
-                        launcher_path = os.path.join(game_folder, launcher_name)
-                        script_extender_path = os.path.join(game_folder, script_extender_name)
-                        backup_path = os.path.join(game_folder, launcher_name.replace(".exe", ".bak"))
-
-                        if os.path.exists(script_extender_path):
-                            print()
-                            print("=" * 70)
-                            print("SCRIPT EXTENDER LAUNCHER SWAP")
-                            print("=" * 70)
-                            print(f"Game folder: {game_folder}")
-                            print(f"Launcher: {launcher_name}")
-                            print(f"Script Extender: {script_extender_name}")
-
-                            # Backup the original launcher if it exists and backup doesn't
-                            if os.path.exists(launcher_path) and not os.path.exists(backup_path):
-                                print(f"Backing up {launcher_name} -> {launcher_name.replace('.exe', '.bak')}")
-                                shutil.copy2(launcher_path, backup_path)
-                            elif os.path.exists(backup_path):
-                                print(f"Backup already exists: {launcher_name.replace('.exe', '.bak')}")
-
-                            # Copy script extender to launcher name (overwrite)
-                            print(f"Copying {script_extender_name} -> {launcher_name}")
-                            shutil.copy2(script_extender_path, launcher_path)
-                            print("Script extender launcher swap completed!")
-                            print("=" * 70)
-                        else:
-                            print()
-                            print("=" * 70)
-                            print("SCRIPT EXTENDER LAUNCHER SWAP - SKIPPED")
-                            print("=" * 70)
-                            print(f"Script extender not found: {script_extender_path}")
-                            print("=" * 70)
-
-            output_capture.flush()
-            self.finished_signal.emit(True, "Build completed successfully!")
+class VerifyWorker(QThread):
+    """Worker thread to verify (and optionally repair) a Data folder against its last build."""
+    output_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(bool, object, str)  # success, results dict (or None), error
+
+    def __init__(self, output_dir, repair=False):
+        super().__init__()
+        self.output_dir = output_dir
+        self.repair = repair
+
+    def run(self):
+        log = LogBatcher(self.output_signal)
+        try:
+            import build_data_folder
+
+            results = build_data_folder.verify_data_folder(
+                self.output_dir, repair=self.repair,
+                events=lambda event: log.add(event.text)
+            )
+            log.close()
+            self.finished_signal.emit(results is not None, results, "")
 
         except Exception as e:
             import traceback
-            self.output_signal.emit(f"ERROR: {str(e)}")
-            self.output_signal.emit(traceback.format_exc())
-            self.finished_signal.emit(False, f"Build failed: {str(e)}")
-
-def get_steam_id(game):
-    steam_id = {
-        "Skyrim Special Edition" : "489830",
-        "Skyrim" :                 "72850",
-        "Fallout 4" :              "377160",
-        "Fallout 3" :              "22300",
-        "Fallout 3 GOTY" :         "22370",
-        "New Vegas" :              "22380",
-        "Oblivion" :               "22330",
-        "Oblivion Remastered" :    "2623190",
-        "Morrowind" :              "22320"
-    }
-    return steam_id[game]
-
-def folon_depot_files():
-    path = "home/deck/.local/share/Steam/ubuntu12_32/steamapps/content/app_377160"
-    path_id = [
-        os.path.join(path,"depot_377161"),
-        os.path.join(path,"depot_377162"),
-        os.path.join(path,"depot_377163"),
-        os.path.join(path,"depot_377164"),
-        os.path.join(path,"depot_393885"),
-        os.path.join(path,"depot_393895"),
-        os.path.join(path,"depot_435870"),
-        os.path.join(path,"depot_435871"),
-        os.path.join(path,"depot_435880"),
-        os.path.join(path,"depot_435881"),
-        os.path.join(path,"depot_435882"),
-        os.path.join(path,"depot_480630"),
-        os.path.join(path,"depot_480631"),
-        os.path.join(path,"depot_490650"),
-    ]
-    return path_id
\ No newline at end of file
+            log.add(f"ERROR: {str(e)}")
+            log.add(traceback.format_exc())
+            log.close()
+            self.finished_signal.emit(False, None, str(e))
+
+
+class ReclaimWorker(QThread):
+    """
+    Worker thread that lists the overridden files no profile uses (from the last
+    build snapshot) and, when given an archive folder or delete=True, moves or deletes them.
+    """
+    output_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(bool, object)  # success, report dict (or None)
+
+    def __init__(self, output_dir, mods=None, archive_dir=None, delete=False):
+        super().__init__()
+        self.output_dir = output_dir
+        self.mods = mods
+        self.archive_dir = archive_dir
+        self.delete = delete
+
+    def run(self):
+        log = LogBatcher(self.output_signal)
+        try:
+            import build_data_folder
+
+            report = build_data_folder.reclaim_overridden_files(
+                self.output_dir, mods=self.mods, archive_dir=self.archive_dir, delete=self.delete,
+                events=lambda event: log.add(event.text)
+            )
+            log.close()
+            self.finished_signal.emit(report is not None, report)
+
+        except Exception as e:
+            import traceback
+            log.add(f"ERROR: {str(e)}")
+            log.add(traceback.format_exc())
+            log.close()
+            self.finished_signal.emit(False, None)
+
+
+class DedupeWorker(QThread):
+    """
+    Worker thread that finds identical files across the mods folders of the known
+    MO2 instances and, with link=True, replaces the copies with hardlinks (see dedupe.py).
+    """
+    output_signal = pyqtSignal(str)  # a batch of log lines
+    progress_signal = pyqtSignal(object)  # build_data_folder.ProgressEvent
+    finished_signal = pyqtSignal(bool, object, str)  # completed, result dict, error
+
+    def __init__(self, mods_folders=None, link=False):
+        super().__init__()
+        self.mods_folders = mods_folders
+        self.link = link
+        self.cancel_event = threading.Event()
+        self._last_progress = 0.0
+
+    def cancel(self):
+        """Stop hashing (or linking); files already linked stay linked."""
+        self.cancel_event.set()
+
+    def run(self):
+        import build_data_folder
+        import dedupe
+
+        log = LogBatcher(self.output_signal)
+
+        def on_event(event):
+            if isinstance(event, build_data_folder.LogEvent):
+                log.add(event.text)
+            elif isinstance(event, build_data_folder.ProgressEvent):
+                log.poll()
+                now = time.monotonic()
+                if event.done >= event.total or now - self._last_progress >= BuildWorker.PROGRESS_INTERVAL:
+                    self._last_progress = now
+                    self.progress_signal.emit(event)
+
+        try:
+            result = dedupe.dedupe_mod_folders(self.mods_folders, link=self.link,
+                                               events=on_event, cancel=self.cancel_event)
+            log.close()
+            self.finished_signal.emit(True, result, "")
+        except dedupe.DedupeCancelled:
+            log.add("Cancelled.")
+            log.close()
+            self.finished_signal.emit(False, None, "")
+        except Exception as e:
+            import traceback
+            log.add(f"ERROR: {str(e)}")
+            log.add(traceback.format_exc())
+            log.close()
+            self.finished_signal.emit(False, None, str(e))
+
+
+class PrewarmWorker(QThread):
+    """Worker thread that reads the Data folder into the page cache (see prewarm.py)."""
+    output_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(object)  # result dict, or None if it failed
+
+    def __init__(self, data_path, budget=None, wait=False):
+        super().__init__()
+        self.data_path = data_path
+        self.budget = budget
+        self.wait_for_reads = wait
+
+    def run(self):
+        log = LogBatcher(self.output_signal)
+        try:
+            import prewarm
+
+            result = prewarm.prewarm_data_folder(self.data_path, budget=self.budget, wait=self.wait_for_reads,
+                                                 events=lambda event: log.add(event.text))
+            log.close()
+            self.finished_signal.emit(result)
+        except Exception as e:
+            log.add(f"Prewarm failed: {e}")
+            log.close()
+            self.finished_signal.emit(None)
+
+
+class InstanceScanWorker(QThread):
+    """
+    Worker thread that walks the Steam libraries and SD cards for MO2 instances,
+    so the window can show the known instances (instances.json) straight away.
+    """
+    found_signal = pyqtSignal(str, str)  # display_name, folder_path
+    finished_signal = pyqtSignal(bool, object, str)  # completed, list of (display_name, folder_path), error
+
+    def __init__(self):
+        super().__init__()
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Stop the walk; the saved instance list is left as it was."""
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            instances = scan_for_mo2_instances(
+                on_found=lambda name, path: self.found_signal.emit(name, path),
+                cancel=self.cancel_event
+            )
+            self.finished_signal.emit(not self.cancel_event.is_set(), instances, "")
+        except Exception as e:
+            self.finished_signal.emit(False, [], str(e))
+
+
+class ModStatsWorker(QThread):
+    """
+    Worker thread computing the per-mod statistics of the mod view: wins and losses
+    from the snapshot of the last build, then file count and size from each mod folder.
+    Folder results are kept in cache (mod path -> (signature, files, size), see
+    build_data_folder.get_folder_signature) so reopening the table only rescans mods
+    in which files were added, removed or replaced; rescan=True rescans every mod.
+    """
+    stats_signal = pyqtSignal(object)  # a batch of (mod_name, stats dict)
+    finished_signal = pyqtSignal(bool, str)  # completed, note about the conflict data
+
+    # Minimum seconds between batches sent to the GUI
+    BATCH_INTERVAL = 0.1
+
+    def __init__(self, mods_folder, mod_names, data_path, cache, rescan=False):
+        super().__init__()
+        self.mods_folder = mods_folder
+        self.mod_names = list(mod_names)
+        self.data_path = data_path
+        self.cache = cache
+        self.rescan = rescan
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        import build_data_folder
+
+        note = ""
+        try:
+            # Conflicts only apply if the last build was made from this instance
+            meta = build_data_folder.load_build_meta(self.data_path) if self.data_path else None
+            conflicts = {}
+            if meta is None:
+                note = "Build the Data folder to see conflict wins and losses."
+            elif os.path.abspath(meta.get("mods_folder", "")) != os.path.abspath(self.mods_folder):
+                note = "The Data folder was last built from another instance, no conflict data."
+            else:
+                conflicts = build_data_folder.get_mod_conflict_stats(self.data_path) or {}
+                note = (f"Conflicts from the build of {meta.get('generated', 'unknown')} "
+                        f"({os.path.basename(os.path.dirname(meta.get('modlist', '')))} profile).")
+            empty = {"linked": 0, "linked_size": 0, "wins": 0, "losses": 0}
+            self.stats_signal.emit([(name, dict(conflicts.get(name, empty))) for name in self.mod_names])
+
+            batch = []
+            last_emit = time.monotonic()
+            for name in self.mod_names:
+                if self.cancel_event.is_set():
+                    break
+                mod_path = os.path.join(self.mods_folder, name)
+                try:
+                    signature = build_data_folder.get_folder_signature(mod_path, cancel=self.cancel_event)
+                except OSError:
+                    batch.append((name, {"files": None, "size": None}))
+                    continue
+                cached = self.cache.get(mod_path)
+                if self.rescan or cached is None or cached[0] != signature:
+                    files, size = build_data_folder.scan_mod_size(mod_path, cancel=self.cancel_event)
+                    cached = self.cache[mod_path] = (signature, files, size)
+                batch.append((name, {"files": cached[1], "size": cached[2]}))
+                if time.monotonic() - last_emit >= self.BATCH_INTERVAL:
+                    self.stats_signal.emit(batch)
+                    batch = []
+                    last_emit = time.monotonic()
+            if batch:
+                self.stats_signal.emit(batch)
+            self.finished_signal.emit(not self.cancel_event.is_set(), note)
+
+        except build_data_folder.BuildCancelled:
+            self.finished_signal.emit(False, note)
+        except Exception as e:
+            self.finished_signal.emit(False, f"Could not read mod statistics: {e}")
+
+
+class IndexSearchWorker(QThread):
+    """
+    Worker thread for the conflict explorer: finds the row offsets of the build
+    index on first use (build_data_folder.BuildIndexReader), then searches it and
+    sends the matching row numbers in batches as they are found.
+    """
+    batch_signal = pyqtSignal(object)  # a list of row numbers
+    finished_signal = pyqtSignal(bool, object, str)  # completed, every match (None: all rows), error
+
+    def __init__(self, reader, text="", mod=None, only_conflicts=False, rows=None):
+        super().__init__()
+        self.reader = reader
+        self.text = text
+        self.mod = mod
+        self.only_conflicts = only_conflicts
+        self.rows = rows
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        import build_data_folder
+
+        try:
+            if self.reader.offsets is None:
+                self.reader.load(cancel=self.cancel_event)
+            if not (self.text or self.mod or self.only_conflicts):
+                self.finished_signal.emit(True, None, "")
+                return
+            reader = self.reader.copy()
+            found = reader.search(self.text, self.mod, self.only_conflicts, rows=self.rows,
+                                  cancel=self.cancel_event, on_batch=self.batch_signal.emit)
+            reader.close()
+            self.finished_signal.emit(True, found, "")
+        except build_data_folder.BuildCancelled:
+            self.finished_signal.emit(False, None, "")
+        except OSError as e:
+            self.finished_signal.emit(False, None, f"Could not read the build snapshot: {e}")
@@ -0,0 +1,438 @@
+"""
+Item models and dialogs for browsing an MO2 instance in the GUI.
+The statistics behind them are computed by worker threads (see utils.py), the
+models only hold the results, so large instances never block the window.
+"""
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QTableView, QHeaderView, QAbstractItemView, QComboBox, QCheckBox,
+    QTableWidget, QTableWidgetItem
+)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QTimer
+from PyQt6.QtGui import QColor
+
+import utils
+from build_data_folder import format_size, BuildIndexReader, load_build_meta, get_provider_mod
+
+
+class ModStatsModel(QAbstractTableModel):
+    """
+    One row per mod of an instance: priority, enabled state, file count, size and
+    the conflicts it wins and loses. Rows are listed straight from modlist.txt;
+    the numbers arrive later through update_stats() and show as "..." until then.
+    """
+
+    COLUMNS = ["#", "Mod", "Enabled", "Files", "Size", "Linked", "Wins", "Losses"]
+    SORT_ROLE = Qt.ItemDataRole.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []  # dicts: priority, name, enabled, files, size, linked, linked_size, wins, losses
+        self._row_of = {}  # mod name -> row
+
+    def set_mods(self, mods):
+        """Replace the rows with (mod_name, enabled) in priority order (highest first)."""
+        self.beginResetModel()
+        self._rows = [{"priority": i + 1, "name": name, "enabled": enabled, "files": None, "size": None,
+                       "linked": None, "linked_size": None, "wins": None, "losses": None}
+                      for i, (name, enabled) in enumerate(mods)]
+        self._row_of = {row["name"]: i for i, row in enumerate(self._rows)}
+        self.endResetModel()
+
+    def mod_names(self):
+        return [row["name"] for row in self._rows]
+
+    def update_stats(self, batch):
+        """Merge a batch of (mod_name, stats dict) from ModStatsWorker into the rows."""
+        changed = []
+        for name, stats in batch:
+            row = self._row_of.get(name)
+            if row is not None:
+                self._rows[row].update(stats)
+                changed.append(row)
+        if changed:
+            self.dataChanged.emit(self.index(min(changed), 0),
+                                  self.index(max(changed), len(self.COLUMNS) - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = self.COLUMNS[index.column()]
+        value = {"#": row["priority"], "Mod": row["name"], "Enabled": row["enabled"],
+                 "Files": row["files"], "Size": row["size"], "Linked": row["linked"],
+                 "Wins": row["wins"], "Losses": row["losses"]}[column]
+
+        if role == self.SORT_ROLE:
+            if column == "Mod":
+                return row["name"].lower()
+            return -1 if value is None else int(value)
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == "Enabled":
+                return "Yes" if value else "No"
+            if value is None:
+                return "..."
+            if column == "Size":
+                return format_size(value)
+            if column == "Linked" and row["linked_size"]:
+                return f"{value} ({format_size(row['linked_size'])})"
+            return str(value)
+        if role == Qt.ItemDataRole.TextAlignmentRole and column not in ("Mod", "Enabled"):
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        if role == Qt.ItemDataRole.ForegroundRole and not row["enabled"]:
+            return QColor("gray")
+        return None
+
+
+class ModStatsDialog(QDialog):
+    """Sortable, filterable table of a ModStatsModel."""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Mod Statistics")
+        self.resize(820, 600)
+        self.model = model
+
+        layout = QVBoxLayout(self)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter mods...")
+        layout.addWidget(self.filter_edit)
+
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(model)
+        self.proxy.setSortRole(ModStatsModel.SORT_ROLE)
+        self.proxy.setFilterKeyColumn(ModStatsModel.COLUMNS.index("Mod"))
+        self.proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.filter_edit.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        # Fixed row heights and no per-row size hints keep thousands of rows cheap
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(ModStatsModel.COLUMNS.index("Mod"), QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        bottom = QHBoxLayout()
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: gray;")
+        self.status_label.setWordWrap(True)
+        bottom.addWidget(self.status_label, 1)
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.setToolTip("Rescan every mod folder")
+        bottom.addWidget(self.refresh_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        bottom.addWidget(close_btn)
+        layout.addLayout(bottom)
+
+    def set_status(self, text):
+        self.status_label.setText(text)
+
+    def mod_at(self, index):
+        """Name of the mod on the table row of index."""
+        row = self.proxy.mapToSource(index).row()
+        return self.model.mod_names()[row]
+
+
+class ConflictModel(QAbstractTableModel):
+    """
+    Virtual table over the build index (BuildIndexReader): only the rows on screen
+    are read from disk. Shows every row, or the row numbers of a search as they arrive.
+    With a mod selected, the Result column says whether that mod wins or loses the file.
+    """
+
+    COLUMNS = ["Data path", "Winning mod", "Overrides", "Result"]
+
+    def __init__(self, reader, parent=None):
+        super().__init__(parent)
+        self.reader = reader
+        self.mod = None
+        self._rows = None  # None: every row of the index, else the matching row numbers
+
+    def show_all(self):
+        self.beginResetModel()
+        self._rows = None
+        self.mod = None
+        self.endResetModel()
+
+    def start_results(self, mod=None):
+        """Empty the table for a new search, whose matches come through add_results()."""
+        self.beginResetModel()
+        self._rows = []
+        self.mod = mod
+        self.endResetModel()
+
+    def add_results(self, batch):
+        if self._rows is None or not batch:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self._rows.extend(batch)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.reader) if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        row = index.row() if self._rows is None else self._rows[index.row()]
+        try:
+            dest_path, mod_name, overridden = self.reader.row(row)
+        except (OSError, IndexError):
+            return None
+        column = self.COLUMNS[index.column()]
+        if column == "Data path":
+            return dest_path
+        if column == "Winning mod":
+            return mod_name
+        if column == "Overrides":
+            return ", ".join(overridden)
+        if self.mod is None:
+            return ""
+        if get_provider_mod(mod_name) == self.mod:
+            return "Wins" if overridden else "No conflict"
+        return "Loses" if self.mod in map(get_provider_mod, overridden) else ""
+
+
+class ConflictExplorerDialog(QDialog):
+    """
+    Searchable table of every file in the Data folder, the mod it comes from and the
+    mods it overrides, or (with a mod selected) what that mod wins and loses.
+    Files in archives show as "Mod <Archive.bsa>", for the paths an archive loses or wins.
+    Searches run in a worker thread and narrow the previous results while typing.
+    """
+
+    # Milliseconds to wait for more typing before searching
+    SEARCH_DELAY = 250
+
+    def __init__(self, data_path, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Conflict Explorer")
+        self.resize(960, 640)
+        self.data_path = data_path
+        self.index_mtime = None  # set by the opener to notice a newer build
+        self.reader = BuildIndexReader(data_path)
+        self.model = ConflictModel(self.reader, self)
+        self.worker = None
+        self._pending = None
+        self._last_search = None  # (text, mod, only_conflicts, matches) of the last completed search
+
+        layout = QVBoxLayout(self)
+
+        filter_layout = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search Data paths...")
+        filter_layout.addWidget(self.search_edit, 1)
+        self.mod_combo = QComboBox()
+        self.mod_combo.addItem("All mods", None)
+        meta = load_build_meta(data_path) or {}
+        for mod_name in sorted(meta.get("mod_file_counts", {}), key=str.lower):
+            self.mod_combo.addItem(mod_name, mod_name)
+        self.mod_combo.addItem("[OVERWRITE]", "[OVERWRITE]")
+        filter_layout.addWidget(self.mod_combo)
+        self.conflicts_check = QCheckBox("Only conflicts")
+        filter_layout.addWidget(self.conflicts_check)
+        layout.addLayout(filter_layout)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().setVisible(False)
+        # Fixed sizes so the view never measures rows it is not showing
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 6)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column, width in ((1, 200), (2, 240), (3, 90)):
+            header.resizeSection(column, width)
+        layout.addWidget(self.table)
+
+        bottom = QHBoxLayout()
+        self.status_label = QLabel("Loading the build snapshot...")
+        self.status_label.setStyleSheet("color: gray;")
+        bottom.addWidget(self.status_label, 1)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        bottom.addWidget(close_btn)
+        layout.addLayout(bottom)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.search)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        self.mod_combo.currentIndexChanged.connect(self.search)
+        self.conflicts_check.toggled.connect(self.search)
+
+        self.search()
+
+    def select_mod(self, mod_name):
+        """Show what mod_name wins and loses."""
+        index = self.mod_combo.findData(mod_name)
+        if index >= 0:
+            self.mod_combo.setCurrentIndex(index)
+
+    def search(self):
+        """Start a search for the current filters, replacing any running one."""
+        self.search_timer.stop()
+        text = self.search_edit.text().strip()
+        mod = self.mod_combo.currentData()
+        only_conflicts = self.conflicts_check.isChecked()
+
+        if self.worker is not None and self.worker.isRunning():
+            # Start once the running search has stopped
+            self._pending = (text, mod, only_conflicts)
+            self.worker.cancel()
+            return
+
+        # Narrow the last results when the search only got more specific
+        rows = None
+        last = self._last_search
+        if (last is not None and last[3] is not None and last[1] == mod and last[2] == only_conflicts
+                and last[0].lower() in text.lower()):
+            rows = last[3]
+
+        if text or mod or only_conflicts:
+            self.model.start_results(mod)
+            self.status_label.setText("Searching...")
+        self.worker = utils.IndexSearchWorker(self.reader, text, mod, only_conflicts, rows)
+        self.worker.batch_signal.connect(self.model.add_results)
+        self.worker.finished_signal.connect(
+            lambda completed, found, error, query=(text, mod, only_conflicts):
+                self.search_finished(query, completed, found, error))
+        self.worker.start()
+
+    def search_finished(self, query, completed, found, error):
+        if self._pending is not None:
+            self._pending = None
+            self.search()
+            return
+        if error:
+            self.status_label.setText(error)
+            return
+        if not completed:
+            return
+        self._last_search = query + (found,)
+        if found is None:
+            self.model.show_all()
+            self.status_label.setText(f"{len(self.reader)} files in the Data folder.")
+        else:
+            self.status_label.setText(f"{len(found)} of {len(self.reader)} files.")
+
+    def closeEvent(self, event):
+        if self.worker is not None and self.worker.isRunning():
+            self._pending = None
+            self.worker.cancel()
+            self.worker.wait()
+        self.reader.close()
+        super().closeEvent(event)
+
+
+class ReclaimDialog(QDialog):
+    """
+    The overridden files no profile uses (build_data_folder.find_reclaimable_files),
+    one row per mod with its file count and size. The user picks the mods and
+    chooses to move their files away or delete them; see action and selected_mods().
+    """
+
+    def __init__(self, report, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Reclaim Space")
+        self.resize(640, 480)
+        self.action = None  # "move" or "delete" once accepted
+        self.totals = sorted(((sum(size for _, size, _ in files), mod_name, len(files))
+                              for mod_name, files in report.items()), reverse=True)
+
+        layout = QVBoxLayout(self)
+        info = QLabel("These files are overridden by a higher priority mod in every profile "
+                      "that uses their mod, so the game never sees them.")
+        info.setWordWrap(True)
+        layout.addWidget(info)
+
+        self.table = QTableWidget(len(self.totals), 3)
+        self.table.setHorizontalHeaderLabels(["Mod", "Files", "Size"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for row, (size, mod_name, count) in enumerate(self.totals):
+            name_item = QTableWidgetItem(mod_name)
+            name_item.setFlags(name_item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            name_item.setCheckState(Qt.CheckState.Checked)
+            self.table.setItem(row, 0, name_item)
+            count_item = QTableWidgetItem(str(count))
+            count_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.table.setItem(row, 1, count_item)
+            size_item = QTableWidgetItem(format_size(size))
+            size_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.table.setItem(row, 2, size_item)
+        self.table.itemChanged.connect(self.update_total)
+        layout.addWidget(self.table)
+
+        bottom = QHBoxLayout()
+        self.total_label = QLabel("")
+        bottom.addWidget(self.total_label, 1)
+        self.move_btn = QPushButton("Move to Folder...")
+        self.move_btn.setToolTip("Move the files into a folder of your choice, as <folder>/<mod>/<path>,\n"
+                                 "so they can be put back. Pick a folder on another drive to free space now.")
+        self.move_btn.clicked.connect(lambda: self.finish("move"))
+        bottom.addWidget(self.move_btn)
+        self.delete_btn = QPushButton("Delete")
+        self.delete_btn.clicked.connect(lambda: self.finish("delete"))
+        bottom.addWidget(self.delete_btn)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        bottom.addWidget(cancel_btn)
+        layout.addLayout(bottom)
+        self.update_total()
+
+    def selected_mods(self):
+        return {self.table.item(row, 0).text() for row in range(self.table.rowCount())
+                if self.table.item(row, 0).checkState() == Qt.CheckState.Checked}
+
+    def update_total(self):
+        selected = self.selected_mods()
+        files = sum(count for _, mod_name, count in self.totals if mod_name in selected)
+        size = sum(size for size, mod_name, _ in self.totals if mod_name in selected)
+        self.total_label.setText(f"Selected: {files} files, {format_size(size)}")
+        self.move_btn.setEnabled(bool(files))
+        self.delete_btn.setEnabled(bool(files))
+
+    def finish(self, action):
+        self.action = action
+        self.accept()
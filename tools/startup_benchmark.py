@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for MO2 Manager.
+
+Reports, for the GUI and for the mo2manager command line:
+- the slowest imports (python -X importtime, cumulative and self time)
+- the wall time from process start to the first paint of the main window (GUI)
+  and to the end of `mo2manager.py --help` (CLI)
+
+Run it before and after a change to see what it does to startup:
+
+    python3 tools/startup_benchmark.py [--runs 5] [--top 15] [--python PATH] [--offscreen]
+
+Each measurement starts a fresh interpreter. The first run of each kind is a
+warm-up (it writes the .pyc files) and is not counted.
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Runs in the child: time to import gui, then to the first paint event of any widget.
+# The interrupted-build dialog is skipped so nothing modal can block the run.
+FIRST_PAINT_CODE = r"""
+import sys, time
+started = float(sys.argv[1])
+from PyQt6.QtCore import QObject, QEvent, QTimer
+from PyQt6.QtWidgets import QApplication
+import gui
+imported = time.time()
+gui.MO2MergerGUI.report_interrupted_builds = lambda self: None
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and not self.done:
+            self.done = True
+            print(f"{imported - started:.4f} {time.time() - started:.4f}", flush=True)
+            QTimer.singleShot(0, app.quit)
+        return False
+
+app = QApplication(sys.argv[:1])
+first_paint = FirstPaint()
+first_paint.done = False
+app.installEventFilter(first_paint)
+window = gui.MO2MergerGUI()
+window.show()
+app.exec()
+"""
+
+
+def run_importtime(python, module, env):
+    """
+    Import module in a fresh interpreter with -X importtime.
+    Returns a list of (self_us, cumulative_us, depth, name) in import order.
+    """
+    proc = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=SRC_DIR, env=env, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip())) // 2
+            rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+        except ValueError:
+            continue
+    if proc.returncode != 0:
+        print(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"import {module} failed")
+    return rows
+
+
+def report_imports(python, module, env, top):
+    """Print the total import time of module and its slowest imports."""
+    run_importtime(python, module, env)  # warm-up
+    rows = run_importtime(python, module, env)
+    if not rows:
+        return
+    total = sum(cumulative for _, cumulative, depth, _ in rows if depth == 0)
+
+    print()
+    print(f"import {module}: {total / 1000:.1f} ms in {len(rows)} modules")
+    print("  Slowest (cumulative, top level packages):")
+    top_level = sorted((r for r in rows if r[2] <= 1), key=lambda r: r[1], reverse=True)
+    for self_us, cumulative_us, depth, name in top_level[:top]:
+        print(f"    {cumulative_us / 1000:8.1f} ms  {'  ' * depth}{name}")
+    print("  Slowest (self time):")
+    for self_us, cumulative_us, depth, name in sorted(rows, reverse=True)[:top]:
+        print(f"    {self_us / 1000:8.1f} ms  {name}")
+
+
+def measure_first_paint(python, env, runs):
+    """Start the GUI runs times. Returns a list of (import_seconds, first_paint_seconds)."""
+    results = []
+    for i in range(runs + 1):
+        started = time.time()
+        proc = subprocess.run([python, "-c", FIRST_PAINT_CODE, repr(started)],
+                              cwd=SRC_DIR, env=env, capture_output=True, text=True, timeout=120)
+        try:
+            imported, painted = (float(x) for x in proc.stdout.split()[:2])
+        except ValueError:
+            print(f"  GUI did not paint: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+            return results
+        if i > 0:  # the first run is the warm-up
+            results.append((imported, painted))
+    return results
+
+
+def measure_command(command, env, runs):
+    """Wall time of a command, runs times (after one warm-up)."""
+    times = []
+    for i in range(runs + 1):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=SRC_DIR, env=env, capture_output=True)
+        if i > 0:
+            times.append(time.perf_counter() - started)
+    return times
+
+
+def describe(times):
+    return f"median {statistics.median(times) * 1000:.0f} ms (min {min(times) * 1000:.0f}, max {max(times) * 1000:.0f})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure MO2 Manager startup time.")
+    parser.add_argument('--runs', '-n', type=int, default=5, help='Timed runs of each measurement (default: 5)')
+    parser.add_argument('--top', '-t', type=int, default=15, help='Imports listed per table (default: 15)')
+    parser.add_argument('--python', default=sys.executable,
+                        help='Interpreter to measure (default: the one running this script)')
+    parser.add_argument('--offscreen', action='store_true',
+                        help='Use the offscreen Qt platform (automatic without a display)')
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    if args.offscreen or not (env.get("DISPLAY") or env.get("WAYLAND_DISPLAY")):
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    print("=" * 70)
+    print("MO2 MANAGER STARTUP BENCHMARK")
+    print("=" * 70)
+    print(f"Python:  {args.python}")
+    print(f"Source:  {SRC_DIR}")
+    print(f"Runs:    {args.runs} (+1 warm-up)")
+    print(f"Display: {env.get('QT_QPA_PLATFORM', 'default')}")
+
+    baseline = measure_command([args.python, "-c", "pass"], env, args.runs)
+    print()
+    print(f"Bare interpreter start: {describe(baseline)}")
+
+    print()
+    print("-" * 70)
+    print("GUI")
+    print("-" * 70)
+    report_imports(args.python, "gui", env, args.top)
+    paints = measure_first_paint(args.python, env, args.runs)
+    if paints:
+        print()
+        print(f"Time to 'import gui':   {describe([imported for imported, _ in paints])}")
+        print(f"Time to first paint:    {describe([painted for _, painted in paints])}")
+
+    print()
+    print("-" * 70)
+    print("COMMAND LINE")
+    print("-" * 70)
+    report_imports(args.python, "mo2manager, core, build_data_folder", env, args.top)
+    print()
+    cli = measure_command([args.python, "mo2manager.py", "--help"], env, args.runs)
+    print(f"mo2manager.py --help:   {describe(cli)}")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()